@@ -6,87 +6,234 @@ vereinfachen und Wiederholungen reduzieren.
 import os
 import json
 import logging
+import threading
 import uuid
-from datetime import datetime
 from flask import Blueprint, jsonify, request, current_app, g, Response, stream_with_context
 from werkzeug.utils import secure_filename
-from typing import Dict, Any, Optional, List, Tuple, Union
+from typing import Dict, Any, Callable, Optional, List, Tuple, Union
 from pathlib import Path
 import concurrent.futures
 
+from config import config_manager
 from utils.auth_middleware import get_user_id
 from utils.error_handler import APIError, bad_request, not_found, server_error
 from utils.file_utils import (
-    get_upload_folder, get_safe_filepath, allowed_file, save_uploaded_file,
-    read_json, write_json, find_files, cleanup_file
+    get_upload_folder, get_status_folder, get_safe_filepath, allowed_file, save_uploaded_file,
+    read_json, scan_files, cleanup_file, stream_to_disk,
+    has_pdf_signature, is_valid_document_id
 )
-from utils.metadata_utils import validate_metadata, format_metadata_for_storage
+from utils.metadata_utils import validate_metadata, format_metadata_for_storage, utc_now_iso
+from utils.identifier_utils import strip_isbn
+from utils.crossref_cache import cached_fetch
+from utils.openlibrary_cache import cached_fetch as cached_openlibrary_fetch
+from utils import document_index
+from utils.analysis_cache import hash_file, settings_fingerprint
 from services.status_service import get_status_service
+from services.vector_storage import get_vector_storage
+from services.pdf import get_pdf_processor
 
 # Importiere Services
-from services.documents.processor import DocumentProcessor, process_document_background
+from services.documents.processor import process_document_background
+from .document_analysis import analyze_document_background, get_analysis_results
 
-# Thread-Pool für Hintergrundaufgaben
-executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+# Thread-Pool für Hintergrundaufgaben; Größe über SCILIT_DOC_WORKERS einstellbar
+_DOC_WORKERS = config_manager.get('DOC_WORKERS', 2)
+executor = concurrent.futures.ThreadPoolExecutor(max_workers=_DOC_WORKERS, thread_name_prefix='document-worker')
+_executor_lock = threading.Lock()
+
+# Maximale Anzahl laufender und wartender Dokumentverarbeitungen; darüber hinaus
+# werden neue Uploads und Analysen mit 429 abgewiesen, statt beliebig viele
+# PDFs in die Warteschlange zu legen
+MAX_PENDING_PROCESSING_TASKS = max(16, 2 * _DOC_WORKERS)
+
+# Empfohlene Wartezeit für abgewiesene Anfragen (Retry-After, Sekunden)
+PROCESSING_RETRY_AFTER_SECONDS = 30
+
+_pending_processing_tasks = 0
+_pending_processing_lock = threading.Lock()
+
+# Eigener Thread-Pool für Metadaten-Abfragen und das Löschen von Dokumenten,
+# damit sie nicht hinter laufenden Dokumentverarbeitungen warten
+_lookup_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix='metadata-lookup')
+
+# Bibliografische Angaben, die ein erneut hochgeladenes Dokument mit dem
+# vorhandenen teilen muss, um als Duplikat zu gelten
+_DUPLICATE_METADATA_KEYS = (
+    'title', 'type', 'authors', 'publicationDate', 'journal', 'publisher',
+    'volume', 'issue', 'pages', 'doi', 'isbn', 'abstract'
+)
+
+# Maximale Anzahl paralleler Lesezugriffe beim Einlesen eines Benutzerverzeichnisses
+_BACKFILL_READ_WORKERS = 8
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 def get_executor() -> concurrent.futures.ThreadPoolExecutor:
     """
-    Holt den Thread-Pool-Executor für Hintergrundaufgaben
+    Holt den Thread-Pool-Executor für Hintergrundaufgaben; ein bereits
+    heruntergefahrener Executor wird durch einen neuen ersetzt
     
     Returns:
         ThreadPoolExecutor: Executor für Hintergrundaufgaben
     """
+    global executor
+    if getattr(executor, '_shutdown', False):
+        with _executor_lock:
+            if getattr(executor, '_shutdown', False):
+                logger.warning("Thread-Pool war heruntergefahren, erstelle neuen Executor")
+                executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=_DOC_WORKERS, thread_name_prefix='document-worker'
+                )
     return executor
 
-def list_documents() -> Tuple[List[Dict[str, Any]], int]:
+def reserve_processing_slot(enforce_limit: bool = True) -> None:
+    """
+    Belegt einen Platz in der Verarbeitungswarteschlange
+    
+    Wird vor dem Speichern des Uploads aufgerufen, damit bei voller
+    Warteschlange nichts auf die Festplatte geschrieben wird. Prüfung und
+    Belegung erfolgen in einem Schritt unter dem Lock. Der Platz gehört dem
+    Aufrufer, bis submit_processing_task erfolgreich war; bricht er vorher ab,
+    muss er ihn mit release_processing_slot freigeben.
+    
+    Args:
+        enforce_limit: False zählt den Platz mit, ohne bei voller
+            Warteschlange abzuweisen (z.B. für Neuindizierungen)
+    
+    Raises:
+        APIError: 429 mit Retry-After, wenn die Warteschlange voll ist
+    """
+    global _pending_processing_tasks
+    with _pending_processing_lock:
+        if enforce_limit and _pending_processing_tasks >= MAX_PENDING_PROCESSING_TASKS:
+            raise APIError(
+                "Zu viele Dokumente in Verarbeitung. Bitte später erneut versuchen.",
+                429,
+                headers={'Retry-After': str(PROCESSING_RETRY_AFTER_SECONDS)}
+            )
+        _pending_processing_tasks += 1
+
+def release_processing_slot(_future: Optional[concurrent.futures.Future] = None) -> None:
+    """Gibt einen mit reserve_processing_slot belegten Platz wieder frei"""
+    global _pending_processing_tasks
+    with _pending_processing_lock:
+        _pending_processing_tasks -= 1
+
+def submit_processing_task(fn: Callable, *args: Any, **kwargs: Any) -> concurrent.futures.Future:
+    """
+    Startet eine Dokumentverarbeitung im Hintergrund auf einem zuvor mit
+    reserve_processing_slot belegten Platz
+    
+    Ab hier gibt die Aufgabe den Platz frei, sobald sie beendet ist; schlägt
+    bereits das Einreihen fehl, bleibt der Platz beim Aufrufer.
+    
+    Args:
+        fn: Auszuführende Funktion
+        *args: Positionsargumente für fn
+        **kwargs: Schlüsselwortargumente für fn
+        
+    Returns:
+        Future der Aufgabe
+    """
+    future = get_executor().submit(fn, *args, **kwargs)
+    future.add_done_callback(release_processing_slot)
+    return future
+
+def list_documents(limit: Optional[int] = None, offset: int = 0) -> Tuple[Any, int]:
     """
-    Listet alle Dokumente eines Benutzers auf
+    Listet alle Dokumente eines Benutzers auf, neueste zuerst
+    
+    Args:
+        limit: Optionale Seitengröße; ist sie gesetzt, wird nur der Ausschnitt
+            ab offset als {"items", "total", "limit", "offset"} zurückgegeben
+        offset: Anzahl zu überspringender Dokumente
     
     Returns:
-        tuple: (documents, status_code)
+        tuple: (documents, status_code) - kommen die Dokumente aus dem Index,
+            ist documents bereits fertig serialisiertes JSON (bytes bzw. ohne
+            limit ein Iterator über JSON-Blöcke)
     """
     try:
         # Benutzer-ID holen
         user_id = get_user_id()
         logger.info(f"Liste Dokumente für Benutzer: {user_id}")
         
+        # Indexierte Benutzer ohne Verzeichnis-Scan bedienen; die gespeicherten
+        # JSON-Texte werden dabei ohne Parsen und Neu-Kodieren zusammengesetzt
+        if limit is not None:
+            page = document_index.page_documents(user_id, limit, offset, raw=True)
+            if page is not None:
+                items, total = page
+                logger.debug(f"Dokumente aus dem Index: {len(items)} von {total}")
+                return (
+                    b'{"items":[' + b','.join(items) + b'],'
+                    + f'"total":{total},"limit":{limit},"offset":{offset}}}'.encode('ascii')
+                ), 200
+        else:
+            # Ohne Seitengröße blockweise streamen, statt die ganze Liste aufzubauen
+            documents = document_index.iter_documents(user_id)
+            if documents is not None:
+                logger.debug("Dokumente werden aus dem Index gestreamt")
+                return documents, 200
+        
         documents = []
+        index_entries = []
         
         # Benutzerspezifisches Verzeichnis
         user_upload_dir = get_upload_folder(user_id)
-        if not os.path.exists(user_upload_dir):
-            logger.info(f"Benutzerverzeichnis existiert nicht: {user_upload_dir}")
-            return [], 200
-        
-        # Suche JSON-Metadaten-Dateien im Benutzerverzeichnis
-        json_files = find_files("*.json", user_upload_dir)
-        logger.debug(f"Gefundene Metadatendateien: {len(json_files)}")
-        
-        for file_path in json_files:
-            # Ignoriere temporäre Dateien und Statusdateien
-            if '_status.json' in file_path or '_results.json' in file_path:
-                continue
-                
-            # Lade Metadaten
-            metadata = read_json(file_path)
+        
+        # JSON-Metadaten-Dateien im Benutzerverzeichnis, ohne Status- und Ergebnisdateien
+        json_files = [
+            file_path for file_path in scan_files(user_upload_dir, '.json')
+            if not file_path.endswith(('_status.json', '_results.json'))
+        ]
+        
+        # Metadaten parallel laden, damit sich die Dateizugriffe überlappen; einmaliges
+        # Einlesen, danach liefert der Index die Daten, daher am Datei-Cache vorbei
+        if len(json_files) > 1:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(_BACKFILL_READ_WORKERS, len(json_files))
+            ) as read_executor:
+                loaded = list(read_executor.map(lambda path: read_json(path, use_cache=False), json_files))
+        else:
+            loaded = [read_json(path, use_cache=False) for path in json_files]
+        
+        for file_path, metadata in zip(json_files, loaded):
             if metadata:
                 documents.append(metadata)
                 logger.debug(f"Dokument hinzugefügt: {metadata.get('id', 'unbekannt')}")
+                
+                pdf_path = file_path[:-len('.json')]
+                document_id = metadata.get('document_id') or os.path.basename(pdf_path).split('_', 1)[0]
+                index_entries.append((document_id, pdf_path, metadata))
+        
+        logger.debug(f"Gefundene Metadatendateien: {len(documents)}")
+        
+        # In einer Transaktion in den Index übernehmen; folgende Aufrufe lesen aus dem Index
+        if document_index.store_many(user_id, index_entries):
+            document_index.mark_user_indexed(user_id)
         
         # Nach Uploaddatum sortieren, neueste zuerst
-        return sorted(
-            documents, 
-            key=lambda x: x.get('uploadDate', ''), 
-            reverse=True
-        ), 200
+        documents.sort(key=lambda x: x.get('uploadDate', ''), reverse=True)
+        
+        if limit is not None:
+            return _document_page(documents[offset:offset + limit], len(documents), limit, offset), 200
+        return documents, 200
         
     except Exception as e:
         logger.error(f"Fehler beim Auflisten der Dokumente: {e}", exc_info=True)
         raise APIError(f"Fehler beim Auflisten der Dokumente: {str(e)}", 500)
 
+def _document_page(items: List[Dict[str, Any]], total: int, limit: int, offset: int) -> Dict[str, Any]:
+    """Erstellt die Antwort für eine Seite der Dokumentliste"""
+    return {
+        "items": items,
+        "total": total,
+        "limit": limit,
+        "offset": offset
+    }
+
 def get_document(document_id: str) -> Tuple[Dict[str, Any], int]:
     """
     Holt ein spezifisches Dokument anhand der ID
@@ -102,17 +249,27 @@ def get_document(document_id: str) -> Tuple[Dict[str, Any], int]:
         user_id = get_user_id()
         logger.info(f"Hole Dokument {document_id} für Benutzer {user_id}")
         
-        # Suche Metadaten-Datei
-        user_upload_dir = get_upload_folder(user_id)
-        metadata_files = find_files(f"{document_id}_*.json", user_upload_dir)
-        
-        if not metadata_files:
+        # Metadaten aus dem Index, sonst aus der Metadaten-Datei
+        entry = document_index.get_document(user_id, document_id)
+        if entry:
+            metadata = entry['metadata']
+        elif document_index.is_user_indexed(user_id):
+            # Vollständig indexierter Benutzer: kein Verzeichnis-Scan nötig
             raise APIError(f"Dokument {document_id} nicht gefunden", 404)
+        else:
+            user_upload_dir = get_upload_folder(user_id)
+            # Nur die erste passende Datei wird verwendet; der Scan endet dort
+            metadata_path = next(scan_files(user_upload_dir, '.json', prefix=f"{document_id}_"), None)
+            
+            if metadata_path is None:
+                raise APIError(f"Dokument {document_id} nicht gefunden", 404)
+                
+            # Lade Metadaten
+            metadata = read_json(metadata_path)
+            if not metadata:
+                raise APIError("Ungültige Dokument-Metadaten", 500)
             
-        # Lade Metadaten
-        metadata = read_json(metadata_files[0])
-        if not metadata:
-            raise APIError("Ungültige Dokument-Metadaten", 500)
+            document_index.store(user_id, document_id, metadata_path[:-len('.json')], metadata)
         
         # Verarbeitungsstatus hinzufügen
         metadata['processing_status'] = get_status_service().get_status(document_id)
@@ -126,6 +283,73 @@ def get_document(document_id: str) -> Tuple[Dict[str, Any], int]:
         logger.error(f"Fehler beim Abrufen des Dokuments {document_id}: {e}", exc_info=True)
         raise APIError(f"Fehler beim Abrufen des Dokuments: {str(e)}", 500)
 
+def check_processing_limits(filepath: str, settings: Dict[str, Any]) -> int:
+    """
+    Prüft Dateigröße und Seitenzahl, bevor ein Dokument einen Platz im
+    Thread-Pool belegt; zu große PDFs werden sofort abgewiesen und gelöscht
+    
+    Args:
+        filepath: Pfad zur gespeicherten PDF-Datei
+        settings: Verarbeitungseinstellungen (maxFileSizeMB, maxPages)
+        
+    Returns:
+        int: Seitenzahl des PDFs
+        
+    Raises:
+        APIError: 400 bei ungültigem PDF, 413 bei zu großer Datei oder zu vielen Seiten
+    """
+    max_file_size_mb = int(settings.get('maxFileSizeMB', 50))
+    file_size_mb = os.stat(filepath).st_size / (1024 * 1024)
+    if file_size_mb > max_file_size_mb:
+        cleanup_file(filepath)
+        raise APIError(f"Datei zu groß: {file_size_mb:.1f} MB. Maximal erlaubt sind {max_file_size_mb} MB.", 413)
+    
+    is_valid, validation_result = get_pdf_processor().validate_pdf(filepath)
+    if not is_valid:
+        cleanup_file(filepath)
+        raise APIError(f"Die Datei ist kein gültiges PDF: {validation_result}", 400)
+    
+    page_count = validation_result
+    # Mit maxPages wird ohnehin nur der Anfang des Dokuments verarbeitet
+    max_pdf_pages = config_manager.get('MAX_PDF_PAGES', 2000)
+    max_pages = int(settings.get('maxPages', 0))
+    pages_to_process = min(page_count, max_pages) if max_pages > 0 else page_count
+    if max_pdf_pages > 0 and pages_to_process > max_pdf_pages:
+        cleanup_file(filepath)
+        raise APIError(f"PDF hat zu viele Seiten: {page_count}. Maximal erlaubt sind {max_pdf_pages} Seiten.", 413)
+    
+    return page_count
+
+def _find_processed_duplicate(user_id: str, content_hash: str, settings: str,
+                              document_id: str, metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Sucht ein bereits vollständig verarbeitetes Dokument des Benutzers mit
+    identischem Dateiinhalt, denselben Verarbeitungseinstellungen und zu den
+    eingegebenen Metadaten passenden bibliografischen Angaben
+    
+    Args:
+        user_id: Benutzer-ID
+        content_hash: Hash der hochgeladenen Datei
+        settings: Fingerabdruck der Verarbeitungseinstellungen
+        document_id: ID des neuen Dokuments (wird nicht als Duplikat gewertet)
+        metadata: Eingegebene Metadaten des neuen Dokuments
+        
+    Returns:
+        dict: Eintrag aus dem Dokument-Index oder None
+    """
+    for existing in document_index.find_by_hash(user_id, content_hash, settings):
+        existing_metadata = existing['metadata']
+        if (existing['document_id'] == document_id
+                or not existing_metadata.get('processingComplete')
+                or not os.path.exists(existing['file_path'])):
+            continue
+        # Abweichende Angaben des Benutzers nicht stillschweigend verwerfen
+        if any(metadata.get(key) and metadata.get(key) != existing_metadata.get(key)
+               for key in _DUPLICATE_METADATA_KEYS):
+            continue
+        return existing
+    return None
+
 def save_document(file, metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
     """
     Speichert ein neues Dokument
@@ -137,6 +361,7 @@ def save_document(file, metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
     Returns:
         tuple: (response, status_code)
     """
+    slot_reserved = False
     try:
         # Metadaten validieren
         is_valid, error_message = validate_metadata(metadata)
@@ -145,6 +370,12 @@ def save_document(file, metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
         
         # Dokument-ID generieren, falls nicht vorhanden
         document_id = metadata.get('id', str(uuid.uuid4()))
+        if not is_valid_document_id(document_id):
+            raise APIError("Ungültige Dokument-ID", 400)
+        
+        # Bei voller Verarbeitungswarteschlange abweisen, bevor etwas gespeichert wird
+        reserve_processing_slot()
+        slot_reserved = True
         logger.info(f"Verarbeite Dokument {document_id}")
         
         # Benutzer-ID holen
@@ -155,18 +386,22 @@ def save_document(file, metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
         
         # Prüfe auf temp_document_id für bereits hochgeladene Datei
         temp_document_id = metadata.get('temp_document_id')
+        if temp_document_id and not is_valid_document_id(temp_document_id):
+            raise APIError("Ungültige temporäre Dokument-ID", 400)
         filepath = None
+        file_size = None
         
         if temp_document_id:
             logger.info(f"Temporäre Dokument-ID vorhanden: {temp_document_id}")
-            temp_files = find_files(f"temp_{temp_document_id}_*", get_upload_folder(user_id))
+            temp_files = list(scan_files(get_upload_folder(user_id), prefix=f"temp_{temp_document_id}_"))
             if temp_files:
                 temp_filepath = temp_files[0]
                 filename = os.path.basename(temp_filepath).replace(f"temp_{temp_document_id}_", "")
                 filepath = get_safe_filepath(document_id, filename, user_id)
                 
                 # Benenne temporäre Datei in permanente Datei um
-                os.rename(temp_filepath, filepath)
+                file_size = os.stat(temp_filepath).st_size
+                os.replace(temp_filepath, filepath)
                 logger.info(f"Temporäre Datei wiederverwendet: {temp_filepath} -> {filepath}")
         
         # Wenn Datei hochgeladen oder keine temporäre Datei gefunden, verarbeite hochgeladene Datei
@@ -174,12 +409,15 @@ def save_document(file, metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
             if not allowed_file(file.filename):
                 raise APIError("Dateityp nicht erlaubt. Nur PDF-Dateien werden akzeptiert.", 400)
             
+            if not has_pdf_signature(file):
+                raise APIError("Die Datei ist kein gültiges PDF.", 400)
+            
             # Datei sicher speichern
             filename = secure_filename(file.filename)
-            filepath = get_safe_filepath(document_id, filename, user_id)
+            filepath = os.path.join(get_upload_folder(user_id), f"{document_id}_{filename}")
             
             try:
-                file.save(filepath)
+                file_size = stream_to_disk(file, filepath)
                 logger.info(f"Hochgeladene Datei gespeichert unter: {filepath}")
             except Exception as e:
                 logger.error(f"Fehler beim Speichern der Datei: {e}")
@@ -188,45 +426,72 @@ def save_document(file, metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
         if not filepath:
             raise APIError("Keine Datei bereitgestellt", 400)
         
+        # Verarbeitungseinstellungen aus Metadaten extrahieren
+        processing_settings = {
+            'maxPages': int(metadata.get('maxPages', 0)),
+            'performOCR': bool(metadata.get('performOCR', False)),
+            'chunkSize': int(metadata.get('chunkSize', 1000)),
+            'chunkOverlap': int(metadata.get('chunkOverlap', 200))
+        }
+        logger.debug(f"Verarbeitungseinstellungen: {processing_settings}")
+        
+        # Identische, gleich verarbeitete Datei: vorhandenes Dokument zurückgeben,
+        # statt die gesamte Verarbeitung erneut zu durchlaufen
+        content_hash = hash_file(filepath)
+        fingerprint = settings_fingerprint(processing_settings)
+        duplicate = _find_processed_duplicate(user_id, content_hash, fingerprint, document_id, metadata)
+        if duplicate:
+            cleanup_file(filepath)
+            logger.info(f"Dokument {document_id} ist identisch mit {duplicate['document_id']}, Verarbeitung übersprungen")
+            return {
+                **duplicate['metadata'],
+                "document_id": duplicate['document_id'],
+                "duplicate": True,
+                "processing_status": {
+                    "status": "completed",
+                    "progress": 100,
+                    "message": "Dokument bereits vorhanden"
+                }
+            }, 200
+        
+        # Zu große PDFs abweisen, bevor sie einen Verarbeitungs-Thread belegen
+        page_count = check_processing_limits(filepath, processing_settings)
+        
         try:
-            # Verarbeitungseinstellungen aus Metadaten extrahieren
-            processing_settings = {
-                'maxPages': int(metadata.get('maxPages', 0)),
-                'performOCR': bool(metadata.get('performOCR', False)),
-                'chunkSize': int(metadata.get('chunkSize', 1000)),
-                'chunkOverlap': int(metadata.get('chunkOverlap', 200))
-            }
-            logger.debug(f"Verarbeitungseinstellungen: {processing_settings}")
-            
             # Upload-spezifische Metadaten hinzufügen
             metadata['document_id'] = document_id
             metadata['filename'] = os.path.basename(filepath)
-            metadata['fileSize'] = os.path.getsize(filepath)
-            metadata['uploadDate'] = datetime.utcnow().isoformat() + 'Z'
+            metadata['fileSize'] = file_size  # beim Speichern/Umbenennen ermittelt
+            metadata['totalPages'] = page_count
+            metadata['content_hash'] = content_hash
+            metadata['settings_fingerprint'] = fingerprint
+            metadata['uploadDate'] = utc_now_iso()
             metadata['filePath'] = filepath
             metadata['processingComplete'] = False
             
-            # Initialen Status speichern
+            # Initialen Status nur im Speicher halten - die Hintergrundverarbeitung
+            # überschreibt ihn innerhalb von Millisekunden dauerhaft
             get_status_service().update_status(
                 status_id=document_id,
                 status="processing",
                 progress=0,
-                message="Dokument-Upload abgeschlossen. Verarbeitung gestartet..."
+                message="Dokument-Upload abgeschlossen. Verarbeitung gestartet...",
+                durable=False
             )
             
             # Speichere initiale Metadaten in JSON-Datei
-            metadata_path = f"{filepath}.json"
-            write_json(metadata_path, metadata)
+            document_index.save_metadata(user_id, document_id, filepath, metadata)
             
             # Starte Hintergrundverarbeitung
             logger.info(f"Starte Hintergrundverarbeitung für Dokument {document_id}")
-            get_executor().submit(
+            submit_processing_task(
                 process_document_background,
                 filepath,
                 document_id,
                 metadata,
                 processing_settings
             )
+            slot_reserved = False  # gehört jetzt der Hintergrundaufgabe
             
             # Aktuellen Verarbeitungsstatus holen
             current_status = get_status_service().get_status(document_id)
@@ -240,8 +505,7 @@ def save_document(file, metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
             
         except Exception as e:
             # Bei Fehler aufräumen
-            if os.path.exists(filepath):
-                cleanup_file(filepath)
+            if cleanup_file(filepath):
                 logger.warning(f"Datei {filepath} aufgrund eines Fehlers gelöscht")
             raise APIError(f"Fehler bei der Dokumentverarbeitung: {str(e)}", 500)
         
@@ -251,6 +515,10 @@ def save_document(file, metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
     except Exception as e:
         logger.error(f"Fehler beim Speichern des Dokuments: {e}", exc_info=True)
         raise APIError(f"Fehler beim Speichern des Dokuments: {str(e)}", 500)
+    finally:
+        # Duplikat, Fehler oder Abweisung vor dem Start: Platz wieder freigeben
+        if slot_reserved:
+            release_processing_slot()
 
 def delete_document(document_id: str) -> Tuple[Dict[str, Any], int]:
     """
@@ -267,47 +535,35 @@ def delete_document(document_id: str) -> Tuple[Dict[str, Any], int]:
         user_id = get_user_id()
         logger.info(f"Lösche Dokument {document_id} für Benutzer {user_id}")
         
-        # Suche alle Dateien für dieses Dokument im Benutzerverzeichnis
-        user_upload_dir = get_upload_folder(user_id)
-        files = find_files(f"{document_id}_*", user_upload_dir)
+        # Dateipfade aus dem Index, sonst alle Dateien des Dokuments im Benutzerverzeichnis
+        entry = document_index.get_document(user_id, document_id)
+        if entry:
+            files = [entry['file_path'], f"{entry['file_path']}.json"]
+        elif document_index.is_user_indexed(user_id):
+            # Vollständig indexierter Benutzer: kein Verzeichnis-Scan nötig
+            files = []
+        else:
+            user_upload_dir = get_upload_folder(user_id)
+            files = list(scan_files(user_upload_dir, prefix=f"{document_id}_"))
         
         if not files:
             raise APIError(f"Dokument {document_id} nicht gefunden", 404)
         
-        # Lösche PDF- und Metadaten-Dateien
-        for file_path in files:
-            try:
-                cleanup_file(file_path)
-                logger.debug(f"Datei gelöscht: {file_path}")
-            except Exception as e:
-                logger.error(f"Fehler beim Löschen der Datei {file_path}: {e}")
-        
-        # Lösche Statusdatei, falls vorhanden
-        status_file = os.path.join(get_upload_folder(), 'status', f"{document_id}_status.json")
-        if os.path.exists(status_file):
-            try:
-                cleanup_file(status_file)
-                logger.debug(f"Statusdatei gelöscht: {status_file}")
-            except Exception as e:
-                logger.error(f"Fehler beim Löschen der Statusdatei {status_file}: {e}")
-        
-        # Aus Vektordatenbank löschen
-        try:
-            from services.vector_storage import get_vector_storage
-            get_vector_storage().delete_document(document_id, user_id)
-            logger.info(f"Dokument {document_id} aus Vektordatenbank gelöscht")
-        except Exception as e:
-            logger.error(f"Fehler beim Löschen aus Vektordatenbank: {e}")
-        
-        # Verarbeitungsstatus bereinigen
+        # Sofort aus dem Index und dem Status entfernen, damit das Dokument nicht
+        # mehr gelistet wird; Dateien und Vektordaten werden im Hintergrund gelöscht
+        document_index.remove(user_id, document_id)
         get_status_service().cleanup_status(document_id, 0)  # Sofortige Bereinigung
         logger.debug(f"Verarbeitungsstatus für Dokument {document_id} bereinigt")
         
-        logger.info(f"Dokument {document_id} erfolgreich gelöscht")
+        # Nicht im Verarbeitungs-Pool, wo das Löschen hinter wartenden PDFs stünde
+        _lookup_executor.submit(_purge_document, document_id, user_id, files)
+        
+        logger.info(f"Löschen von Dokument {document_id} eingeplant")
         return {
             "success": True, 
-            "message": f"Dokument {document_id} erfolgreich gelöscht"
-        }, 200
+            "status": "accepted",
+            "message": f"Dokument {document_id} wird gelöscht"
+        }, 202
         
     except APIError as e:
         # APIError durchreichen
@@ -316,6 +572,38 @@ def delete_document(document_id: str) -> Tuple[Dict[str, Any], int]:
         logger.error(f"Fehler beim Löschen des Dokuments {document_id}: {e}", exc_info=True)
         raise APIError(f"Fehler beim Löschen des Dokuments: {str(e)}", 500)
 
+def _purge_document(document_id: str, user_id: str, files: List[str]) -> None:
+    """
+    Löscht die Dateien, die Statusdatei und die Vektordaten eines Dokuments
+    (läuft im Hintergrund)
+    
+    Args:
+        document_id: Dokument-ID
+        user_id: Benutzer-ID
+        files: Zu löschende PDF- und Metadaten-Dateien
+    """
+    # Lösche PDF- und Metadaten-Dateien
+    for file_path in files:
+        try:
+            cleanup_file(file_path)
+            logger.debug(f"Datei gelöscht: {file_path}")
+        except Exception as e:
+            logger.error(f"Fehler beim Löschen der Datei {file_path}: {e}")
+    
+    # Lösche Statusdatei, falls vorhanden
+    status_file = os.path.join(get_status_folder(), f"{document_id}_status.json")
+    if cleanup_file(status_file):
+        logger.debug(f"Statusdatei gelöscht: {status_file}")
+    
+    # Aus Vektordatenbank löschen
+    try:
+        get_vector_storage().delete_document(document_id, user_id)
+        logger.info(f"Dokument {document_id} aus Vektordatenbank gelöscht")
+    except Exception as e:
+        logger.error(f"Fehler beim Löschen aus Vektordatenbank: {e}")
+    
+    logger.info(f"Dokument {document_id} erfolgreich gelöscht")
+
 def update_document(document_id: str, updated_metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
     """
     Aktualisiert ein Dokument
@@ -332,29 +620,39 @@ def update_document(document_id: str, updated_metadata: Dict[str, Any]) -> Tuple
         user_id = get_user_id()
         logger.info(f"Aktualisiere Dokument {document_id} für Benutzer {user_id}")
         
-        # Suche Dokument im Benutzerverzeichnis
-        user_upload_dir = get_upload_folder(user_id)
-        files = find_files(f"{document_id}_*", user_upload_dir)
-        
-        if not files:
+        # Dokument aus dem Index, sonst im Benutzerverzeichnis suchen
+        entry = document_index.get_document(user_id, document_id)
+        if entry:
+            filepath = entry['file_path']
+            existing_metadata = entry['metadata']
+        elif document_index.is_user_indexed(user_id):
+            # Vollständig indexierter Benutzer: kein Verzeichnis-Scan nötig
             raise APIError(f"Dokument {document_id} nicht gefunden", 404)
+        else:
+            user_upload_dir = get_upload_folder(user_id)
+            files = list(scan_files(user_upload_dir, prefix=f"{document_id}_"))
             
-        # Suche PDF-Datei
-        pdf_files = [f for f in files if f.endswith('.pdf')]
-        if not pdf_files:
-            raise APIError("PDF-Datei nicht gefunden", 404)
-        
-        filepath = pdf_files[0]
-        logger.debug(f"PDF-Datei gefunden unter: {filepath}")
-        
-        # Lade existierende Metadaten
-        metadata_path = f"{filepath}.json"
-        if os.path.exists(metadata_path):
-            existing_metadata = read_json(metadata_path)
+            if not files:
+                raise APIError(f"Dokument {document_id} nicht gefunden", 404)
+                
+            # Suche PDF-Datei
+            pdf_files = [f for f in files if f.endswith('.pdf')]
+            if not pdf_files:
+                raise APIError("PDF-Datei nicht gefunden", 404)
             
-            if not existing_metadata:
-                raise APIError("Fehler beim Laden der existierenden Metadaten", 500)
+            filepath = pdf_files[0]
+            logger.debug(f"PDF-Datei gefunden unter: {filepath}")
             
+            # Lade existierende Metadaten
+            metadata_path = f"{filepath}.json"
+            existing_metadata = None
+            if os.path.exists(metadata_path):
+                existing_metadata = read_json(metadata_path)
+                
+                if not existing_metadata:
+                    raise APIError("Fehler beim Laden der existierenden Metadaten", 500)
+        
+        if existing_metadata is not None:
             # Prüfe auf Änderungen bei kritischen Feldern, die eine Aktualisierung
             # in der Vektordatenbank erfordern
             update_chunks = False
@@ -391,13 +689,18 @@ def update_document(document_id: str, updated_metadata: Dict[str, Any]) -> Tuple
                     
                     # Starte Hintergrundverarbeitung
                     logger.info(f"Starte Hintergrundverarbeitung für Dokumentaktualisierung {document_id}")
-                    get_executor().submit(
-                        process_document_background,
-                        filepath,
-                        document_id,
-                        merged_metadata,
-                        processing_settings
-                    )
+                    reserve_processing_slot(enforce_limit=False)
+                    try:
+                        submit_processing_task(
+                            process_document_background,
+                            filepath,
+                            document_id,
+                            merged_metadata,
+                            processing_settings
+                        )
+                    except Exception:
+                        release_processing_slot()
+                        raise
                     
                     merged_metadata['processingComplete'] = False
                 except Exception as e:
@@ -407,11 +710,16 @@ def update_document(document_id: str, updated_metadata: Dict[str, Any]) -> Tuple
             merged_metadata = updated_metadata
             merged_metadata['document_id'] = document_id
         
+        # Unveränderte Metadaten (z.B. erneutes Speichern im Formular) nicht neu schreiben
+        if merged_metadata == existing_metadata:
+            logger.info(f"Metadaten für Dokument {document_id} unverändert, nichts zu speichern")
+            return merged_metadata, 200
+        
         # Aktualisierungszeitstempel hinzufügen
-        merged_metadata['updateDate'] = datetime.utcnow().isoformat() + 'Z'
+        merged_metadata['updateDate'] = utc_now_iso()
         
         # Metadaten speichern
-        write_json(metadata_path, merged_metadata)
+        document_index.save_metadata(user_id, document_id, filepath, merged_metadata)
         logger.info(f"Aktualisierte Metadaten für Dokument {document_id} gespeichert")
         
         return merged_metadata, 200
@@ -423,6 +731,92 @@ def update_document(document_id: str, updated_metadata: Dict[str, Any]) -> Tuple
         logger.error(f"Fehler beim Aktualisieren des Dokuments {document_id}: {e}", exc_info=True)
         raise APIError(f"Fehler beim Aktualisieren des Dokuments: {str(e)}", 500)
 
+def _metadata_from_openlibrary(book_data: Dict[str, Any], isbn: str) -> Dict[str, Any]:
+    """
+    Wandelt OpenLibrary-Buchdaten in das Metadatenformat um
+    
+    Args:
+        book_data: Buchdaten von OpenLibrary
+        isbn: ISBN ohne Trennzeichen
+        
+    Returns:
+        dict: Metadaten
+    """
+    # Extrahiere Buchtitel, Autoren, etc.
+    authors = []
+    if 'authors' in book_data:
+        for author in book_data['authors']:
+            name = author.get('name', '')
+            authors.append({'name': name})
+    
+    return {
+        'title': book_data.get('title', ''),
+        'authors': authors,
+        'publisher': book_data.get('publishers', [{}])[0].get('name', '') if 'publishers' in book_data else '',
+        'publicationDate': book_data.get('publish_date', ''),
+        'isbn': isbn,
+        'type': 'book'
+    }
+
+def _start_quick_metadata_lookup(
+    temp_id: str,
+    identifiers: Dict[str, Any],
+    crossref_lookups: Dict[str, concurrent.futures.Future]
+) -> bool:
+    """
+    Ruft die Metadaten zu den Identifikatoren einer Quick-Analyse im Hintergrund ab
+    
+    Das Ergebnis ({"metadata", "identifiers"}) wird als Status von temp_id
+    abgelegt. Die Anfrage wartet so nicht auf CrossRef bzw. OpenLibrary, und
+    kein Worker-Thread blockiert auf einer bereits laufenden Abfrage.
+    
+    Args:
+        temp_id: Temporäre Dokument-ID
+        identifiers: Ergebnis der Identifikator-Extraktion
+        crossref_lookups: Bereits gestartete CrossRef-Abfragen nach DOI
+        
+    Returns:
+        bool: True, wenn ein Abruf gestartet wurde
+    """
+    if identifiers.get('doi'):
+        doi = identifiers['doi']
+        logger.info(f"DOI gefunden: {doi}, rufe Metadaten im Hintergrund ab")
+        lookup = crossref_lookups.get(doi) or _lookup_executor.submit(cached_fetch, doi)
+        convert = format_metadata_for_storage
+    elif identifiers.get('isbn'):
+        isbn = strip_isbn(identifiers['isbn'])
+        logger.info(f"ISBN gefunden: {isbn}, rufe Metadaten im Hintergrund ab")
+        # OpenLibrary-Abfrage mit persistentem Cache
+        lookup = _lookup_executor.submit(cached_openlibrary_fetch, isbn)
+        convert = lambda book_data: _metadata_from_openlibrary(book_data, isbn)
+    else:
+        return False
+    
+    status_service = get_status_service()
+    status_service.update_status(temp_id, "processing", progress=50, message="Metadaten werden abgerufen")
+    
+    def finish(future: concurrent.futures.Future):
+        metadata = {}
+        try:
+            data = future.result()
+            if data:
+                metadata = convert(data)
+                logger.info(f"Metadaten für temp_id {temp_id} erfolgreich abgerufen")
+        except Exception as e:
+            logger.warning(f"Fehler beim Abrufen der Metadaten für temp_id {temp_id}: {e}", exc_info=True)
+        
+        status_service.update_status(
+            temp_id,
+            "completed",
+            progress=100,
+            message="Metadaten abgerufen" if metadata else "Keine Metadaten gefunden",
+            result={"metadata": metadata, "identifiers": identifiers}
+        )
+        status_service.cleanup_status(temp_id, 600)
+    
+    lookup.add_done_callback(finish)
+    return True
+
 def quick_analyze(file) -> Tuple[Dict[str, Any], int]:
     """
     Führt eine schnelle Analyse für DOI/ISBN-Extraktion durch
@@ -440,6 +834,9 @@ def quick_analyze(file) -> Tuple[Dict[str, Any], int]:
         if not allowed_file(file.filename):
             raise APIError("Dateityp nicht erlaubt. Nur PDF-Dateien werden akzeptiert.", 400)
         
+        if not has_pdf_signature(file):
+            raise APIError("Die Datei ist kein gültiges PDF.", 400)
+        
         # Benutzer-ID holen
         user_id = get_user_id()
         logger.info(f"Führe Quick-Analyze für Benutzer {user_id} durch")
@@ -449,7 +846,7 @@ def quick_analyze(file) -> Tuple[Dict[str, Any], int]:
         filename = secure_filename(file.filename)
         user_upload_dir = get_upload_folder(user_id)
         filepath = os.path.join(user_upload_dir, f"temp_{temp_id}_{filename}")
-        file.save(filepath)
+        stream_to_disk(file, filepath)
         logger.info(f"Datei temporär gespeichert unter: {filepath}")
         
         # Extraktionseinstellungen konfigurieren
@@ -457,74 +854,30 @@ def quick_analyze(file) -> Tuple[Dict[str, Any], int]:
         perform_ocr = False
         
         # PDF-Processor für Extraktion verwenden
-        from services.pdf import get_pdf_processor
         pdf_processor = get_pdf_processor()
         
         try:
+            # CrossRef-Abfrage starten, sobald die erste DOI gefunden ist, und
+            # parallel die restlichen Seiten auslesen
+            crossref_lookups: Dict[str, concurrent.futures.Future] = {}
+            
+            def start_crossref_lookup(doi: str):
+                crossref_lookups[doi] = _lookup_executor.submit(cached_fetch, doi)
+            
             logger.info(f"Starte Identifikator-Extraktion aus {filepath}")
-            result = pdf_processor.extract_identifiers_only(filepath, max_pages)
+            result = pdf_processor.extract_identifiers_only(filepath, max_pages, on_doi=start_crossref_lookup)
             logger.info(f"Extraktionsergebnis: {result}")
             
-            # Metadaten abrufen, falls DOI gefunden wurde
-            metadata = {}
-            if result.get('doi'):
-                doi = result['doi']
-                logger.info(f"DOI gefunden: {doi}, versuche Metadaten abzurufen")
-                try:
-                    from api.metadata import fetch_metadata_from_crossref
-                    
-                    crossref_metadata = fetch_metadata_from_crossref(doi)
-                    
-                    # Wenn Metadaten abgerufen wurden
-                    if crossref_metadata:
-                        logger.info(f"Metadaten für DOI {doi} erfolgreich abgerufen")
-                        from utils.metadata_utils import format_metadata_for_storage
-                        metadata = format_metadata_for_storage(crossref_metadata)
-                except ImportError as e:
-                    logger.warning(f"Metadata-API nicht verfügbar: {e}")
-                except Exception as e:
-                    logger.warning(f"Fehler beim Abrufen der DOI-Metadaten: {e}", exc_info=True)
-            
-            # Falls ISBN gefunden, versuche OpenLibrary
-            elif result.get('isbn'):
-                isbn = result['isbn']
-                logger.info(f"ISBN gefunden: {isbn}, versuche Metadaten abzurufen")
-                try:
-                    import requests
-                    isbn = isbn.replace('-', '').replace(' ', '')
-                    url = f"https://openlibrary.org/api/books?bibkeys=ISBN:{isbn}&format=json&jscmd=data"
-                    
-                    response = requests.get(url, timeout=5)
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        key = f"ISBN:{isbn}"
-                        if key in data:
-                            book_data = data[key]
-                            # Extrahiere Buchtitel, Autoren, etc.
-                            authors = []
-                            if 'authors' in book_data:
-                                for author in book_data['authors']:
-                                    name = author.get('name', '')
-                                    authors.append({'name': name})
-                            
-                            metadata = {
-                                'title': book_data.get('title', ''),
-                                'authors': authors,
-                                'publisher': book_data.get('publishers', [{}])[0].get('name', '') if 'publishers' in book_data else '',
-                                'publicationDate': book_data.get('publish_date', ''),
-                                'isbn': isbn,
-                                'type': 'book'
-                            }
-                            logger.info(f"Buchmetadaten erfolgreich von OpenLibrary abgerufen")
-                except Exception as e:
-                    logger.warning(f"Fehler beim Abrufen der ISBN-Metadaten: {e}", exc_info=True)
+            # Metadaten im Hintergrund abrufen; das Ergebnis steht anschließend
+            # unter /status/<temp_id> bereit
+            metadata_pending = _start_quick_metadata_lookup(temp_id, result, crossref_lookups)
             
             logger.info(f"Quick-Analyze erfolgreich abgeschlossen für temp_id: {temp_id}")
             return {
                 "temp_id": temp_id,
                 "filename": filename,
-                "metadata": metadata,
+                "metadata": {},
+                "metadata_pending": metadata_pending,
                 "identifiers": result
             }, 200
             
@@ -536,6 +889,7 @@ def quick_analyze(file) -> Tuple[Dict[str, Any], int]:
                 "temp_id": temp_id,
                 "filename": filename,
                 "metadata": {},
+                "metadata_pending": False,
                 "identifiers": {"error": str(e)}
             }, 200
             
@@ -557,6 +911,7 @@ def analyze_document(file, settings: Dict[str, Any]) -> Tuple[Dict[str, Any], in
     Returns:
         tuple: (response, status_code)
     """
+    slot_reserved = False
     try:
         # Prüfe, ob Datei hochgeladen wurde
         if not file or file.filename == '':
@@ -565,6 +920,13 @@ def analyze_document(file, settings: Dict[str, Any]) -> Tuple[Dict[str, Any], in
         if not allowed_file(file.filename):
             raise APIError("Dateityp nicht erlaubt. Nur PDF-Dateien werden akzeptiert.", 400)
         
+        if not has_pdf_signature(file):
+            raise APIError("Die Datei ist kein gültiges PDF.", 400)
+        
+        # Bei voller Verarbeitungswarteschlange abweisen, bevor etwas gespeichert wird
+        reserve_processing_slot()
+        slot_reserved = True
+        
         # Benutzer-ID holen
         user_id = get_user_id()
         logger.info(f"Starte Dokumentenanalyse für Benutzer {user_id}")
@@ -575,9 +937,12 @@ def analyze_document(file, settings: Dict[str, Any]) -> Tuple[Dict[str, Any], in
         # Datei temporär speichern
         filename = secure_filename(file.filename)
         temp_filepath = os.path.join(get_upload_folder(user_id), f"temp_{document_id}_{filename}")
-        file.save(temp_filepath)
+        stream_to_disk(file, temp_filepath)
         logger.info(f"Temporäre Datei für Analyse gespeichert: {temp_filepath}")
         
+        # Zu große PDFs abweisen, bevor sie einen Verarbeitungs-Thread belegen
+        check_processing_limits(temp_filepath, settings)
+        
         # Job-Eintrag für asynchrone Verarbeitung erstellen
         get_status_service().update_status(
             status_id=document_id,
@@ -586,16 +951,9 @@ def analyze_document(file, settings: Dict[str, Any]) -> Tuple[Dict[str, Any], in
             message="Starte Analyse..."
         )
         
-        # Analyse im Hintergrund-Thread starten
-        document_processor = DocumentProcessor()
-        get_executor().submit(
-            lambda: document_processor.analyze(
-                filepath=temp_filepath,
-                document_id=document_id,
-                settings=settings,
-                cleanup_file_after=True
-            )
-        )
+        # Analyse im Hintergrund-Thread starten (mit Analyse-Cache und CrossRef)
+        submit_processing_task(analyze_document_background, temp_filepath, document_id, settings)
+        slot_reserved = False  # gehört jetzt der Hintergrundaufgabe
         
         # Job-ID für Status-Polling zurückgeben
         return {
@@ -610,6 +968,9 @@ def analyze_document(file, settings: Dict[str, Any]) -> Tuple[Dict[str, Any], in
     except Exception as e:
         logger.error(f"Fehler beim Starten der Dokumentenanalyse: {e}", exc_info=True)
         raise APIError(f"Fehler bei der Dokumentenanalyse: {str(e)}", 500)
+    finally:
+        if slot_reserved:
+            release_processing_slot()
 
 def get_analysis_status(document_id: str) -> Tuple[Dict[str, Any], int]:
     """
@@ -619,21 +980,11 @@ def get_analysis_status(document_id: str) -> Tuple[Dict[str, Any], int]:
         document_id: Dokument-ID
         
     Returns:
-        tuple: (response, status_code)
+        tuple: (response, status_code) - liegt das Ergebnis nur auf der Festplatte,
+            enthält die Antwort "_stream_file" statt "result"
     """
     try:
-        # Status abrufen
-        status_data = get_status_service().get_status(document_id)
-        
-        # Wenn abgeschlossen, Ergebnisse zurückgeben
-        if status_data.get("status") == "completed" and "result" in status_data:
-            return {
-                "status": "completed",
-                "result": status_data["result"]
-            }, 200
-        
-        # Wenn nicht abgeschlossen, nur Status zurückgeben
-        return status_data, 200
+        return get_analysis_results(document_id), 200
         
     except Exception as e:
         logger.error(f"Fehler beim Abrufen des Analysestatus: {e}", exc_info=True)
@@ -2,112 +2,219 @@
 """
 Module for document analysis without full processing
 """
-import os
 import logging
-import gc
 import time
-from typing import Dict, Any
+import concurrent.futures
+from typing import Dict, Any, Optional
 
 # Import services and utilities
-from services.documents.processor import DocumentProcessor
-from utils.file_utils import cleanup_file
-from utils.performance_utils import timeout_handler  # Updated to use performance_utils
+from services.documents.processor import get_document_processor
+from services.pdf import get_pdf_processor
+from utils.file_utils import cleanup_file_async
+from utils import analysis_cache
+from utils.crossref_cache import (
+    normalize_doi, get_cached as get_cached_crossref,
+    cached_fetch as fetch_metadata_from_crossref
+)
+from utils.metadata_utils import format_crossref_metadata
 from services.status_service import get_status_service
 
-# Import metadata retrieval functions
-try:
-    from api.metadata import fetch_metadata_from_crossref
-except ImportError:
-    def fetch_metadata_from_crossref(doi):
-        logging.warning(f"Metadata API not available. Cannot fetch metadata for DOI")
-        return None
-
 # Configure logging
 logger = logging.getLogger(__name__)
 
-@timeout_handler(max_seconds=120, cpu_limit=70)
-def analyze_document_background(filepath: str, document_id: str, settings: Dict[str, Any]):
+# Thread pool for CrossRef lookups that run alongside PDF processing; lookups
+# from concurrent analyses are coalesced into one request by api.metadata
+_crossref_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+
+# Maximum time to wait for CrossRef once the PDF has been processed
+CROSSREF_TIMEOUT_SECONDS = 10
+
+# Formatted CrossRef fields that are merged into the analysis metadata
+_CROSSREF_MERGE_KEYS = frozenset({
+    'title', 'authors', 'type', 'publicationDate', 'publisher', 'journal',
+    'volume', 'issue', 'pages', 'doi', 'isbn', 'abstract'
+})
+
+def _extract_doi(filepath: str) -> Optional[str]:
     """
-    Background task to analyze a document
+    Extract the DOI from the first two pages of the document
+    
+    Args:
+        filepath: Path to the document
+        
+    Returns:
+        str: Normalized DOI, or None if none was found
+    """
+    try:
+        identifiers = get_pdf_processor().extract_identifiers_only(filepath, max_pages=2)
+    except Exception as e:
+        logger.warning(f"Identifier extraction for CrossRef lookup failed: {e}")
+        return None
+    
+    doi = identifiers.get('doi')
+    return normalize_doi(doi) if doi else None
+
+def _start_crossref_lookup(doi: Optional[str]) -> Optional[concurrent.futures.Future]:
+    """
+    Start the CrossRef lookup for a DOI in the background
+    
+    Args:
+        doi: DOI returned by _extract_doi
+        
+    Returns:
+        Future resolving to the raw CrossRef metadata, or None if no DOI was given
+    """
+    if not doi:
+        return None
+    
+    logger.debug(f"Starting CrossRef lookup for DOI {doi} in background")
+    return _crossref_executor.submit(fetch_metadata_from_crossref, doi)
+
+def _collect_crossref_metadata(future: Optional[concurrent.futures.Future]) -> Dict[str, Any]:
+    """
+    Wait for a CrossRef lookup started by _start_crossref_lookup
+    
+    Args:
+        future: Future returned by _start_crossref_lookup
+        
+    Returns:
+        dict: Formatted CrossRef metadata (empty on timeout or error)
+    """
+    if future is None:
+        return {}
+    
+    try:
+        crossref_metadata = future.result(timeout=CROSSREF_TIMEOUT_SECONDS)
+    except concurrent.futures.TimeoutError:
+        logger.warning(f"CrossRef lookup did not finish within {CROSSREF_TIMEOUT_SECONDS}s, skipping enrichment")
+        return {}
+    except Exception as e:
+        logger.warning(f"CrossRef lookup failed: {e}")
+        return {}
+    
+    return format_crossref_metadata(crossref_metadata) if crossref_metadata else {}
+
+def _analysis_cache_key(filepath: str, settings: Dict[str, Any]) -> Optional[str]:
+    """
+    Build the analysis cache key from the file content and processing settings
     
     Args:
         filepath: Path to the document
-        document_id: Document ID
         settings: Processing settings
+        
+    Returns:
+        str: Cache key, or None if the file could not be hashed
     """
-    # Import app context 
-    from flask import current_app
-    app = current_app._get_current_object()
+    try:
+        return analysis_cache.make_key(analysis_cache.hash_file(filepath), settings)
+    except OSError as e:
+        logger.warning(f"Could not hash {filepath} for the analysis cache: {e}")
+        return None
+
+def analyze_document_background(filepath: str, document_id: str, settings: Dict[str, Any]):
+    """
+    Background task to analyze a document, submitted by the /analyze route
     
-    with app.app_context():
-        try:
-            # Initialisiere Verarbeitungseinstellungen
-            processing_settings = {
-                'maxPages': int(settings.get('maxPages', 0)),
-                'performOCR': bool(settings.get('performOCR', False)),
-                'chunkSize': int(settings.get('chunkSize', 1000)),
-                'chunkOverlap': int(settings.get('chunkOverlap', 200))
-            }
-            
-            # Aktualisiere Status
-            get_status_service().update_status(
-                status_id=document_id,
-                status="processing",
-                progress=10,
-                message="Analyzing document..."
-            )
-            
-            # Use the consolidated DocumentProcessor directly
-            document_processor = DocumentProcessor()
-            
-            # Analyze the document
-            result = document_processor.analyze(
-                filepath=filepath,
-                document_id=document_id,
-                settings=processing_settings,
-                cleanup_file_after=True
-            )
-            
-            # Convert result to dictionary
-            result_dict = result.to_dict()
-            
-            # Update status with results
+    Args:
+        filepath: Path to the document
+        document_id: Document ID
+        settings: Processing settings from the /analyze request; 'useCrossref':
+            True fetches CrossRef data to enrich the extracted metadata (off by
+            default, it costs a network round trip per document). Locally
+            cached CrossRef data is used either way
+    """
+    # Only config_manager is used below, so no Flask app context is pushed
+    # for the CPU-bound PDF work
+    try:
+        # Initialisiere Verarbeitungseinstellungen
+        processing_settings = {
+            'maxPages': int(settings.get('maxPages', 0)),
+            'performOCR': bool(settings.get('performOCR', False)),
+            'chunkSize': int(settings.get('chunkSize', 1000)),
+            'chunkOverlap': int(settings.get('chunkOverlap', 200))
+        }
+        
+        # Identical file analyzed before with the same settings: reuse the result
+        cache_key = _analysis_cache_key(filepath, processing_settings)
+        cached_result = analysis_cache.get_cached(cache_key) if cache_key else None
+        
+        # Otherwise a known paper: DOI from the first pages with cached CrossRef data
+        # and a prior analysis of the same DOI (local caches only, no network)
+        doi = None
+        crossref_cached = False
+        if cached_result is None:
+            doi = _extract_doi(filepath)
+            crossref_cached = bool(doi) and get_cached_crossref(doi) is not None
+            if crossref_cached:
+                cached_result = analysis_cache.get_cached_by_doi(doi, processing_settings)
+        
+        if cached_result is not None:
+            logger.info(f"Reusing cached analysis for document {document_id}")
+            cached_result['document_id'] = document_id
             get_status_service().update_status(
                 status_id=document_id,
                 status="completed",
                 progress=100,
                 message="Analysis complete",
-                result=result_dict
+                result=cached_result
             )
-            
-            # Cleanup Status after 10 minutes
             get_status_service().cleanup_status(document_id, 600)
-            
-            # Force garbage collection
-            gc.collect()
-            
-        except Exception as e:
-            logger.error(f"Error in document analysis: {e}", exc_info=True)
-            
-            # Update status to reflect error
-            get_status_service().update_status(
-                status_id=document_id,
-                status="error",
-                progress=0,
-                message=f"Error analyzing document: {str(e)}",
-                result={"error": str(e)}
-            )
-            
-            # Clean up temporary file
-            try:
-                if os.path.exists(filepath):
-                    cleanup_file(filepath)
-                    logger.debug(f"Cleaned up file {filepath} after error")
-            except Exception as cleanup_error:
-                logger.error(f"Error deleting temporary file {filepath}: {cleanup_error}")
-            
-            # Force garbage collection
-            gc.collect()
+            cleanup_file_async(filepath)
+            return
+        
+        # Aktualisiere Status
+        get_status_service().update_status(
+            status_id=document_id,
+            status="processing",
+            progress=10,
+            message="Analyzing document..."
+        )
+        
+        # Start CrossRef lookup so it overlaps with text extraction and chunking;
+        # a network request is only made when the caller asked for CrossRef
+        use_crossref = bool(settings.get('useCrossref', False))
+        crossref_future = _start_crossref_lookup(doi if use_crossref or crossref_cached else None)
+        
+        def enrich(result):
+            # Enrich extracted metadata with CrossRef data (non-empty fields from
+            # the PDF win) before the processor reports the final status
+            crossref_metadata = _collect_crossref_metadata(crossref_future)
+            if crossref_metadata:
+                metadata = result.metadata
+                enriched = {**metadata, **{k: v for k, v in crossref_metadata.items()
+                                           if v and k in _CROSSREF_MERGE_KEYS}}
+                enriched.update({k: v for k, v in metadata.items() if v})
+                result.metadata = enriched
+        
+        # Analyze with the shared DocumentProcessor instance; it reports the
+        # final status and schedules the status cleanup
+        result = get_document_processor().analyze(
+            filepath=filepath,
+            document_id=document_id,
+            settings=processing_settings,
+            cleanup_file_after=True,
+            on_result=enrich
+        )
+        
+        # Remember the result for identical uploads
+        if cache_key and result.success:
+            if analysis_cache.store(cache_key, result.to_dict()) and doi:
+                analysis_cache.store_doi(doi, processing_settings, cache_key)
+        
+    except Exception as e:
+        logger.error(f"Error in document analysis: {e}", exc_info=True)
+        
+        # Update status to reflect error
+        get_status_service().update_status(
+            status_id=document_id,
+            status="error",
+            progress=0,
+            message=f"Error analyzing document: {str(e)}",
+            result={"error": str(e)}
+        )
+        
+        # Clean up temporary file and collect garbage off the critical path
+        cleanup_file_async(filepath, collect_garbage=True)
 
 def get_analysis_results(document_id: str) -> Dict[str, Any]:
     """
@@ -117,17 +224,25 @@ def get_analysis_results(document_id: str) -> Dict[str, Any]:
         document_id: ID of the document to retrieve results for
     
     Returns:
-        Dict containing analysis results or error information
+        Dict containing analysis results or error information. If the result
+        is only on disk, it contains "_stream_file" with the path of the
+        results file instead of "result", so callers can send the file as is.
     """
-    # Direct use of the get_status_service function
-    status_data = get_status_service().get_status(document_id)
+    # Don't parse a result that is only on disk - it can be streamed instead
+    status_data = get_status_service().get_status(document_id, load_result=False)
     
-    # Check if status contains results
-    if status_data.get("status") == "completed" and "result" in status_data:
-        return {
-            "status": "completed",
-            "result": status_data["result"]
-        }
+    if status_data.get("status") == "completed":
+        if "result" in status_data:
+            return {
+                "status": "completed",
+                "result": status_data["result"]
+            }
+        if "result_file" in status_data:
+            return {
+                "status": "completed",
+                "_stream_file": status_data["result_file"]
+            }
     
     # If no results in status, return status as is
-    return status_data
\ No newline at end of file
+    status_data.pop("result_file", None)
+    return status_data
@@ -3,11 +3,32 @@
 Status tracking module for document processing - redirects to central status service
 THIS FILE IS DEPRECATED - Use services.status_service directly instead
 """
-import logging
+import warnings
 from typing import Dict, Any, Optional, Callable
 from services.status_service import get_status_service
 
-logger = logging.getLogger(__name__)
+__all__ = [
+    'update_document_status',
+    'get_document_status',
+    'register_status_callback',
+    'cleanup_status',
+    'save_status_to_file',
+    'load_status_from_file',
+]
+
+# Shims that have already emitted their deprecation warning in this process
+_warned = set()
+
+def _warn_once(name: str) -> None:
+    """Emits the deprecation warning for a shim once, pointing at its first caller"""
+    if name in _warned:
+        return
+    _warned.add(name)
+    warnings.warn(
+        f"{name}() is deprecated. Use services.status_service.get_status_service() directly instead.",
+        DeprecationWarning,
+        stacklevel=3
+    )
 
 def update_document_status(
     document_id: str, 
@@ -21,10 +42,7 @@ def update_document_status(
     
     Use get_status_service().update_status() directly instead
     """
-    logger.warning(
-        "DEPRECATED: update_document_status() is deprecated. "
-        "Use get_status_service().update_status() directly instead."
-    )
+    _warn_once("update_document_status")
     return get_status_service().update_status(
         status_id=document_id,
         status=status,
@@ -39,10 +57,7 @@ def get_document_status(document_id: str) -> Dict[str, Any]:
     
     Use get_status_service().get_status() directly instead
     """
-    logger.warning(
-        "DEPRECATED: get_document_status() is deprecated. "
-        "Use get_status_service().get_status() directly instead."
-    )
+    _warn_once("get_document_status")
     return get_status_service().get_status(document_id)
 
 def register_status_callback(document_id: str, callback: Callable) -> bool:
@@ -51,10 +66,7 @@ def register_status_callback(document_id: str, callback: Callable) -> bool:
     
     Use get_status_service().register_observer() directly instead
     """
-    logger.warning(
-        "DEPRECATED: register_status_callback() is deprecated. "
-        "Use get_status_service().register_observer() directly instead."
-    )
+    _warn_once("register_status_callback")
     return get_status_service().register_observer(document_id, callback)
 
 def cleanup_status(document_id: str, delay_seconds: int = 600) -> None:
@@ -63,10 +75,7 @@ def cleanup_status(document_id: str, delay_seconds: int = 600) -> None:
     
     Use get_status_service().cleanup_status() directly instead
     """
-    logger.warning(
-        "DEPRECATED: cleanup_status() is deprecated. "
-        "Use get_status_service().cleanup_status() directly instead."
-    )
+    _warn_once("cleanup_status")
     get_status_service().cleanup_status(document_id, delay_seconds)
 
 def save_status_to_file(document_id: str, status_data: Dict[str, Any]) -> bool:
@@ -74,11 +83,7 @@ def save_status_to_file(document_id: str, status_data: Dict[str, Any]) -> bool:
     DEPRECATED: Legacy function that used to save status to file
     Now uses central status service
     """
-    logger.warning(
-        "DEPRECATED: save_status_to_file() is deprecated. "
-        "Status is now handled by the central status service."
-    )
-    
+    _warn_once("save_status_to_file")
     status = status_data.get("status", "unknown")
     progress = status_data.get("progress")
     message = status_data.get("message")
@@ -97,8 +102,5 @@ def load_status_from_file(document_id: str) -> Optional[Dict[str, Any]]:
     DEPRECATED: Legacy function that used to load status from file
     Now uses central status service
     """
-    logger.warning(
-        "DEPRECATED: load_status_from_file() is deprecated. "
-        "Use get_status_service().get_status() directly instead."
-    )
+    _warn_once("load_status_from_file")
     return get_status_service().get_status(document_id)
\ No newline at end of file
@@ -7,12 +7,16 @@ zwischen Routing und Geschäftslogik.
 import os
 import json
 import logging
-from flask import Blueprint, jsonify, request, current_app, g
+import queue
+import time
+from flask import Blueprint, jsonify, request, current_app, g, Response, stream_with_context
 from werkzeug.utils import secure_filename
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional
 
 from utils.auth_middleware import optional_auth, requires_auth
 from utils.error_handler import APIError, safe_execution
+from utils.file_utils import stream_file, is_valid_document_id
+from services.status_service import get_status_service
 from . import controller
 
 # Logger konfigurieren
@@ -21,15 +25,68 @@ logger = logging.getLogger(__name__)
 # Blueprint für Document-API erstellen
 documents_bp = Blueprint('documents', __name__, url_prefix='/api/documents')
 
+# Maximale Seitengröße für die Dokumentliste
+MAX_DOCUMENTS_PAGE_SIZE = 500
+
+# Status, nach denen der Status-Stream endet
+_FINAL_STATUSES = frozenset({"completed", "completed_with_warnings", "error", "canceled", "inactive", "unknown"})
+
+# Sekunden ohne gesendetes Ereignis, nach denen der Stream einen Keepalive sendet
+STATUS_STREAM_KEEPALIVE_SECONDS = 15
+
+# Abstand (Sekunden), in dem der Stream die Statusdatei prüft; Observer feuern
+# nur im Worker-Prozess, der das Dokument verarbeitet
+STATUS_STREAM_POLL_SECONDS = 2
+
+# Maximale Dauer eines Streams (Sekunden), unterhalb des Gunicorn-Timeouts;
+# danach verbindet sich der Client (EventSource) selbst neu
+STATUS_STREAM_MAX_SECONDS = 90
+
+# Wartezeit (Millisekunden), die dem Client für das Neuverbinden empfohlen wird
+STATUS_STREAM_RETRY_MS = 1000
+
+@documents_bp.before_request
+def validate_document_id():
+    """Weist Dokument-IDs in der URL ab, die keine UUID sind (z.B. Pfad-Traversal)"""
+    document_id = (request.view_args or {}).get('document_id')
+    if document_id is not None and not is_valid_document_id(document_id):
+        return jsonify({"error": "Ungültige Dokument-ID"}), 400
+
 @documents_bp.route('', methods=['GET'])
 @optional_auth
 def list_documents():
-    """Listet alle Dokumente des Benutzers auf"""
+    """
+    Listet alle Dokumente des Benutzers auf
+    
+    Mit ?limit=N (und optional ?offset=M) wird nur eine Seite der nach
+    Uploaddatum sortierten Liste samt Gesamtanzahl zurückgegeben.
+    """
     try:
-        documents, status_code = controller.list_documents()
+        limit = request.args.get('limit')
+        offset = request.args.get('offset', '0')
+        sort = request.args.get('sort', 'uploadDate')
+        
+        if sort != 'uploadDate':
+            raise APIError("Sortierung wird nur nach 'uploadDate' unterstützt", 400)
+        
+        try:
+            limit = int(limit) if limit is not None else None
+            offset = int(offset)
+        except ValueError:
+            raise APIError("limit und offset müssen ganze Zahlen sein", 400)
+        
+        if (limit is not None and not 1 <= limit <= MAX_DOCUMENTS_PAGE_SIZE) or offset < 0:
+            raise APIError(f"limit muss zwischen 1 und {MAX_DOCUMENTS_PAGE_SIZE} liegen, offset darf nicht negativ sein", 400)
+        
+        documents, status_code = controller.list_documents(limit=limit, offset=offset)
+        
+        # Aus dem Index bereits serialisiert - unverändert durchreichen bzw. streamen
+        if isinstance(documents, (bytes, Iterator)):
+            return Response(documents, mimetype='application/json'), status_code
+        
         return jsonify(documents), status_code
     except APIError as e:
-        return jsonify(e.to_dict()), e.status_code
+        return jsonify(e.to_dict()), e.status_code, e.headers
     except Exception as e:
         logger.error(f"Unerwarteter Fehler beim Auflisten der Dokumente: {e}", exc_info=True)
         return jsonify({"error": "Interner Serverfehler"}), 500
@@ -42,7 +99,7 @@ def get_document(document_id):
         document, status_code = controller.get_document(document_id)
         return jsonify(document), status_code
     except APIError as e:
-        return jsonify(e.to_dict()), e.status_code
+        return jsonify(e.to_dict()), e.status_code, e.headers
     except Exception as e:
         logger.error(f"Unerwarteter Fehler beim Abrufen des Dokuments {document_id}: {e}", exc_info=True)
         return jsonify({"error": "Interner Serverfehler"}), 500
@@ -60,7 +117,7 @@ def save_document():
         metadata = {}
         if 'data' in request.form:
             try:
-                metadata = json.loads(request.form.get('data', '{}'))
+                metadata = current_app.json.loads(request.form.get('data', '{}'))
                 
                 # Prüfe auf Titel direkt im Formular (Fix)
                 if 'title' in request.form and request.form['title']:
@@ -73,7 +130,7 @@ def save_document():
                 # Prüfe auf Autoren direkt im Formular (Fix)
                 if 'authors' in request.form and request.form['authors']:
                     try:
-                        metadata['authors'] = json.loads(request.form['authors'])
+                        metadata['authors'] = current_app.json.loads(request.form['authors'])
                     except:
                         logger.warning("JSON für Autoren im Formularfeld konnte nicht geparst werden")
                 
@@ -87,7 +144,7 @@ def save_document():
         response, status_code = controller.save_document(file, metadata)
         return jsonify(response), status_code
     except APIError as e:
-        return jsonify(e.to_dict()), e.status_code
+        return jsonify(e.to_dict()), e.status_code, e.headers
     except Exception as e:
         logger.error(f"Unerwarteter Fehler beim Speichern des Dokuments: {e}", exc_info=True)
         return jsonify({"error": "Interner Serverfehler"}), 500
@@ -100,7 +157,7 @@ def delete_document(document_id):
         response, status_code = controller.delete_document(document_id)
         return jsonify(response), status_code
     except APIError as e:
-        return jsonify(e.to_dict()), e.status_code
+        return jsonify(e.to_dict()), e.status_code, e.headers
     except Exception as e:
         logger.error(f"Unerwarteter Fehler beim Löschen des Dokuments {document_id}: {e}", exc_info=True)
         return jsonify({"error": "Interner Serverfehler"}), 500
@@ -117,7 +174,7 @@ def update_document(document_id):
         response, status_code = controller.update_document(document_id, updated_metadata)
         return jsonify(response), status_code
     except APIError as e:
-        return jsonify(e.to_dict()), e.status_code
+        return jsonify(e.to_dict()), e.status_code, e.headers
     except Exception as e:
         logger.error(f"Unerwarteter Fehler beim Aktualisieren des Dokuments {document_id}: {e}", exc_info=True)
         return jsonify({"error": "Interner Serverfehler"}), 500
@@ -137,7 +194,7 @@ def quick_analyze():
         response, status_code = controller.quick_analyze(file)
         return jsonify(response), status_code
     except APIError as e:
-        return jsonify(e.to_dict()), e.status_code
+        return jsonify(e.to_dict()), e.status_code, e.headers
     except Exception as e:
         logger.error(f"Unerwarteter Fehler bei Quick-Analyze: {e}", exc_info=True)
         return jsonify({"error": "Interner Serverfehler"}), 500
@@ -145,7 +202,12 @@ def quick_analyze():
 @documents_bp.route('/analyze', methods=['POST'])
 @optional_auth
 def analyze_document():
-    """Analysiert ein Dokument ohne dauerhafte Speicherung"""
+    """
+    Analysiert ein Dokument ohne dauerhafte Speicherung
+    
+    Formularfeld 'data' (JSON, optional): maxPages, performOCR, chunkSize,
+    chunkOverlap und useCrossref (True ergänzt die Metadaten um CrossRef-Daten)
+    """
     try:
         if 'file' not in request.files:
             return jsonify({"error": "Keine Datei bereitgestellt"}), 400
@@ -158,14 +220,14 @@ def analyze_document():
         settings = {}
         if 'data' in request.form:
             try:
-                settings = json.loads(request.form.get('data', '{}'))
+                settings = current_app.json.loads(request.form.get('data', '{}'))
             except json.JSONDecodeError:
                 return jsonify({"error": "Ungültige JSON-Daten"}), 400
         
         response, status_code = controller.analyze_document(file, settings)
         return jsonify(response), status_code
     except APIError as e:
-        return jsonify(e.to_dict()), e.status_code
+        return jsonify(e.to_dict()), e.status_code, e.headers
     except Exception as e:
         logger.error(f"Unerwarteter Fehler beim Starten der Dokumentenanalyse: {e}", exc_info=True)
         return jsonify({"error": "Interner Serverfehler"}), 500
@@ -176,9 +238,22 @@ def get_analysis_status(document_id):
     """Holt den Status und die Ergebnisse einer Dokumentenanalyse"""
     try:
         response, status_code = controller.get_analysis_status(document_id)
+        
+        # Ergebnisdatei unverändert durchreichen statt sie zu parsen und neu zu kodieren
+        if "_stream_file" in response:
+            try:
+                body = stream_file(
+                    response["_stream_file"],
+                    prefix=b'{"status": "completed", "result": ',
+                    suffix=b'}'
+                )
+                return Response(body, mimetype='application/json'), status_code
+            except FileNotFoundError:
+                return jsonify(get_status_service().get_status(document_id)), status_code
+        
         return jsonify(response), status_code
     except APIError as e:
-        return jsonify(e.to_dict()), e.status_code
+        return jsonify(e.to_dict()), e.status_code, e.headers
     except Exception as e:
         logger.error(f"Unerwarteter Fehler beim Abrufen des Analysestatus: {e}", exc_info=True)
         return jsonify({"error": "Interner Serverfehler"}), 500
@@ -191,7 +266,7 @@ def cancel_processing(document_id):
         response, status_code = controller.cancel_processing(document_id)
         return jsonify(response), status_code
     except APIError as e:
-        return jsonify(e.to_dict()), e.status_code
+        return jsonify(e.to_dict()), e.status_code, e.headers
     except Exception as e:
         logger.error(f"Unerwarteter Fehler beim Abbrechen der Verarbeitung: {e}", exc_info=True)
         return jsonify({"error": "Interner Serverfehler"}), 500
@@ -201,9 +276,95 @@ def cancel_processing(document_id):
 def get_document_status(document_id):
     """Holt den Verarbeitungsstatus eines Dokuments"""
     try:
-        from services.status_service import get_document_status
-        status = get_document_status(document_id)
+        status = get_status_service().get_status(document_id, load_result=False)
+        
+        # Ergebnisdatei unverändert an den übrigen Status anhängen, statt sie zu
+        # parsen und neu zu kodieren
+        result_file = status.pop("result_file", None)
+        if result_file:
+            try:
+                head = current_app.json.dumps(status).rstrip()
+                body = stream_file(
+                    result_file,
+                    prefix=head[:-1].encode('utf-8') + b', "result": ',
+                    suffix=b'}'
+                )
+                return Response(body, mimetype='application/json')
+            except FileNotFoundError:
+                return jsonify(get_status_service().get_status(document_id))
+        
         return jsonify(status)
     except Exception as e:
         logger.error(f"Fehler beim Abrufen des Dokumentstatus: {e}", exc_info=True)
-        return jsonify({"error": "Interner Serverfehler"}), 500
\ No newline at end of file
+        return jsonify({"error": "Interner Serverfehler"}), 500
+
+@documents_bp.route('/status/<document_id>/stream', methods=['GET'])
+@optional_auth
+def stream_document_status(document_id):
+    """
+    Überträgt den Verarbeitungsstatus als Server-Sent Events, sobald er sich
+    ändert; der Stream endet mit dem ersten abschließenden Status
+    
+    Jeder offene Stream belegt einen Worker-Thread (Gunicorn mit gthread-Workern,
+    siehe Dockerfile). Nach STATUS_STREAM_MAX_SECONDS endet er, und der Client
+    verbindet sich neu.
+    """
+    status_service = get_status_service()
+    updates = queue.Queue()
+    observer = updates.put
+    
+    # Vor dem ersten Lesen registrieren, damit keine Änderung verloren geht
+    status_service.register_observer(document_id, observer)
+    
+    def newest(status: Dict[str, Any], other: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # Zeitstempel haben ein festes Format und sind daher als Text vergleichbar
+        if other and other.get("updated_at", "") > status.get("updated_at", ""):
+            return other
+        return status
+    
+    def events() -> Iterator[bytes]:
+        try:
+            deadline = time.monotonic() + STATUS_STREAM_MAX_SECONDS
+            status = newest(
+                status_service.get_status(document_id),
+                status_service.read_persisted_status(document_id, load_result=True)
+            )
+            yield f"retry: {STATUS_STREAM_RETRY_MS}\n".encode('ascii')
+            
+            while True:
+                yield b"data: " + current_app.json.dumps(status).encode('utf-8') + b"\n\n"
+                if status.get("status") in _FINAL_STATUSES:
+                    return
+                sent = status
+                idle = 0
+                
+                # Auf einen neueren Status warten; Observer-Benachrichtigungen
+                # können in falscher Reihenfolge eintreffen, ältere werden verworfen
+                while status is sent:
+                    if time.monotonic() >= deadline:
+                        return
+                    try:
+                        status = newest(sent, updates.get(timeout=STATUS_STREAM_POLL_SECONDS))
+                        continue
+                    except queue.Empty:
+                        pass
+                    
+                    # Statusdatei direkt lesen: deckt andere Worker-Prozesse und
+                    # bereinigte Status ab, die keine Observer mehr benachrichtigen
+                    persisted = status_service.read_persisted_status(document_id)
+                    status = newest(sent, persisted)
+                    if status is not sent and status.get("status") in _FINAL_STATUSES:
+                        status = status_service.read_persisted_status(document_id, load_result=True) or status
+                    elif status is sent:
+                        idle += STATUS_STREAM_POLL_SECONDS
+                        if idle >= STATUS_STREAM_KEEPALIVE_SECONDS:
+                            idle = 0
+                            yield b": keepalive\n\n"
+        finally:
+            status_service.unregister_observer(document_id, observer)
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
\ No newline at end of file
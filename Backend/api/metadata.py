@@ -2,15 +2,21 @@
 """
 Blueprint für Metadaten-API-Endpunkte
 """
-import requests
 import time
 import logging
 import os
+import concurrent.futures
+import queue
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 from flask import Blueprint, jsonify, request, current_app
 from urllib.parse import quote
 
 # Import refactored utility modules
 from utils.metadata_utils import format_crossref_metadata
+from utils.identifier_utils import strip_isbn
+from utils.crossref_cache import cached_fetch
+from utils.http_session import get_http_session
 
 # Logger einrichten
 logger = logging.getLogger(__name__)
@@ -21,52 +27,292 @@ metadata_bp = Blueprint('metadata', __name__, url_prefix='/api/metadata')
 # Konfigurationswerte
 CROSSREF_API_BASE_URL = "https://api.crossref.org/works"
 CROSSREF_EMAIL = os.environ.get('CROSSREF_EMAIL', 'your.email@example.com')
+CROSSREF_TIMEOUT_SECONDS = 10
+DOI_RA_API_URL = "https://doi.org/doiRA"
+DOI_RA_TIMEOUT_SECONDS = 5
+OPENLIBRARY_API_URL = "https://openlibrary.org/api/books"
+OPENLIBRARY_TIMEOUT_SECONDS = 5
+
+# Einzelabfragen verschiedener Threads werden gesammelt und als eine Anfrage
+# (works?filter=doi:...) gestellt: Sammelfenster und max. DOIs pro Anfrage
+CROSSREF_COALESCE_WINDOW_SECONDS = 0.1
+CROSSREF_COALESCE_MAX_DOIS = 20
 
 # Rate-Limiting - max. 1 Anfrage alle 2 Sekunden an CrossRef
 last_crossref_request = 0
+_rate_limit_lock = threading.Lock()
 
 def respect_rate_limit():
-    """Einfaches Rate-Limiting für CrossRef API"""
+    """Einfaches Rate-Limiting für CrossRef API (threadsicher)"""
     global last_crossref_request
-    current_time = time.time()
-    time_since_last = current_time - last_crossref_request
+    with _rate_limit_lock:
+        current_time = time.time()
+        time_since_last = current_time - last_crossref_request
+        
+        if time_since_last < 2.0:  # Mindestens 2 Sekunden zwischen Anfragen
+            time.sleep(2.0 - time_since_last)
+        
+        last_crossref_request = time.time()
+
+class _CrossrefBatcher:
+    """
+    Bündelt gleichzeitige Einzelabfragen zu einer CrossRef-Anfrage
+    
+    Ein Hintergrund-Thread sammelt DOIs, bis CROSSREF_COALESCE_MAX_DOIS
+    erreicht oder CROSSREF_COALESCE_WINDOW_SECONDS verstrichen sind, und fragt
+    sie gemeinsam über works?filter=doi:... ab. Jede Anfrage zählt nur einmal
+    für das Rate-Limiting, statt dass jede DOI 2 Sekunden wartet.
+    """
+    
+    def __init__(self):
+        self._queue: 'queue.Queue[Tuple[str, concurrent.futures.Future]]' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
     
-    if time_since_last < 2.0:  # Mindestens 2 Sekunden zwischen Anfragen
-        time.sleep(2.0 - time_since_last)
+    def submit(self, doi: str) -> 'concurrent.futures.Future':
+        """
+        Reiht eine DOI zur Abfrage ein
+        
+        Args:
+            doi: Digital Object Identifier
+            
+        Returns:
+            Future mit (Metadaten oder None, True wenn CrossRef die DOI nicht kennt)
+        """
+        future = concurrent.futures.Future()
+        self._queue.put((doi, future))
+        
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='crossref-batcher', daemon=True)
+                    self._thread.start()
+        
+        return future
     
-    last_crossref_request = time.time()
+    def _run(self):
+        """Sammelt eingereihte DOIs und beantwortet sie gebündelt"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + CROSSREF_COALESCE_WINDOW_SECONDS
+            
+            while len(batch) < CROSSREF_COALESCE_MAX_DOIS:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            results: Dict[str, Tuple[Optional[Dict[str, Any]], bool]] = {}
+            try:
+                dois = list(dict.fromkeys(doi for doi, _ in batch))
+                if len(dois) == 1:
+                    results[dois[0]] = _fetch_crossref_work_direct(dois[0])
+                else:
+                    results = _fetch_crossref_works_filtered(dois)
+            except Exception as e:
+                logger.error(f"Error fetching CrossRef metadata batch: {e}")
+            finally:
+                for doi, future in batch:
+                    future.set_result(results.get(doi, (None, False)))
 
-def fetch_metadata_from_crossref(doi):
+_crossref_batcher = _CrossrefBatcher()
+
+def _fetch_crossref_works_filtered(dois: List[str]) -> Dict[str, Tuple[Optional[Dict[str, Any]], bool]]:
     """
-    Metadaten von CrossRef abrufen
+    Fragt mehrere DOIs mit einer Anfrage über den Filter-Endpunkt ab
+    
+    DOIs mit Komma lassen sich nicht filtern und werden einzeln abgefragt.
+    
+    Args:
+        dois: Digital Object Identifiers (ohne Duplikate)
+        
+    Returns:
+        dict: DOI -> (Metadaten oder None, True wenn CrossRef die DOI nicht kennt)
+    """
+    results = {doi: _fetch_crossref_work_direct(doi) for doi in dois if ',' in doi}
+    filterable = [doi for doi in dois if ',' not in doi]
+    if not filterable:
+        return results
+    
+    respect_rate_limit()
+    
+    logger.info(f"Fetching CrossRef metadata for {len(filterable)} DOIs in one request")
+    response = get_http_session().get(
+        CROSSREF_API_BASE_URL,
+        params={
+            'filter': ','.join(f"doi:{doi}" for doi in filterable),
+            'rows': len(filterable),
+            'mailto': CROSSREF_EMAIL
+        },
+        timeout=CROSSREF_TIMEOUT_SECONDS
+    )
+    
+    if response.status_code != 200:
+        results.update((doi, (None, False)) for doi in filterable)
+        return results
+    
+    items = {
+        item.get('DOI', '').lower(): item
+        for item in response.json().get('message', {}).get('items', [])
+    }
+    for doi in filterable:
+        item = items.get(doi.lower())
+        # Fehlt eine DOI in der Filterantwort (z.B. Alias-DOI, abweichende
+        # Schreibweise, noch nicht indexiert), gilt sie nicht als unbekannt und
+        # wird nicht als Negativ-Eintrag gecacht; eine spätere Abfrage versucht
+        # es erneut. Einzelabfragen hier würden den Batcher pro DOI um das
+        # Rate-Limit von 2 Sekunden aufhalten
+        results[doi] = (item, False)
+    
+    return results
+
+def fetch_crossref_work(doi) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Metadaten von CrossRef abrufen und dabei "nicht gefunden" von Fehlern unterscheiden
+    
+    Gleichzeitige Abfragen aus mehreren Threads werden zu einer Anfrage gebündelt.
     
     Args:
         doi (str): Der Digital Object Identifier
         
     Returns:
-        dict: Metadaten oder None bei Fehler
+        tuple: (Metadaten oder None, True wenn CrossRef die DOI nicht kennt)
     """
     if not doi:
-        return None
+        return None, False
     
+    return _crossref_batcher.submit(doi).result()
+
+def _fetch_crossref_work_direct(doi: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """Fragt eine einzelne DOI direkt ab (siehe fetch_crossref_work)"""
     try:
         respect_rate_limit()
         
         url = f"{CROSSREF_API_BASE_URL}/{quote(doi, safe='')}"
-        headers = {
-            "User-Agent": f"SciLit2.0/1.0 ({CROSSREF_EMAIL})"
-        }
         
-        response = requests.get(url, headers=headers)
+        response = get_http_session().get(
+            url, params={'mailto': CROSSREF_EMAIL}, timeout=CROSSREF_TIMEOUT_SECONDS
+        )
         
         if response.status_code == 200:
-            return response.json().get('message')
+            return response.json().get('message'), False
             
-        return None
+        return None, response.status_code == 404
     except Exception as e:
         logger.error(f"Error fetching CrossRef metadata: {e}")
+        return None, False
+
+def fetch_metadata_from_crossref(doi):
+    """
+    Metadaten von CrossRef abrufen
+    
+    Args:
+        doi (str): Der Digital Object Identifier
+        
+    Returns:
+        dict: Metadaten oder None bei Fehler
+    """
+    return fetch_crossref_work(doi)[0]
+
+def fetch_doi_registration_agency(prefix: str) -> Optional[str]:
+    """
+    Registrierungsagentur eines DOI-Präfixes abfragen (z.B. "Crossref", "DataCite")
+    
+    Args:
+        prefix (str): DOI-Präfix, z.B. "10.5281"
+        
+    Returns:
+        str: Name der Agentur oder None bei Fehler bzw. unbekanntem Präfix
+    """
+    if not prefix:
+        return None
+    
+    try:
+        response = get_http_session().get(
+            f"{DOI_RA_API_URL}/{quote(prefix, safe='')}", timeout=DOI_RA_TIMEOUT_SECONDS
+        )
+        if response.status_code != 200:
+            return None
+        
+        entries = response.json()
+        if isinstance(entries, list) and entries:
+            return entries[0].get('RA')
+        return None
+    except Exception as e:
+        logger.error(f"Error fetching DOI registration agency for {prefix}: {e}")
         return None
 
+def fetch_openlibrary_book(isbn) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Buchdaten von OpenLibrary abrufen
+    
+    Args:
+        isbn (str): Bereinigte ISBN
+        
+    Returns:
+        tuple: (Buchdaten oder None, True wenn OpenLibrary die ISBN nicht kennt)
+    """
+    if not isbn:
+        return None, False
+    
+    try:
+        response = get_http_session().get(
+            OPENLIBRARY_API_URL,
+            params={'bibkeys': f"ISBN:{isbn}", 'format': 'json', 'jscmd': 'data'},
+            timeout=OPENLIBRARY_TIMEOUT_SECONDS
+        )
+        
+        if response.status_code != 200:
+            return None, False
+        
+        book_data = response.json().get(f"ISBN:{isbn}")
+        return book_data, book_data is None
+    except Exception as e:
+        logger.error(f"Error fetching OpenLibrary metadata: {e}")
+        return None, False
+
+def fetch_crossref_works(dois: List[str]) -> Dict[str, Tuple[Optional[Dict[str, Any]], bool]]:
+    """
+    Metadaten mehrerer DOIs von CrossRef abrufen (wie fetch_crossref_work)
+    
+    Je bis zu CROSSREF_COALESCE_MAX_DOIS DOIs werden mit einer Anfrage über den
+    Filter-Endpunkt abgefragt; jede Anfrage unterliegt dem Rate-Limiting.
+    
+    Args:
+        dois (list): Digital Object Identifiers
+        
+    Returns:
+        dict: DOI -> (Metadaten oder None, True wenn CrossRef die DOI nicht kennt)
+    """
+    unique_dois = list(dict.fromkeys(doi for doi in dois if doi))
+    results: Dict[str, Tuple[Optional[Dict[str, Any]], bool]] = {}
+    
+    for start in range(0, len(unique_dois), CROSSREF_COALESCE_MAX_DOIS):
+        part = unique_dois[start:start + CROSSREF_COALESCE_MAX_DOIS]
+        try:
+            works = _fetch_crossref_works_filtered(part)
+        except Exception as e:
+            logger.error(f"Error fetching CrossRef metadata batch: {e}")
+            works = {}
+        results.update((doi, works.get(doi, (None, False))) for doi in part)
+    
+    return results
+
+def fetch_metadata_from_crossref_batch(dois):
+    """
+    Metadaten mehrerer DOIs von CrossRef abrufen
+    
+    Args:
+        dois (list): Digital Object Identifiers
+        
+    Returns:
+        dict: DOI -> Metadaten (None bei Fehler)
+    """
+    return {doi: data for doi, (data, _) in fetch_crossref_works(dois).items()}
+
 @metadata_bp.route('/doi/<path:doi>', methods=['GET'])
 def get_doi_metadata(doi):
     """DOI-Metadaten von CrossRef abrufen"""
@@ -75,8 +321,9 @@ def get_doi_metadata(doi):
         if not doi or not doi.startswith('10.'):
             return jsonify({'error': 'Invalid DOI. DOIs start with "10."'}), 400
         
-        # Metadaten abrufen
-        crossref_metadata = fetch_metadata_from_crossref(doi)
+        # Metadaten abrufen (mit persistentem Cache; ?refresh=true fragt CrossRef neu ab)
+        force_refresh = request.args.get('refresh', '').lower() in ('1', 'true')
+        crossref_metadata = cached_fetch(doi, force_refresh=force_refresh)
         if not crossref_metadata:
             return jsonify({"error": "DOI not found"}), 404
             
@@ -97,7 +344,7 @@ def get_isbn_metadata(isbn):
     """ISBN-Metadaten abrufen"""
     try:
         # ISBN normalisieren
-        clean_isbn = isbn.replace('-', '').replace(' ', '')
+        clean_isbn = strip_isbn(isbn)
         
         if not clean_isbn or len(clean_isbn) not in [10, 13]:
             return jsonify({'error': 'Invalid ISBN. ISBN must be 10 or 13 digits.'}), 400
@@ -123,14 +370,10 @@ def search_metadata():
         respect_rate_limit()
         
         # CrossRef-Suche
-        url = f"{CROSSREF_API_BASE_URL}?query={quote(query)}&rows=5"
-        
-        headers = {
-            'User-Agent': f'SciLit2.0/1.0 ({CROSSREF_EMAIL})',
-        }
+        url = f"{CROSSREF_API_BASE_URL}?query={quote(query)}&rows=5&mailto={quote(CROSSREF_EMAIL)}"
         
         logger.info(f"CrossRef search for: {query}")
-        response = requests.get(url, headers=headers)
+        response = get_http_session().get(url, timeout=CROSSREF_TIMEOUT_SECONDS)
         
         if response.status_code != 200:
             return jsonify({'error': 'Error searching CrossRef'}), 500
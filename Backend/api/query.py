@@ -8,7 +8,6 @@ import logging
 import uuid
 import time
 import functools
-from datetime import datetime
 from flask import Blueprint, jsonify, request, current_app, Response, stream_with_context
 import requests
 import re
@@ -17,6 +16,9 @@ from typing import Dict, List, Any, Optional, Union, Callable
 # Import services
 from services.vector_storage import search_documents
 from services.citation_service import format_citation
+from utils.http_session import get_http_session
+from utils.metadata_utils import utc_now_iso
+from utils.file_utils import parse_json
 
 logger = logging.getLogger(__name__)
 
@@ -311,7 +313,7 @@ def generate_llm_response(
         """
         
         # LLM request with timeout
-        response = requests.post(
+        response = get_http_session().post(
             LLM_API_URL,
             headers={
                 "Content-Type": "application/json",
@@ -446,7 +448,7 @@ def stream_llm_response(
         """
         
         # LLM streaming request
-        response = requests.post(
+        response = get_http_session().post(
             LLM_API_URL,
             headers={
                 "Content-Type": "application/json",
@@ -479,12 +481,13 @@ def stream_llm_response(
                 if not line.startswith(b'data: '):
                     continue
                 
-                data_str = line[6:].decode('utf-8')
-                if data_str == '[DONE]':
+                # Parse the payload as bytes - no intermediate str per event
+                data_bytes = line[6:]
+                if data_bytes == b'[DONE]':
                     break
                 
                 try:
-                    data = json.loads(data_str)
+                    data = parse_json(data_bytes)
                     
                     # Extract content delta
                     delta = data.get('choices', [{}])[0].get('delta', {})
@@ -563,7 +566,7 @@ def stream_llm_response(
                         break
                 
                 except json.JSONDecodeError:
-                    logger.warning(f"Failed to parse LLM stream data: {data_str}")
+                    logger.warning(f"Failed to parse LLM stream data: {data_bytes!r}")
                     continue
         else:
             logger.error(f"LLM API streaming error: {response.status_code}")
@@ -614,7 +617,7 @@ def save_query():
         # Success response
         return jsonify({
             "id": "query_" + str(uuid.uuid4()),
-            "timestamp": datetime.utcnow().isoformat() + 'Z',
+            "timestamp": utc_now_iso(),
             "saved": True
         })
     
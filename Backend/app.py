@@ -3,6 +3,7 @@
 Hauptanwendung für das SciLit2.0-Backend mit verbesserter Initialisierung
 und sauberer Auftrennungen der Verantwortlichkeiten.
 """
+import atexit
 import logging
 import time
 import concurrent.futures
@@ -16,6 +17,8 @@ from services.registry import initialize_services, get
 from services.status_service import initialize_status_service
 from utils.error_handler import configure_error_handlers, APIError
 from utils.file_utils import allowed_file  # Updated to use file_utils
+from utils.json_provider import OrjsonProvider
+from utils.performance_utils import configure_gc
 
 # Verhindere .pyc-Dateien
 sys.dont_write_bytecode = True
@@ -72,6 +75,35 @@ def check_embeddings():
     except Exception as e:
         logger.warning(f"Ollama-Prüfung fehlgeschlagen: {e}")
 
+def prewarm_services():
+    """Erstellt Singletons, die sonst erst bei der ersten Anfrage entstehen"""
+    try:
+        from services.pdf import get_pdf_processor
+        from services.documents.processor import get_document_processor
+        from utils.http_session import get_http_session
+        
+        get_pdf_processor()
+        get_document_processor()
+        get_http_session()
+        logger.info("PDF-Processor und HTTP-Session vorgewärmt")
+    except Exception as e:
+        logger.warning(f"Vorwärmen der Services fehlgeschlagen: {e}")
+
+def start_temp_file_reaper(interval_seconds: int = 60 * 60):
+    """Startet einen Hintergrund-Thread, der stündlich verwaiste temporäre Uploads löscht"""
+    import threading
+    from utils.file_utils import reap_temp_files
+    
+    def _reap_periodically():
+        while True:
+            try:
+                reap_temp_files()
+            except Exception as e:
+                logger.warning(f"Bereinigung temporärer Dateien fehlgeschlagen: {e}")
+            time.sleep(interval_seconds)
+    
+    threading.Thread(target=_reap_periodically, name="temp-file-reaper", daemon=True).start()
+
 def init_directories():
     """Initialisiert benötigte Verzeichnisse"""
     try:
@@ -105,8 +137,14 @@ def create_app():
     # Initialisiere Verzeichnisse
     init_directories()
     
+    # Seltenere Garbage-Collection-Läufe während der Dokumentverarbeitung
+    configure_gc()
+    
     # Erstelle Flask-App
     app = Flask(__name__)
+    
+    # jsonify() und request.get_json() über orjson
+    app.json = OrjsonProvider(app)
 
     # Konfiguriere CORS
     CORS(app, 
@@ -156,6 +194,12 @@ def create_app():
 
     # Hintergrundprüfung für Embeddings starten
     background_executor.submit(check_embeddings)
+    
+    # PDF-Verarbeitung vorwärmen, damit die erste Anfrage nicht darauf wartet
+    background_executor.submit(prewarm_services)
+    
+    # Verwaiste temporäre Uploads regelmäßig löschen
+    start_temp_file_reaper()
 
     # Health Check
     @app.route('/')
@@ -192,9 +236,9 @@ def create_app():
                 response.headers['X-Request-ID'] = g.request_id
         return response
 
-    # Shutdown
-    @app.teardown_appcontext
-    def shutdown(_):
+    # Shutdown; nicht über teardown_appcontext, das nach jeder Anfrage läuft
+    @atexit.register
+    def shutdown():
         """Bereinigt Ressourcen beim Herunterfahren"""
         try:
             logger.info("Fahre Executors herunter...")
@@ -33,6 +33,18 @@ def initialize():
         
         # Limits
         'MAX_CONTENT_LENGTH': int(os.environ.get('MAX_CONTENT_LENGTH', 20 * 1024 * 1024)),
+        # Parallel verarbeitete Dokumente (SCILIT_DOC_WORKERS); Standard ist die
+        # Anzahl der CPU-Kerne, höchstens 16
+        'DOC_WORKERS': max(1, int(os.environ.get('SCILIT_DOC_WORKERS', min(16, os.cpu_count() or 4)))),
+        # Prozesse für die Seitenextraktion pro Worker-Prozess (SCILIT_PAGE_WORKERS);
+        # Standard: die CPU-Kerne bis auf einen, aufgeteilt auf die Gunicorn-Worker
+        # (WEB_CONCURRENCY)
+        'PAGE_WORKERS': max(1, int(os.environ.get(
+            'SCILIT_PAGE_WORKERS',
+            ((os.cpu_count() or 2) - 1) // max(1, int(os.environ.get('WEB_CONCURRENCY', 1)))
+        ))),
+        # PDFs mit mehr Seiten werden schon beim Upload abgewiesen (SCILIT_MAX_PDF_PAGES)
+        'MAX_PDF_PAGES': int(os.environ.get('SCILIT_MAX_PDF_PAGES', 2000)),
         
         # Sicherheit
         'SECRET_KEY': os.environ.get('SECRET_KEY', secrets.token_hex(32)),
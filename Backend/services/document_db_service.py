@@ -6,6 +6,8 @@ import uuid
 import mysql.connector
 from dotenv import load_dotenv
 
+from utils.file_utils import read_json, write_json
+
 logger = logging.getLogger(__name__)
 
 class DocumentDBService:
@@ -113,10 +115,7 @@ class DocumentDBService:
                 })
                 
                 # Save to file
-                with open(metadata_file, 'w') as f:
-                    json.dump(metadata_to_save, f, indent=2)
-                
-                return True
+                return write_json(metadata_file, metadata_to_save)
             except Exception as file_err:
                 logger.error(f"Fallback storage error: {str(file_err)}")
                 return False
@@ -178,11 +177,7 @@ class DocumentDBService:
                 }
                 
                 # Save status to file
-                os.makedirs(os.path.dirname(status_file), exist_ok=True)
-                with open(status_file, 'w') as f:
-                    json.dump(status_data, f, indent=2)
-                
-                return True
+                return write_json(status_file, status_data)
             except Exception as file_err:
                 logger.error(f"Fallback status update error: {str(file_err)}")
                 return False
@@ -246,10 +241,9 @@ class DocumentDBService:
                     for file in files:
                         if file.endswith('.json'):
                             try:
-                                with open(os.path.join(root, file), 'r') as f:
-                                    doc = json.load(f)
-                                    if doc.get('user_id') == user_id:
-                                        documents.append(doc)
+                                doc = read_json(os.path.join(root, file))
+                                if doc and doc.get('user_id') == user_id:
+                                    documents.append(doc)
                             except Exception as file_err:
                                 logger.error(f"Error reading document file: {str(file_err)}")
                 
@@ -299,11 +293,10 @@ class DocumentDBService:
                         for file in files:
                             if file.startswith(f"{document_id}_") and file.endswith('.json'):
                                 try:
-                                    with open(os.path.join(root, file), 'r') as f:
-                                        doc = json.load(f)
-                                        if doc.get('id') == document_id:
-                                            document = doc
-                                            doc_path = doc.get('file_path')
+                                    doc = read_json(os.path.join(root, file))
+                                    if doc and doc.get('id') == document_id:
+                                        document = doc
+                                        doc_path = doc.get('file_path')
                                 except Exception:
                                     pass
                     
@@ -5,24 +5,90 @@ Responsible for orchestrating processing, storage, and status management.
 """
 import os
 import logging
-import gc
 import uuid
-from datetime import datetime
-from typing import Dict, Any, Optional, Callable, List, Tuple, Union
+import threading
+from typing import Dict, Any, Optional, Callable, List, Tuple, Union, Iterable, Iterator
 
 from flask import current_app
 from services.pdf import get_pdf_processor
 # Use direct VectorStorage import instead of legacy functions
 from services.vector_storage import get_vector_storage
-from utils.file_utils import write_json, read_json, cleanup_file
-from utils.metadata_utils import format_metadata_for_storage
+from utils.file_utils import read_json, cleanup_file_async
+from utils import document_index
+from utils.metadata_utils import format_metadata_for_storage, utc_now_iso
+from utils.performance_utils import ThrottledProgress, collect_garbage_if_needed
 from config import config_manager
 
 # Status management
-from services.status_service import update_document_status, cleanup_status
+from services.status_service import update_document_status, cleanup_status, get_status_service
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of chunks included in API responses and status results
+MAX_CHUNKS_IN_RESPONSE = 100
+
+# Default budget of chunk text (characters) stored in the vector database per
+# document; can be overridden with the maxCharsPerDoc setting
+MAX_STORED_CHARS = 1_000_000
+
+# Fields extracted from the PDF that are copied into the document metadata
+_EXTRACTED_METADATA_KEYS = ('doi', 'isbn', 'totalPages', 'processedPages')
+
+# Singleton instance, created lazily once per worker process
+_processor_instance = None
+_processor_lock = threading.Lock()
+
+class _ChunkTally:
+    """
+    Passes streamed chunks through while counting them and keeping the first
+    ones for the response, so the full chunk list is never materialized
+    """
+    
+    def __init__(self, chunks: Iterable[Dict[str, Any]], keep: int):
+        self._chunks = chunks
+        self._keep = keep
+        self.kept: List[Dict[str, Any]] = []
+        self.count = 0
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for chunk in self._chunks:
+            self.count += 1
+            if len(self.kept) < self._keep:
+                self.kept.append(chunk)
+            yield chunk
+
+class _CharBudget:
+    """Passes chunks through until their combined text would exceed a character budget"""
+    
+    def __init__(self, chunks: Iterable[Dict[str, Any]], budget: int):
+        self._chunks = chunks
+        self._budget = budget
+        self.chars = 0
+        self.count = 0
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for chunk in self._chunks:
+            size = len(chunk.get('text', ''))
+            if self.chars + size > self._budget:
+                return
+            self.chars += size
+            self.count += 1
+            yield chunk
+
+def _max_stored_chars(settings: Dict[str, Any]) -> int:
+    """Reads the maxCharsPerDoc setting, falling back to MAX_STORED_CHARS for missing or invalid values"""
+    value = settings.get('maxCharsPerDoc')
+    if value is None:
+        return MAX_STORED_CHARS
+    try:
+        max_chars = int(value)
+    except (TypeError, ValueError):
+        max_chars = 0
+    if max_chars <= 0:
+        logger.warning(f"Invalid maxCharsPerDoc {value!r}, using {MAX_STORED_CHARS}")
+        return MAX_STORED_CHARS
+    return max_chars
+
 class DocumentProcessingResult:
     """Standardized result object for document processing"""
     
@@ -33,7 +99,8 @@ class DocumentProcessingResult:
                 metadata: Dict[str, Any] = None,
                 chunks: List[Dict[str, Any]] = None,
                 text: str = "",
-                error: Optional[Exception] = None):
+                error: Optional[Exception] = None,
+                total_chunks: Optional[int] = None):
         """
         Initialize the result object
         
@@ -45,15 +112,17 @@ class DocumentProcessingResult:
             chunks: Extracted text chunks
             text: Complete extracted text
             error: Exception if processing failed
+            total_chunks: Number of chunks before truncation (defaults to len(chunks))
         """
         self.document_id = document_id
         self.success = success
         self.message = message
         self.metadata = metadata or {}
         self.chunks = chunks or []
+        self.total_chunks = total_chunks if total_chunks is not None else len(self.chunks)
         self.text = text
         self.error = error
-        self.processing_time = datetime.utcnow().isoformat() + 'Z'
+        self.processing_time = utc_now_iso()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert the result to a dictionary"""
@@ -62,18 +131,17 @@ class DocumentProcessingResult:
             "success": self.success,
             "message": self.message,
             "metadata": self.metadata,
-            "chunks_count": len(self.chunks),
+            "chunks_count": self.total_chunks,
             "text_length": len(self.text),
             "processing_time": self.processing_time
         }
         
         # For API responses only return limited number of chunks
         if self.chunks:
-            MAX_CHUNKS_IN_RESPONSE = 100
-            if len(self.chunks) > MAX_CHUNKS_IN_RESPONSE:
+            if self.total_chunks > MAX_CHUNKS_IN_RESPONSE:
                 result["chunks"] = self.chunks[:MAX_CHUNKS_IN_RESPONSE]
                 result["limited_chunks"] = True
-                result["total_chunks"] = len(self.chunks)
+                result["total_chunks"] = self.total_chunks
             else:
                 result["chunks"] = self.chunks
         
@@ -102,7 +170,8 @@ class DocumentProcessor:
                metadata: Optional[Dict[str, Any]] = None,
                settings: Optional[Dict[str, Any]] = None,
                store: bool = True, 
-               cleanup_file_after: bool = False) -> DocumentProcessingResult:
+               cleanup_file_after: bool = False,
+               on_result: Optional[Callable[[DocumentProcessingResult], None]] = None) -> DocumentProcessingResult:
         """
         Process a document with optional storage
         
@@ -113,16 +182,16 @@ class DocumentProcessor:
             settings: Processing settings
             store: Whether to store in vector database
             cleanup_file_after: Whether to delete file after processing
+            on_result: Optional callback that may amend the result before the
+                final status is reported
             
         Returns:
             DocumentProcessingResult: Processing result
         """
-        # Enable garbage collection
-        gc.enable()
-        
         # Default values
         metadata = metadata or {}
         settings = settings or {}
+        max_stored_chars = _max_stored_chars(settings)
         
         try:
             # Initialize status
@@ -141,34 +210,49 @@ class DocumentProcessor:
                 message="Validating document..."
             )
             
-            valid, validation_result = self._validate_document(filepath)
+            # Open and validate once; the opened document is reused for extraction
+            doc, valid, validation_result = self.pdf_processor.open_and_validate(filepath)
             if not valid:
-                raise ValueError(f"Document validation failed: {validation_result}")
+                logger.error(f"Error validating document: {validation_result}")
+                raise ValueError(f"Document validation failed: Invalid PDF file: {validation_result}")
             
-            # Process PDF - delegate to PDFProcessor
-            update_document_status(
-                document_id=document_id,
-                status="processing",
-                progress=30,
-                message="Extracting text and metadata..."
-            )
-            
-            # Process PDF using the dedicated PDF processor
-            pdf_result = self.pdf_processor.process_file(
-                filepath,
-                settings,
-                progress_callback=lambda msg, pct: update_document_status(
+            try:
+                # Process PDF - delegate to PDFProcessor
+                update_document_status(
                     document_id=document_id,
                     status="processing",
-                    progress=30 + int(pct * 0.5),  # 30% - 80%
-                    message=msg
+                    progress=30,
+                    message="Extracting text and metadata..."
                 )
-            )
+                
+                # Process PDF using the dedicated PDF processor; per-page progress
+                # updates are throttled and batched so only the latest state hits the disk
+                progress = ThrottledProgress(
+                    lambda msg, pct: update_document_status(
+                        document_id=document_id,
+                        status="processing",
+                        progress=30 + int(pct * 0.5),  # 30% - 80%
+                        message=msg
+                    )
+                )
+                with get_status_service().batch():
+                    # When storing, chunks are streamed into the vector database
+                    # instead of being built up front
+                    pdf_result = self.pdf_processor.process_file(
+                        filepath,
+                        settings,
+                        progress_callback=progress,
+                        doc=doc,
+                        stream_chunks=store
+                    )
+                    progress.flush()
+            finally:
+                doc.close()
             
             # Update metadata with extracted information
             extracted_metadata = pdf_result.get('metadata', {})
             if extracted_metadata:
-                for key in ['doi', 'isbn', 'totalPages', 'processedPages']:
+                for key in _EXTRACTED_METADATA_KEYS:
                     if key in extracted_metadata and extracted_metadata[key]:
                         metadata[key] = extracted_metadata[key]
             
@@ -181,63 +265,68 @@ class DocumentProcessor:
                     message="Storing chunks in vector database..."
                 )
             
-            # Prepare result object
+            # Prepare result object; analyze() caps the chunks in the PDF processor
             chunks = pdf_result.get('chunks', [])
             result = DocumentProcessingResult(
                 document_id=document_id,
                 success=True,
                 message="Document successfully processed",
                 metadata=metadata,
-                chunks=chunks,
-                text=pdf_result.get('text', '')
+                chunks=chunks if not store else [],
+                text=pdf_result.get('text', ''),
+                total_chunks=pdf_result.get('total_chunks') if not store else 0
             )
             
             # Store in vector database if requested
-            if store and chunks and len(chunks) > 0:
-                # Apply reasonable chunk limit
-                max_chunks = min(len(chunks), 500)
-                limited_chunks = chunks[:max_chunks]
-                
+            if store:
                 # Format metadata for storage
-                user_id = metadata.get('user_id', 'default_user')
                 formatted_metadata = format_metadata_for_storage(metadata)
                 
-                # Store in vector database
+                tally = _ChunkTally(chunks, MAX_CHUNKS_IN_RESPONSE)
+                tally_iter = iter(tally)
+                budget = _CharBudget(tally_iter, max_stored_chars)
+                
+                # Store in vector database, up to the character budget
                 try:
                     self.vector_storage.store_document_chunks(
                         document_id=document_id,
-                        chunks=limited_chunks,
+                        chunks=budget,
                         metadata=formatted_metadata
                     )
                     
-                    logger.info(f"Document {document_id} with {len(limited_chunks)} chunks stored")
-                    
-                    # Update metadata
-                    result.metadata['processed'] = True
-                    result.metadata['num_chunks'] = len(limited_chunks)
-                    result.metadata['chunk_size'] = settings.get('chunkSize', 1000)
-                    result.metadata['chunk_overlap'] = settings.get('chunkOverlap', 200)
+                    stored_chunks = budget.count
+                    if stored_chunks > 0:
+                        logger.info(f"Document {document_id} with {stored_chunks} chunks stored")
+                        
+                        # Update metadata
+                        result.metadata['processed'] = True
+                        result.metadata['num_chunks'] = stored_chunks
+                        result.metadata['chunk_size'] = settings.get('chunkSize', 1000)
+                        result.metadata['chunk_overlap'] = settings.get('chunkOverlap', 200)
                     
                 except Exception as e:
                     logger.error(f"Error storing in vector database: {e}")
                     result.message = f"Document processed, but error storing: {str(e)}"
                     result.success = False
+                
+                # Chunks beyond the budget are only counted; the tally has already
+                # kept the chunk that exceeded the budget, so it is dropped here
+                result.chunks = tally.kept[:budget.count]
+                result.total_chunks = tally.count + sum(1 for _ in tally_iter)
+                if budget.count < result.total_chunks:
+                    logger.info(f"Document {document_id}: character budget reached, stored "
+                                f"{budget.count}/{result.total_chunks} chunks "
+                                f"({budget.count / result.total_chunks:.0%}, {budget.chars} chars)")
             
             # Save metadata as JSON file
             if store:
-                metadata_path = f"{filepath}.json"
                 # Add processing completion to metadata
                 metadata['processingComplete'] = result.success
                 metadata['processedDate'] = result.processing_time
-                write_json(metadata_path, metadata)
+                document_index.save_metadata(metadata.get('user_id'), document_id, filepath, metadata)
             
-            # Clean up file if requested
-            if cleanup_file_after and os.path.exists(filepath):
-                try:
-                    cleanup_file(filepath)
-                    logger.debug(f"File {filepath} deleted after processing")
-                except Exception as e:
-                    logger.warning(f"Error deleting file {filepath}: {e}")
+            if on_result:
+                on_result(result)
             
             # Update status
             status = "completed" if result.success else "completed_with_warnings"
@@ -252,8 +341,11 @@ class DocumentProcessor:
             # Clean up status after 10 minutes
             cleanup_status(document_id, 600)
             
-            # Force garbage collection
-            gc.collect()
+            # Delete file and collect garbage in the background once the status is final
+            if cleanup_file_after:
+                cleanup_file_async(filepath, collect_garbage=True)
+            else:
+                collect_garbage_if_needed()
             
             return result
             
@@ -282,22 +374,17 @@ class DocumentProcessor:
                             
                     metadata['processingComplete'] = False
                     metadata['processingError'] = str(e)
-                    metadata['processedDate'] = datetime.utcnow().isoformat() + 'Z'
+                    metadata['processedDate'] = utc_now_iso()
                     
-                    write_json(metadata_path, metadata)
+                    document_index.save_metadata(metadata.get('user_id'), document_id, filepath, metadata)
                 except Exception as metadata_err:
                     logger.error(f"Error saving error metadata for {document_id}: {metadata_err}")
             
-            # Clean up file on error if requested
-            if cleanup_file_after and os.path.exists(filepath):
-                try:
-                    cleanup_file(filepath)
-                    logger.debug(f"File {filepath} deleted after error")
-                except Exception as cleanup_err:
-                    logger.warning(f"Error deleting file {filepath}: {cleanup_err}")
-            
-            # Force garbage collection
-            gc.collect()
+            # Clean up file on error if requested (in the background)
+            if cleanup_file_after:
+                cleanup_file_async(filepath, collect_garbage=True)
+            else:
+                collect_garbage_if_needed()
             
             # Return error result
             return DocumentProcessingResult(
@@ -312,7 +399,8 @@ class DocumentProcessor:
                filepath: str, 
                document_id: str,
                settings: Optional[Dict[str, Any]] = None,
-               cleanup_file_after: bool = True) -> DocumentProcessingResult:
+               cleanup_file_after: bool = True,
+               on_result: Optional[Callable[[DocumentProcessingResult], None]] = None) -> DocumentProcessingResult:
         """
         Analyze a document without permanent storage
         
@@ -321,39 +409,42 @@ class DocumentProcessor:
             document_id: Document ID
             settings: Processing settings
             cleanup_file_after: Whether to delete file after analysis
+            on_result: Optional callback that may amend the result before the
+                final status is reported
             
         Returns:
             DocumentProcessingResult: Analysis result
         """
-        # Process document without storage
+        # Process document without storage; only the chunks returned in the
+        # response are built
         return self.process(
             filepath=filepath,
             document_id=document_id,
             metadata={},
-            settings=settings,
+            settings={**(settings or {}), 'maxChunks': MAX_CHUNKS_IN_RESPONSE},
             store=False,
-            cleanup_file_after=cleanup_file_after
+            cleanup_file_after=cleanup_file_after,
+            on_result=on_result
         )
+
+def get_document_processor() -> DocumentProcessor:
+    """
+    Get the shared DocumentProcessor instance
     
-    def _validate_document(self, filepath: str) -> Tuple[bool, str]:
-        """
-        Validate document and return success and result
-        
-        Args:
-            filepath: Path to document file
-            
-        Returns:
-            tuple: (is_valid, validation_result)
-        """
-        try:
-            # Delegate validation to PDF processor
-            is_valid, validation_result = self.pdf_processor.validate_pdf(filepath)
-            if not is_valid:
-                raise ValueError(f"Invalid PDF file: {validation_result}")
-            return True, validation_result
-        except Exception as e:
-            logger.error(f"Error validating document: {str(e)}")
-            return False, str(e)
+    The processor holds no per-document state, so a single instance can be
+    reused across requests and background threads.
+    
+    Returns:
+        DocumentProcessor: Shared processor instance
+    """
+    global _processor_instance
+    
+    if _processor_instance is None:
+        with _processor_lock:
+            if _processor_instance is None:
+                _processor_instance = DocumentProcessor()
+    
+    return _processor_instance
 
 # Function for background processing
 def process_document_background(filepath: str, document_id: str, metadata: Dict[str, Any], settings: Dict[str, Any]):
@@ -369,10 +460,9 @@ def process_document_background(filepath: str, document_id: str, metadata: Dict[
     try:
         # Get app context (if in Flask application)
         try:
-            from flask import current_app
             app = current_app._get_current_object()
             with app.app_context():
-                document_processor = DocumentProcessor()
+                document_processor = get_document_processor()
                 document_processor.process(
                     filepath=filepath,
                     document_id=document_id,
@@ -381,9 +471,9 @@ def process_document_background(filepath: str, document_id: str, metadata: Dict[
                     store=True,
                     cleanup_file_after=False
                 )
-        except (ImportError, RuntimeError):
+        except RuntimeError:
             # If running outside Flask
-            document_processor = DocumentProcessor()
+            document_processor = get_document_processor()
             document_processor.process(
                 filepath=filepath,
                 document_id=document_id,
@@ -1,5 +1,6 @@
 # Backend/services/ollama_embeddings.py
 import requests
+from requests.adapters import HTTPAdapter
 import numpy as np
 import logging
 import time
@@ -21,7 +22,8 @@ class OllamaEmbeddingFunction(EmbeddingFunction):
         fallback_dimension: int = 3072,  # Updated default for Llama3
         max_retries: int = 3,
         retry_delay: float = 1.0,
-        timeout: float = 30.0
+        timeout: float = 30.0,
+        pool_maxsize: int = 10
     ):
         self.base_url = base_url
         self.model = model
@@ -30,6 +32,14 @@ class OllamaEmbeddingFunction(EmbeddingFunction):
         self.retry_delay = retry_delay
         self.timeout = timeout
         self._embedding_size = None  # Will be determined on first successful call
+        # One connection pool per instance: embeddings are requested chunk by
+        # chunk, so reusing the keep-alive connection saves a connect per chunk.
+        # The pool is sized for all threads embedding concurrently; retries are
+        # handled by _get_embedding, not by the adapter
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_maxsize), max_retries=0)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
         
         # Test connection
         self._test_connection()
@@ -38,7 +48,7 @@ class OllamaEmbeddingFunction(EmbeddingFunction):
         """Test the connection to Ollama API and log the result."""
         try:
             logger.info(f"Testing connection to Ollama API at {self.base_url}")
-            response = requests.get(
+            response = self._session.get(
                 f"{self.base_url}/api/version", 
                 timeout=self.timeout
             )
@@ -67,7 +77,7 @@ class OllamaEmbeddingFunction(EmbeddingFunction):
         
         for attempt in range(self.max_retries):
             try:
-                response = requests.post(
+                response = self._session.post(
                     f"{self.base_url}/api/embeddings",
                     json={"model": self.model, "prompt": truncated_text},
                     timeout=self.timeout
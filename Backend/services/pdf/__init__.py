@@ -2,6 +2,8 @@
 """
 Modulares PDF-Verarbeitungspaket
 """
+import threading
+
 from .processor import PDFProcessor, ProcessingSettings
 from .extractors import TextExtractor, IdentifierExtractor
 from .chunking import TextChunker
@@ -9,12 +11,15 @@ from .ocr import OCRProcessor
 
 # Singleton-Instanz für einfacheren Zugriff
 _processor_instance = None
+_processor_lock = threading.Lock()
 
 def get_pdf_processor():
     """Gibt die aktuelle PDFProcessor-Instanz zurück"""
     global _processor_instance
     
     if _processor_instance is None:
-        _processor_instance = PDFProcessor()
+        with _processor_lock:
+            if _processor_instance is None:
+                _processor_instance = PDFProcessor()
     
     return _processor_instance
\ No newline at end of file
@@ -4,9 +4,12 @@ Text-Chunking-Komponente für die PDF-Verarbeitung
 """
 import re
 import logging
-import gc
+import time
 import psutil
-from typing import Dict, Any, List, Optional
+from itertools import islice
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+
+from utils.performance_utils import collect_garbage_if_needed
 
 logger = logging.getLogger(__name__)
 
@@ -60,12 +63,79 @@ class TextChunker:
         Returns:
             list: Liste von Textchunks mit Seitenzuordnungen
         """
+        return list(self._iter_chunks_with_pages(text, pages_info, chunk_size, overlap_size))
+    
+    def chunk_text_with_pages_limited(self, text, pages_info, chunk_size=1000, overlap_size=200,
+                                      max_chunks=0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Wie chunk_text_with_pages, baut aber nur die ersten max_chunks nicht-leeren
+        Chunks auf; für die übrigen wird keine Seitenzuordnung berechnet
+        
+        Args:
+            text: Vollständiger Dokumenttext
+            pages_info: Liste von Seiteninformationen mit Positionen
+            chunk_size: Ziel-Chunkgröße in Zeichen
+            overlap_size: Überlappungsgröße in Zeichen
+            max_chunks: Maximale Anzahl zurückgegebener Chunks (0 = unbegrenzt)
+        
+        Returns:
+            tuple: (nicht-leere Chunks, Gesamtzahl nicht-leerer Chunks)
+        """
+        text_chunks = []
+        chunks = self._iter_chunks_with_pages(text, pages_info, chunk_size, overlap_size, text_chunks)
+        non_empty = (chunk for chunk in chunks if chunk['text'].strip())
+        
+        if max_chunks <= 0:
+            limited = list(non_empty)
+            return limited, len(limited)
+        
+        limited = list(islice(non_empty, max_chunks))
+        total = sum(1 for chunk in text_chunks if chunk.strip())
+        return limited, max(total, len(limited))
+    
+    def iter_chunks_with_pages_limited(self, text, pages_info, chunk_size=1000, overlap_size=200,
+                                       max_chunks=0) -> Iterator[Dict[str, Any]]:
+        """
+        Wie chunk_text_with_pages_limited, liefert die nicht-leeren Chunks aber
+        einzeln, damit Aufrufer sie weiterverarbeiten können, ohne alle
+        Seitenzuordnungen gleichzeitig im Speicher zu halten
+        
+        Args:
+            text: Vollständiger Dokumenttext
+            pages_info: Liste von Seiteninformationen mit Positionen
+            chunk_size: Ziel-Chunkgröße in Zeichen
+            overlap_size: Überlappungsgröße in Zeichen
+            max_chunks: Maximale Anzahl erzeugter Chunks (0 = unbegrenzt)
+        
+        Yields:
+            dict: Nicht-leerer Textchunk mit Seitenzuordnung
+        """
+        chunks = self._iter_chunks_with_pages(text, pages_info, chunk_size, overlap_size)
+        non_empty = (chunk for chunk in chunks if chunk['text'].strip())
+        return islice(non_empty, max_chunks) if max_chunks > 0 else non_empty
+    
+    def _iter_chunks_with_pages(self, text, pages_info, chunk_size, overlap_size,
+                                text_chunks_out: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Erzeugt Chunks mit Seitenzuordnung einzeln, sodass Aufrufer vorzeitig abbrechen können
+        
+        Args:
+            text: Vollständiger Dokumenttext
+            pages_info: Liste von Seiteninformationen mit Positionen
+            chunk_size: Ziel-Chunkgröße in Zeichen
+            overlap_size: Überlappungsgröße in Zeichen
+            text_chunks_out: Optionale Liste, die alle Chunk-Texte erhält, bevor
+                der erste Chunk erzeugt wird
+        
+        Yields:
+            dict: Textchunk mit Seitenzuordnung
+        """
         if not text or chunk_size <= 0:
             logger.warning("Invalid input for chunking: empty text or invalid chunk size")
-            return []
+            return
         
         logger.info(f"Chunking text with pages, text length: {len(text)}, chunk_size: {chunk_size}, overlap: {overlap_size}")
-        chunks = []
+        chunk_count = 0
         
         # Wenn Text kleiner als Chunkgröße ist, als einzelnen Chunk zurückgeben
         if len(text) <= chunk_size:
@@ -77,7 +147,10 @@ class TextChunker:
                     page_number = page['pageNumber']
                     break
             
-            return [{'text': text, 'page_number': page_number}]
+            if text_chunks_out is not None:
+                text_chunks_out.append(text)
+            yield {'text': text, 'page_number': page_number}
+            return
         
         # Position-zu-Seite-Mapping erstellen
         logger.debug("Creating position to page mapping")
@@ -106,14 +179,17 @@ class TextChunker:
             
             # Erzwinge GC bei hoher Speichernutzung
             if memory_used > 200:  # 200MB Schwellenwert
-                logger.warning(f"High memory usage in chunking: {memory_used:.2f} MB, forcing GC")
-                gc.collect()
+                logger.warning(f"High memory usage in chunking: {memory_used:.2f} MB")
+                collect_garbage_if_needed()
                 
         except Exception as e:
             logger.error(f"Error in semantic chunking: {e}", exc_info=True)
             logger.warning("Falling back to simple chunking")
             text_chunks = self.chunk_text(text, chunk_size, overlap_size)
         
+        if text_chunks_out is not None:
+            text_chunks_out.extend(text_chunks)
+        
         # Seiten zu Chunks zuordnen
         logger.debug(f"Assigning pages to {len(text_chunks)} chunks")
         current_pos = 0
@@ -143,13 +219,13 @@ class TextChunker:
                     max_count = count
                     most_common_page = page_num
             
-            chunks.append({
+            chunk_count += 1
+            yield {
                 'text': chunk,
                 'page_number': most_common_page
-            })
+            }
         
-        logger.info(f"Chunking complete, created {len(chunks)} chunks with page tracking")
-        return chunks
+        logger.info(f"Chunking complete, created {chunk_count} chunks with page tracking")
     
     def chunk_text(self, text, chunk_size=1000, overlap_size=200):
         """
@@ -300,8 +376,8 @@ class TextChunker:
             segment_chunks = self.chunk_text(segment_text, chunk_size, overlap_size)
             segments.extend(segment_chunks)
             
-            # Erzwinge GC nach jedem Segment
-            gc.collect()
+            # GC nach jedem Segment, falls der Speicher gewachsen ist
+            collect_garbage_if_needed()
             
         logger.debug(f"Segmented processing complete, created {len(segments)} chunks")
         return segments
@@ -323,7 +399,6 @@ def _chunk_paragraphs(self, paragraphs, chunk_size, overlap_size):
     current_size = 0
     
     # Überwache Verarbeitungszeit
-    import time
     start_time = time.time()
     
     for paragraph in paragraphs:
@@ -4,11 +4,14 @@ Extraktionskomponenten für die PDF-Verarbeitung
 """
 import os
 import logging
-import gc
 import time
 import re
 import io
-from typing import Dict, Any, List, Optional, Callable, Union
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, Callable, Union, Tuple
 import tempfile
 
 try:
@@ -23,10 +26,72 @@ try:
 except ImportError:
     OCR_AVAILABLE = False
 
+from config import config_manager
 from utils.identifier_utils import extract_identifiers as utils_extract_identifiers
+from utils.identifier_utils import extract_doi as utils_extract_doi
+from utils.performance_utils import collect_garbage_if_needed
 
 logger = logging.getLogger(__name__)
 
+# Worker-Prozesse für die Seitenextraktion in diesem Prozess (PAGE_WORKERS,
+# siehe config_manager; der Standard teilt die Kerne auf die Gunicorn-Worker auf)
+PAGE_POOL_WORKERS = config_manager.get('PAGE_WORKERS', 1)
+
+# Gemeinsamer Prozess-Pool aller Dokumentverarbeitungen, beim ersten Bedarf gestartet
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_lock = threading.Lock()
+
+def _get_page_pool() -> ProcessPoolExecutor:
+    """
+    Holt den gemeinsamen Prozess-Pool für die Seitenextraktion
+    
+    Returns:
+        ProcessPoolExecutor: Pool mit PAGE_POOL_WORKERS Prozessen
+    """
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            # spawn statt fork: MuPDF-Zustand des Elternprozesses wird nicht vererbt
+            _page_pool = ProcessPoolExecutor(
+                max_workers=PAGE_POOL_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            logger.info(f"Started page extraction pool with {PAGE_POOL_WORKERS} processes")
+        return _page_pool
+
+def _discard_page_pool(pool: ProcessPoolExecutor) -> None:
+    """Verwirft einen defekten Prozess-Pool, damit der nächste Aufruf einen neuen startet"""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is pool:
+            _page_pool = None
+    pool.shutdown(wait=False)
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[Tuple[int, str, float, float]]:
+    """
+    Extrahiert den Text eines zusammenhängenden Seitenbereichs in einem Worker-Prozess
+    
+    Jeder Prozess öffnet sein eigenes Dokument, da geöffnete PyMuPDF-Handles
+    nicht zwischen Prozessen geteilt werden können.
+    
+    Args:
+        pdf_path: Pfad zur PDF-Datei
+        start: Index der ersten Seite
+        end: Index hinter der letzten Seite
+    
+    Returns:
+        list: (Seitenindex, Text, Breite, Höhe) je Seite
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        pages = []
+        for i in range(start, end):
+            page = doc[i]
+            pages.append((i, page.get_text(), page.rect.width, page.rect.height))
+        return pages
+    finally:
+        doc.close()
+
 class TextExtractor:
     """
     Komponente zur Textextraktion aus PDFs
@@ -46,6 +111,9 @@ class TextExtractor:
         self.MAX_FILE_SIZE_MB = 50
         self.WARN_FILE_SIZE_MB = 20
         self.MAX_TEXT_LENGTH = 500000  # 500K characters max for chunking
+        
+        # Unterhalb dieser Seitenzahl lohnt sich der Aufbau eines Prozess-Pools nicht
+        self.PARALLEL_MIN_PAGES = 20
     
     def validate_pdf(self, filepath: str) -> tuple:
         """
@@ -57,34 +125,52 @@ class TextExtractor:
         Returns:
             tuple: (is_valid, validation_result)
         """
+        doc, is_valid, validation_result = self.open_and_validate(filepath)
+        if doc is not None:
+            doc.close()
+        return is_valid, validation_result
+    
+    def open_and_validate(self, filepath: str) -> tuple:
+        """
+        Öffnet und validiert ein PDF-Dokument, damit das geöffnete Dokument
+        für die Extraktion weiterverwendet werden kann
+        
+        Args:
+            filepath: Pfad zur PDF-Datei
+            
+        Returns:
+            tuple: (doc, is_valid, validation_result); doc ist bei ungültigen
+                Dateien None und muss sonst vom Aufrufer geschlossen werden
+        """
         try:
-            # Prüfe, ob Datei existiert
-            if not os.path.exists(filepath):
+            # Prüfe Header-Bytes (schlägt fehl, wenn die Datei nicht existiert)
+            try:
+                with open(filepath, 'rb') as f:
+                    header = f.read(5)
+            except FileNotFoundError:
                 logger.error(f"PDF file not found: {filepath}")
-                return False, "PDF file not found"
-                
-            # Prüfe Header-Bytes
-            with open(filepath, 'rb') as f:
-                header = f.read(5)
-                if header != b'%PDF-':
-                    logger.error(f"Invalid PDF header: {header}")
-                    return False, "Invalid PDF file format (incorrect header)"
+                return None, False, "PDF file not found"
+            
+            if header != b'%PDF-':
+                logger.error(f"Invalid PDF header: {header}")
+                return None, False, "Invalid PDF file format (incorrect header)"
             
             # Versuche mit PyMuPDF zu öffnen
             doc = fitz.open(filepath)
             page_count = len(doc)
             logger.info(f"Successfully opened PDF with {page_count} pages")
-            doc.close()
-            return True, page_count
+            return doc, True, page_count
                 
         except Exception as e:
             logger.error(f"PDF validation error: {str(e)}")
-            return False, str(e)
+            return None, False, str(e)
     
     def extract_text(self, pdf_file: Union[str, bytes], 
                     max_pages: int = 0, 
                     perform_ocr: bool = False, 
-                    progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
+                    progress_callback: Optional[Callable] = None,
+                    parallel: bool = True,
+                    doc: Optional['fitz.Document'] = None) -> Dict[str, Any]:
         """
         Extrahiert Text aus einer PDF-Datei mit verbessertem Seiten-Tracking
         
@@ -93,14 +179,24 @@ class TextExtractor:
             max_pages: Maximale Anzahl zu verarbeitender Seiten (0 = alle)
             perform_ocr: OCR für Seiten mit wenig Text durchführen
             progress_callback: Optionale Fortschrittsrückmeldungsfunktion
+            parallel: Seiten größerer Dokumente auf mehrere Prozesse verteilen
+            doc: Bereits geöffnetes Dokument zu pdf_file (z.B. aus open_and_validate);
+                wird nicht geschlossen
         
         Returns:
             dict: Extraktionsergebnis mit Text und Seiteninformationen
         """
         # Prüfe Cache
         file_hash = None
-        if isinstance(pdf_file, str) and os.path.exists(pdf_file):
-            file_hash = f"{os.path.getsize(pdf_file)}_{os.path.getmtime(pdf_file)}"
+        stat = None
+        if isinstance(pdf_file, str):
+            # Ein stat-Aufruf liefert Existenz, Größe und Änderungszeit zugleich
+            try:
+                stat = os.stat(pdf_file)
+            except OSError:
+                pass
+        if stat is not None:
+            file_hash = f"{stat.st_size}_{stat.st_mtime_ns}"
             if file_hash in self._text_cache:
                 logger.info(f"Using cached text for {pdf_file}")
                 return self._text_cache[file_hash]
@@ -118,8 +214,10 @@ class TextExtractor:
             else:
                 pdf_path = pdf_file
             
-            # Öffne PDF
-            doc = fitz.open(pdf_path)
+            # Öffne PDF, sofern der Aufrufer es nicht bereits geöffnet hat
+            owns_doc = doc is None
+            if owns_doc:
+                doc = fitz.open(pdf_path)
             logger.debug(f"Opened PDF with {len(doc)} pages")
             
             # Bereite Ergebnisobjekt vor
@@ -133,24 +231,44 @@ class TextExtractor:
             # Verarbeite Seiten in Batches für besseres Speichermanagement
             pages_to_process = result['processedPages']
             ocr_candidates = []
+            text_parts = []  # Seitentexte, werden am Ende einmal zusammengefügt
             BATCH_SIZE = 10  # Verarbeite 10 Seiten auf einmal
             
-            for batch_start in range(0, pages_to_process, BATCH_SIZE):
-                batch_end = min(batch_start + BATCH_SIZE, pages_to_process)
-                logger.debug(f"Processing batch: pages {batch_start+1}-{batch_end} of {pages_to_process}")
-                
-                self._process_page_batch(
-                    doc=doc,
-                    batch_start=batch_start,
-                    batch_end=batch_end,
-                    result=result,
-                    perform_ocr=perform_ocr,
-                    ocr_candidates=ocr_candidates,
-                    progress_callback=progress_callback
-                )
-                
-                # Erzwinge Garbage Collection nach jedem Batch
-                gc.collect()
+            workers = min(PAGE_POOL_WORKERS, pages_to_process)
+            extracted_in_parallel = False
+            if parallel and pages_to_process >= self.PARALLEL_MIN_PAGES and workers > 1:
+                try:
+                    page_results = self._extract_pages_parallel(
+                        pdf_path, pages_to_process, workers, progress_callback
+                    )
+                except Exception as e:
+                    logger.warning(f"Parallel page extraction failed, falling back to sequential: {e}")
+                else:
+                    for i, page_text, width, height in page_results:
+                        self._append_page(i, page_text, width, height, result, text_parts,
+                                          perform_ocr, ocr_candidates)
+                    extracted_in_parallel = True
+            
+            if not extracted_in_parallel:
+                for batch_start in range(0, pages_to_process, BATCH_SIZE):
+                    batch_end = min(batch_start + BATCH_SIZE, pages_to_process)
+                    logger.debug(f"Processing batch: pages {batch_start+1}-{batch_end} of {pages_to_process}")
+                    
+                    self._process_page_batch(
+                        doc=doc,
+                        batch_start=batch_start,
+                        batch_end=batch_end,
+                        result=result,
+                        text_parts=text_parts,
+                        perform_ocr=perform_ocr,
+                        ocr_candidates=ocr_candidates,
+                        progress_callback=progress_callback
+                    )
+                    
+                    # Garbage Collection nach jedem Batch, falls der Speicher gewachsen ist
+                    collect_garbage_if_needed()
+            
+            result['text'] = ''.join(text_parts)
             
             # Führe OCR für Seiten mit wenig Text durch
             if perform_ocr and ocr_candidates and OCR_AVAILABLE:
@@ -162,9 +280,13 @@ class TextExtractor:
                 )
             
             # Bereinige
-            doc.close()
-            if temp_file and os.path.exists(pdf_path):
-                os.unlink(pdf_path)
+            if owns_doc:
+                doc.close()
+            if temp_file:
+                try:
+                    os.unlink(pdf_path)
+                except FileNotFoundError:
+                    pass
             
             # Cache das Ergebnis wenn wir einen Datei-Hash haben
             if file_hash:
@@ -187,12 +309,53 @@ class TextExtractor:
             logger.error(f"Error extracting text from PDF: {e}", exc_info=True)
             
             # Bereinige bei Fehler
-            if temp_file and os.path.exists(temp_file.name):
-                os.unlink(temp_file.name)
+            if temp_file:
+                try:
+                    os.unlink(temp_file.name)
+                except OSError:
+                    pass
+                
+            raise
+    
+    def _extract_pages_parallel(self, pdf_path, pages_to_process, workers,
+                                progress_callback=None) -> List[Tuple[int, str, float, float]]:
+        """
+        Extrahiert Seitentexte parallel in zusammenhängenden Seitenbereichen
+        
+        Args:
+            pdf_path: Pfad zur PDF-Datei
+            pages_to_process: Anzahl zu verarbeitender Seiten
+            workers: Anzahl der Seitenbereiche (höchstens PAGE_POOL_WORKERS)
+            progress_callback: Fortschrittsrückmeldungsfunktion
+        
+        Returns:
+            list: Nach Seitenindex sortierte (Seitenindex, Text, Breite, Höhe)-Tupel
+        """
+        shard_size = -(-pages_to_process // workers)  # Aufrunden
+        shards = [(start, min(start + shard_size, pages_to_process))
+                  for start in range(0, pages_to_process, shard_size)]
+        logger.debug(f"Extracting {pages_to_process} pages in {len(shards)} shards")
+        
+        page_results = []
+        pool = _get_page_pool()
+        try:
+            futures = [pool.submit(_extract_page_range, pdf_path, start, end)
+                       for start, end in shards]
+            for future in as_completed(futures):
+                page_results.extend(future.result())
                 
+                # Melde Fortschritt
+                if progress_callback:
+                    progress_callback(f"Processing page {len(page_results)}/{pages_to_process}",
+                                    int(len(page_results) / pages_to_process * 100))
+        except BrokenProcessPool:
+            _discard_page_pool(pool)
             raise
+        
+        page_results.sort(key=lambda page: page[0])
+        return page_results
     
-    def _process_page_batch(self, doc, batch_start, batch_end, result, 
+    def _process_page_batch(self, doc, batch_start, batch_end, result, text_parts,
                           perform_ocr, ocr_candidates, progress_callback=None):
         """
         Verarbeitet einen Batch von PDF-Seiten
@@ -202,6 +365,7 @@ class TextExtractor:
             batch_start: Startindex des Batches
             batch_end: Endindex des Batches
             result: Ergebnisobjekt zum Aktualisieren
+            text_parts: Liste, an die die Seitentexte angehängt werden
             perform_ocr: OCR aktivieren
             ocr_candidates: Liste für OCR-Kandidaten
             progress_callback: Fortschrittsrückmeldungsfunktion
@@ -215,41 +379,63 @@ class TextExtractor:
                 progress_callback(f"Processing page {i+1}/{result['processedPages']}", 
                                 int(i/result['processedPages'] * 100))
             
-            # Seiten-Metadaten
-            page_info = {
-                'pageNumber': i + 1,
-                'width': page.rect.width,
-                'height': page.rect.height,
-                'text': '',
-                'startPosition': len(result['text']), # Position im Gesamttext
-            }
-            
             # Extrahiere Text
             page_text = page.get_text()
-            logger.debug(f"Extracted {len(page_text)} characters from page {i+1}")
-            
-            # Teile große Textblöcke auf, um Speicherprobleme zu vermeiden
-            if len(page_text) > 10000:  # 10K Zeichen
-                # Verwende natürliche Breaks um Text zu teilen
-                split_texts = re.split(r'\n\s*\n', page_text)
-                page_text = '\n\n'.join(split_texts)
-                logger.debug(f"Split large text block into {len(split_texts)} paragraphs")
-                
-            page_info['text'] = page_text
-            page_info['length'] = len(page_text)
-            
-            # Füge zum Gesamttext hinzu
-            result['text'] += page_text + ' '
-            
-            # Aktualisiere Endposition
-            page_info['endPosition'] = len(result['text']) - 1
-            
-            # Füge zu OCR-Kandidaten hinzu wenn wenig Text
-            if perform_ocr and len(page_text.strip()) < 100:
-                logger.debug(f"Adding page {i+1} to OCR candidates (low text content)")
-                ocr_candidates.append(i)
-            
-            result['pages'].append(page_info)
+            self._append_page(i, page_text, page.rect.width, page.rect.height, result,
+                              text_parts, perform_ocr, ocr_candidates)
+    
+    def _append_page(self, i, page_text, width, height, result, text_parts,
+                     perform_ocr, ocr_candidates):
+        """
+        Fügt eine extrahierte Seite mit Positionsangaben zum Ergebnis hinzu
+        
+        Args:
+            i: Seitenindex
+            page_text: Extrahierter Seitentext
+            width: Seitenbreite
+            height: Seitenhöhe
+            result: Ergebnisobjekt zum Aktualisieren
+            text_parts: Liste, an die die Seitentexte angehängt werden
+            perform_ocr: OCR aktivieren
+            ocr_candidates: Liste für OCR-Kandidaten
+        """
+        # Länge des bisherigen Gesamttexts (ohne ihn zusammenzusetzen)
+        text_length = result['pages'][-1]['endPosition'] + 1 if result['pages'] else 0
+        
+        # Seiten-Metadaten
+        page_info = {
+            'pageNumber': i + 1,
+            'width': width,
+            'height': height,
+            'text': '',
+            'startPosition': text_length, # Position im Gesamttext
+        }
+        
+        logger.debug(f"Extracted {len(page_text)} characters from page {i+1}")
+        
+        # Teile große Textblöcke auf, um Speicherprobleme zu vermeiden
+        if len(page_text) > 10000:  # 10K Zeichen
+            # Verwende natürliche Breaks um Text zu teilen
+            split_texts = re.split(r'\n\s*\n', page_text)
+            page_text = '\n\n'.join(split_texts)
+            logger.debug(f"Split large text block into {len(split_texts)} paragraphs")
+            
+        page_info['text'] = page_text
+        page_info['length'] = len(page_text)
+        
+        # Füge zum Gesamttext hinzu
+        text_parts.append(page_text + ' ')
+        text_length += len(page_text) + 1
+        
+        # Aktualisiere Endposition
+        page_info['endPosition'] = text_length - 1
+        
+        # Füge zu OCR-Kandidaten hinzu wenn wenig Text
+        if perform_ocr and len(page_text.strip()) < 100:
+            logger.debug(f"Adding page {i+1} to OCR candidates (low text content)")
+            ocr_candidates.append(i)
+        
+        result['pages'].append(page_info)
     
     def _perform_ocr_for_candidates(self, doc, ocr_candidates, result, progress_callback=None):
         """
@@ -271,7 +457,6 @@ class TextExtractor:
         
         # Verarbeite OCR in kleineren Batches um Speichernutzung zu begrenzen
         MAX_OCR_PAGES = 5  # Maximale OCR-Seiten in einem Batch
-        from concurrent.futures import ThreadPoolExecutor
         
         with ThreadPoolExecutor(max_workers=2) as executor:
             for i in range(0, len(ocr_candidates), MAX_OCR_PAGES):
@@ -313,8 +498,8 @@ class TextExtractor:
                     except Exception as e:
                         logger.error(f"Error in OCR process: {e}")
                 
-                # Erzwinge Garbage Collection nach jedem OCR-Batch
-                gc.collect()
+                # Garbage Collection nach jedem OCR-Batch, falls der Speicher gewachsen ist
+                collect_garbage_if_needed()
     
     @staticmethod
     def _perform_ocr_on_page(doc, page_idx, dpi=300):
@@ -412,13 +597,17 @@ class IdentifierExtractor:
                 
         return result
     
-    def extract_identifiers_from_pdf(self, filepath: str, max_pages: int = 10) -> Dict[str, Any]:
+    def extract_identifiers_from_pdf(self, filepath: str, max_pages: int = 10,
+                                     on_doi: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Extract only DOI and ISBN from the first pages of a PDF
         
         Args:
             filepath: Path to PDF file
             max_pages: Maximum number of pages to process
+            on_doi: Called with the first DOI found on a single page, before the
+                remaining pages are read, so lookups can start early. The DOI
+                in the result may differ, as it is taken from all pages.
             
         Returns:
             dict: Dictionary with found identifiers
@@ -437,11 +626,17 @@ class IdentifierExtractor:
             
             # Extract text from first pages
             text = ""
+            early_doi = None
             for i in range(pages_to_process):
                 page = doc[i]
                 page_text = page.get_text()
                 logger.debug(f"Extracted {len(page_text)} chars from page {i+1}")
                 text += page_text + "\n"
+                
+                if on_doi and not early_doi:
+                    early_doi = utils_extract_doi(page_text)
+                    if early_doi:
+                        on_doi(early_doi)
             
             # Extract identifiers using centralized function
             identifiers = utils_extract_identifiers(text)
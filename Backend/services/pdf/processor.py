@@ -4,14 +4,14 @@ Core PDF processing class with clear responsibilities and delegation to speciali
 """
 import os
 import logging
-import gc
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Iterator, Union
 from dataclasses import dataclass, field
 
 from .extractors import TextExtractor, IdentifierExtractor
 from .chunking import TextChunker
 from .ocr import OCRProcessor
 from utils.identifier_utils import extract_identifiers
+from utils.performance_utils import collect_garbage_if_needed
 
 logger = logging.getLogger(__name__)
 
@@ -22,9 +22,11 @@ class ProcessingSettings:
     perform_ocr: bool = False
     chunk_size: int = 1000
     chunk_overlap: int = 200
+    max_chunks: int = 0  # 0 means no limit
     extract_metadata: bool = True
     max_file_size_mb: int = 50
     warn_file_size_mb: int = 20
+    parallel: bool = True  # Extract pages of larger PDFs in worker processes
 
 class PDFProcessor:
     """
@@ -51,9 +53,23 @@ class PDFProcessor:
         """
         return self.text_extractor.validate_pdf(filepath)
     
+    def open_and_validate(self, filepath: str) -> tuple:
+        """
+        Open and validate a PDF file, keeping the opened document
+        
+        Args:
+            filepath: Path to PDF file
+            
+        Returns:
+            tuple: (doc, is_valid, validation_result); the caller closes doc
+        """
+        return self.text_extractor.open_and_validate(filepath)
+    
     def process_file(self, filepath: str, 
                    settings: Optional[Dict[str, Any]] = None,
-                   progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
+                   progress_callback: Optional[Callable] = None,
+                   doc: Optional[Any] = None,
+                   stream_chunks: bool = False) -> Dict[str, Any]:
         """
         Process a PDF file and extract text, chunks, and metadata
         
@@ -61,6 +77,10 @@ class PDFProcessor:
             filepath: Path to PDF file
             settings: Processing settings
             progress_callback: Callback for progress updates
+            doc: Document already opened and validated by open_and_validate;
+                left open for the caller to close
+            stream_chunks: Return the chunks as an iterator that builds them
+                on demand; total_chunks is then None
             
         Returns:
             dict: Processing result with text, chunks, metadata
@@ -75,9 +95,11 @@ class PDFProcessor:
             perform_ocr=bool(settings.get('performOCR', False)),
             chunk_size=int(settings.get('chunkSize', 1000)),
             chunk_overlap=int(settings.get('chunkOverlap', 200)),
+            max_chunks=int(settings.get('maxChunks', 0)),
             extract_metadata=bool(settings.get('extractMetadata', True)),
             max_file_size_mb=int(settings.get('maxFileSizeMB', 50)),
-            warn_file_size_mb=int(settings.get('warnFileSizeMB', 20))
+            warn_file_size_mb=int(settings.get('warnFileSizeMB', 20)),
+            parallel=bool(settings.get('parallel', True))
         )
         
         logger.info(f"Processing file: {filepath}")
@@ -96,11 +118,14 @@ class PDFProcessor:
                     if progress_callback:
                         progress_callback(f"Large file ({file_size_mb:.1f} MB). Processing may take longer.", 0)
             
-            # Validate PDF format
-            valid, message = self.validate_pdf(filepath)
-            if not valid:
-                logger.error(f"Invalid PDF: {message}")
-                raise ValueError(f"Invalid PDF: {message}")
+            # Validate PDF format unless the caller did; the opened document
+            # is reused for extraction
+            owns_doc = doc is None
+            if owns_doc:
+                doc, valid, message = self.open_and_validate(filepath)
+                if not valid:
+                    logger.error(f"Invalid PDF: {message}")
+                    raise ValueError(f"Invalid PDF: {message}")
             
             # Create progress wrapper for different stages
             def progress_wrapper(stage, callback=progress_callback):
@@ -118,12 +143,18 @@ class PDFProcessor:
                     return callback
             
             # Extract text - delegate to TextExtractor
-            extraction_result = self.text_extractor.extract_text(
-                filepath,
-                max_pages=proc_settings.max_pages,
-                perform_ocr=proc_settings.perform_ocr,
-                progress_callback=progress_wrapper('extraction')
-            )
+            try:
+                extraction_result = self.text_extractor.extract_text(
+                    filepath,
+                    max_pages=proc_settings.max_pages,
+                    perform_ocr=proc_settings.perform_ocr,
+                    progress_callback=progress_wrapper('extraction'),
+                    parallel=proc_settings.parallel,
+                    doc=doc
+                )
+            finally:
+                if owns_doc:
+                    doc.close()
             
             # Progress update
             if progress_callback:
@@ -147,57 +178,67 @@ class PDFProcessor:
             if progress_callback:
                 progress_callback("Creating chunks with page tracking", 65)
             
-            # Create chunks with page mapping - delegate to TextChunker
-            chunks_with_pages = self.text_chunker.chunk_text_with_pages(
-                extraction_result['text'],
-                extraction_result['pages'],
-                chunk_size=proc_settings.chunk_size,
-                overlap_size=proc_settings.chunk_overlap
-            )
-            
-            # Validate chunks - remove empty chunks
-            chunks_with_pages = [chunk for chunk in chunks_with_pages if chunk.get('text', '').strip()]
-            logger.info(f"Created {len(chunks_with_pages)} non-empty chunks")
+            # Create non-empty chunks with page mapping - delegate to TextChunker;
+            # with max_chunks only the first chunks are built
+            chunks_with_pages: Union[List[Dict[str, Any]], Iterator[Dict[str, Any]]]
+            if stream_chunks:
+                chunks_with_pages = self.text_chunker.iter_chunks_with_pages_limited(
+                    extraction_result['text'],
+                    extraction_result['pages'],
+                    chunk_size=proc_settings.chunk_size,
+                    overlap_size=proc_settings.chunk_overlap,
+                    max_chunks=proc_settings.max_chunks
+                )
+                total_chunks = None
+            else:
+                chunks_with_pages, total_chunks = self.text_chunker.chunk_text_with_pages_limited(
+                    extraction_result['text'],
+                    extraction_result['pages'],
+                    chunk_size=proc_settings.chunk_size,
+                    overlap_size=proc_settings.chunk_overlap,
+                    max_chunks=proc_settings.max_chunks
+                )
+                logger.info(f"Created {len(chunks_with_pages)} of {total_chunks} non-empty chunks")
             
             # Progress update
             if progress_callback:
                 progress_callback("Processing complete", 100)
             
-            # Force garbage collection
-            gc.collect()
-
             result = {
                 'text': extraction_result['text'],
                 'chunks': chunks_with_pages,
+                'total_chunks': total_chunks,
                 'metadata': metadata,
                 'pages': extraction_result['pages']
             }
             
-            logger.info(f"Processing complete: {len(result['text'])} chars, {len(result['chunks'])} chunks")
+            logger.info(f"Processing complete: {len(result['text'])} chars")
             return result
             
         except Exception as e:
             logger.error(f"Error in PDF processing: {e}", exc_info=True)
             
-            # Force garbage collection
-            gc.collect()
+            # Collect garbage if the failed run left memory behind
+            collect_garbage_if_needed()
             
             # Re-raise with context
             raise ValueError(f"Failed to process PDF: {str(e)}")
     
-    def extract_identifiers_only(self, filepath: str, max_pages: int = 10) -> Dict[str, Any]:
+    def extract_identifiers_only(self, filepath: str, max_pages: int = 10,
+                                 on_doi: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Extract only identifiers (DOI, ISBN) from a PDF
         
         Args:
             filepath: Path to PDF file
             max_pages: Maximum number of pages to process
+            on_doi: Callback for the first DOI found, before extraction finishes
             
         Returns:
             dict: Extracted identifiers
         """
         # Delegate to IdentifierExtractor
-        return self.identifier_extractor.extract_identifiers_from_pdf(filepath, max_pages)
+        return self.identifier_extractor.extract_identifiers_from_pdf(filepath, max_pages, on_doi)
     
     def cleanup_cache(self):
         """Clean up internal caches"""
@@ -76,7 +76,7 @@ def initialize_services() -> None:
     # from services.document_analysis_service import DocumentAnalysisService
     
     # Neue Importe hinzufügen:
-    from services.documents.processor import DocumentProcessor
+    from services.documents.processor import get_document_processor
     from services.document_db_service import DocumentDBService
     from services.status_service import get_status_service
     from services.authentication.auth_manager import AuthManager
@@ -88,7 +88,7 @@ def initialize_services() -> None:
     # register_factory('document_analysis', lambda: DocumentAnalysisService())
     
     # Neue Registrierungen hinzufügen:
-    register_factory('document_processor', lambda: DocumentProcessor())
+    register_factory('document_processor', get_document_processor)
     register_factory('document_db', lambda: DocumentDBService())
     register_factory('vector_storage', get_vector_storage)
     
@@ -3,18 +3,50 @@
 Zentralisierter Status-Management-Service mit Observer-Pattern und verbesserten 
 Speicher-Funktionen. Dient als Ersatz für das alte Status-Tracking-System.
 """
+import atexit
 import os
 import json
 import logging
 import threading
 import time
+from contextlib import contextmanager
 from typing import Dict, Any, Optional, List, Callable, Set
-from datetime import datetime
 from config import config_manager
 from utils import file_utils
+from utils.metadata_utils import utc_now_iso
 
 logger = logging.getLogger(__name__)
 
+# Anzahl der Shards (Zweierpotenz, damit der Index per Bitmaske bestimmt werden kann)
+_SHARD_COUNT = 32
+
+# Status, die sofort geschrieben werden; alle anderen schreibt der Writer-Thread
+# gesammelt im Flush-Intervall (nur der jeweils letzte Stand pro Status-ID)
+_WRITE_THROUGH_STATUSES = frozenset({"completed", "completed_with_warnings", "error", "canceled"})
+
+# Mindestfortschritt (Prozentpunkte) seit dem zuletzt geschriebenen Stand, ab
+# dem ein Zwischenstand mit unverändertem Statustext erneut geschrieben wird
+_PERSIST_PROGRESS_STEP = 5
+
+# Spätestens nach dieser Zeit (Sekunden) wird auch ein kleiner Zwischenstand
+# geschrieben, damit lange Schritte mit wechselndem Statustext sichtbar bleiben
+_PERSIST_MAX_INTERVAL = 2.0
+
+# Maximale Anzahl gemerkter inaktiver Status-IDs pro Shard
+_MAX_INACTIVE_IDS_PER_SHARD = 1024 // _SHARD_COUNT
+
+class _StatusShard:
+    """Teil des Status-Speichers mit eigenem Lock für eine Teilmenge der Status-IDs"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()  # Schützt die Dictionaries dieses Shards
+        self.write_lock = threading.Lock()  # Serialisiert Dateischreibvorgänge dieses Shards
+        self.status_data = {}  # In-Memory-Status
+        self.pending_writes = {}  # Letzter ungeschriebener Status nach Status-ID
+        self.persisted = {}  # Zuletzt zum Schreiben vorgemerkter (Status, Fortschritt, Zeitpunkt)
+        self.observers = {}  # Callbacks nach Status-ID
+        self.inactive_ids = set()  # IDs inaktiver Status
+
 class StatusService:
     """Zentraler Service für Statusverwaltung mit Observer-Pattern"""
     
@@ -25,11 +57,26 @@ class StatusService:
         Args:
             storage_dir: Optionales Verzeichnis für Statusdateien
         """
-        self._status_data = {}  # In-Memory-Status
-        self._status_lock = threading.RLock()  # RLock für Thread-Sicherheit
-        self._observers = {}  # Callbacks nach Status-ID
+        # Status werden nach Status-ID auf Shards verteilt, damit sich Zugriffe
+        # auf verschiedene Dokumente nicht gegenseitig blockieren
+        self._shards = [_StatusShard() for _ in range(_SHARD_COUNT)]
         self._storage_dir = storage_dir
-        self._inactive_ids = set()  # IDs inaktiver Status
+        self._file_prefix = os.path.join(storage_dir, '') if storage_dir else ''
+        
+        # Gepufferte Dateischreibvorgänge (Zwischenstände und batch())
+        self._batch_state = threading.local()  # Batch-Tiefe pro Thread
+        self._writer_lock = threading.Lock()  # Schützt den Start des Writer-Threads
+        self._writer_thread = None
+        self._writer_wakeup = threading.Event()  # Gesetzt, sobald Schreibvorgänge anstehen
+        self._flush_interval = 0.2  # Sekunden bis zum automatischen Flush
+    
+    def _shard_for(self, status_id: str) -> _StatusShard:
+        """Gibt den Shard zurück, der für eine Status-ID zuständig ist"""
+        return self._shards[hash(status_id) & (_SHARD_COUNT - 1)]
+    
+    def _file_path(self, status_id: str, kind: str) -> str:
+        """Pfad der Status- ('status') oder Ergebnisdatei ('results') einer Status-ID"""
+        return f"{self._file_prefix}{status_id}_{kind}.json"
     
     def set_storage_dir(self, storage_dir: str):
         """
@@ -39,58 +86,132 @@ class StatusService:
             storage_dir: Verzeichnis für Statusdateien
         """
         self._storage_dir = storage_dir
+        # Verzeichnis einmalig auflösen, statt bei jedem Schreiben zu verknüpfen
+        self._file_prefix = os.path.join(storage_dir, '')
         os.makedirs(storage_dir, exist_ok=True)
         logger.info(f"StatusService Speicherverzeichnis gesetzt: {storage_dir}")
     
-    def get_status(self, status_id: str) -> Dict[str, Any]:
+    def get_status(self, status_id: str, load_result: bool = True) -> Dict[str, Any]:
         """
         Gibt den aktuellen Status zurück
         
         Args:
             status_id: Status-ID
+            load_result: Ob ein separat gespeichertes Ergebnis geladen werden soll.
+                Bei False enthält der Status stattdessen "result_file" mit dem
+                Pfad der Ergebnisdatei und wird nicht in den Cache übernommen
             
         Returns:
             dict: Aktueller Status
         """
-        with self._status_lock:
+        shard = self._shard_for(status_id)
+        
+        with shard.lock:
             # Prüfe, ob Status inaktiv ist
-            if status_id in self._inactive_ids:
+            if status_id in shard.inactive_ids:
                 return {
                     "status": "inactive",
                     "message": "Status ist nicht mehr aktiv",
-                    "updated_at": datetime.utcnow().isoformat() + 'Z'
+                    "updated_at": utc_now_iso()
                 }
             
             # Zuerst im Memory-Cache nachsehen
-            if status_id in self._status_data:
-                return self._status_data[status_id].copy()
+            status_data = shard.status_data.get(status_id)
+        
+        # Falls nicht im Cache, aus Datei laden (ohne Lock, um andere Zugriffe
+        # auf den Shard nicht für die Dauer des Lesens zu blockieren)
+        if status_data is None and self._storage_dir:
+            status_file = self._file_path(status_id, 'status')
+            try:
+                # Unbekannte Status werden u.U. wiederholt abgefragt, bevor (oder
+                # nachdem) es eine Datei gibt - das ist kein Fehler
+                status_data = file_utils.read_json(status_file, missing_ok=True)
+                if status_data:
+                    # In Cache laden, sofern nicht inzwischen ein neuerer Status vorliegt.
+                    # Ein nur in der Ergebnisdatei stehendes Ergebnis bleibt dabei
+                    # ungeladen ("result_in_file"), sodass Abfragen ohne Ergebnis
+                    # nicht erneut auf die Festplatte zugreifen
+                    with shard.lock:
+                        if status_id not in shard.inactive_ids:
+                            status_data = shard.status_data.setdefault(status_id, status_data)
+            except Exception as e:
+                logger.error(f"Fehler beim Laden des Status aus Datei: {e}")
+                status_data = None
+        
+        if status_data:
+            if not status_data.get("result_in_file"):
+                return status_data.copy()
+            
+            # Ergebnis steht nur in der separaten Ergebnisdatei
+            cached = status_data
+            status_data = {key: value for key, value in cached.items() if key != "result_in_file"}
+            results_file = self._file_path(status_id, 'results')
+            if not load_result:
+                status_data["result_file"] = results_file
+                return status_data
             
-            # Falls nicht im Cache, aus Datei laden
-            if self._storage_dir:
-                status_file = os.path.join(self._storage_dir, f"{status_id}_status.json")
-                try:
-                    status_data = file_utils.read_json(status_file)
-                    if status_data:
-                        # In Cache laden
-                        self._status_data[status_id] = status_data
-                        return status_data.copy()
-                except Exception as e:
-                    logger.error(f"Fehler beim Laden des Status aus Datei: {e}")
+            try:
+                result = file_utils.read_json(results_file, use_cache=False)
+            except Exception as e:
+                logger.error(f"Fehler beim Laden des Ergebnisses aus Datei: {e}")
+                result = None
+            
+            if result is not None:
+                status_data["result"] = result
+                
+                # Vollständigen Status cachen, sofern er nicht inzwischen ersetzt wurde
+                with shard.lock:
+                    if shard.status_data.get(status_id) is cached:
+                        shard.status_data[status_id] = status_data
+                        status_data = status_data.copy()
+            
+            return status_data
         
         # Standardstatus, wenn nichts gefunden wurde
         return {
             "status": "unknown",
             "message": "Status nicht gefunden",
-            "updated_at": datetime.utcnow().isoformat() + 'Z'
+            "updated_at": utc_now_iso()
         }
     
+    def read_persisted_status(self, status_id: str, load_result: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Liest den zuletzt geschriebenen Status direkt aus der Statusdatei, am
+        In-Memory-Cache vorbei
+        
+        Für Prozesse, die den Status nicht selbst aktualisieren (z.B. andere
+        Gunicorn-Worker): deren Cache veraltet, die Datei nicht.
+        
+        Args:
+            status_id: Status-ID
+            load_result: Ob ein separat gespeichertes Ergebnis geladen werden soll
+            
+        Returns:
+            dict: Geschriebener Status oder None, falls es keine Statusdatei gibt
+        """
+        if not self._storage_dir:
+            return None
+        
+        stored = file_utils.read_json(self._file_path(status_id, 'status'), missing_ok=True)
+        if not stored:
+            return None
+        
+        status_data = {key: value for key, value in stored.items() if key != "result_in_file"}
+        if load_result and stored.get("result_in_file"):
+            result = file_utils.read_json(self._file_path(status_id, 'results'), use_cache=False, missing_ok=True)
+            if result is not None:
+                status_data["result"] = result
+        
+        return status_data
+    
     def update_status(
         self, 
         status_id: str, 
         status: str,
         progress: Optional[int] = None,
         message: Optional[str] = None,
-        result: Optional[Dict[str, Any]] = None
+        result: Optional[Dict[str, Any]] = None,
+        durable: bool = True
     ) -> bool:
         """
         Aktualisiert den Status und benachrichtigt Observer
@@ -101,21 +222,19 @@ class StatusService:
             progress: Optionaler Fortschritt (0-100)
             message: Optionale Nachricht
             result: Optionales Ergebnis
+            durable: Ob der Status in eine Datei geschrieben werden soll.
+                False hält ihn nur im Speicher (für kurzlebige Zwischenstände).
+                Abschließende Status werden sofort geschrieben, Zwischenstände
+                spätestens nach dem Flush-Intervall
             
         Returns:
             bool: True bei Erfolg
         """
         try:
-            # Prüfe, ob Status inaktiv ist
-            with self._status_lock:
-                if status_id in self._inactive_ids:
-                    logger.warning(f"Versuch, inaktiven Status zu aktualisieren: {status_id}")
-                    return False
-            
             # Status-Objekt erstellen
             status_data = {
                 "status": status,
-                "updated_at": datetime.utcnow().isoformat() + 'Z'
+                "updated_at": utc_now_iso()
             }
             
             # Optionale Felder hinzufügen
@@ -128,13 +247,35 @@ class StatusService:
             if result is not None:
                 status_data["result"] = result
             
-            # Status aktualisieren mit Lock
-            with self._status_lock:
-                self._status_data[status_id] = status_data
+            write_to_file = bool(self._storage_dir and durable)
+            shard = self._shard_for(status_id)
+            
+            # Status unter dem Shard-Lock aktualisieren; die Datei wird erst nach
+            # dessen Freigabe geschrieben
+            with shard.lock:
+                # Prüfe, ob Status inaktiv ist
+                if status_id in shard.inactive_ids:
+                    logger.warning(f"Versuch, inaktiven Status zu aktualisieren: {status_id}")
+                    return False
                 
-                # In Datei speichern, falls Verzeichnis konfiguriert
-                if self._storage_dir:
-                    self._save_to_file(status_id, status_data)
+                shard.status_data[status_id] = status_data
+                if write_to_file and self._is_minor_progress(shard, status_id, status_data):
+                    # Kleiner Fortschritt: nur im Speicher, ein noch gepufferter
+                    # Stand wird aber durch den neuesten ersetzt
+                    write_to_file = False
+                    if status_id in shard.pending_writes:
+                        shard.pending_writes[status_id] = status_data
+                if write_to_file:
+                    shard.pending_writes[status_id] = status_data
+                    shard.persisted[status_id] = (status, progress, time.monotonic())
+            
+            if write_to_file:
+                if self._in_batch() or status not in _WRITE_THROUGH_STATUSES:
+                    # Zwischenstände und Status innerhalb von batch() nur puffern,
+                    # der Writer-Thread schreibt gesammelt
+                    self._schedule_flush()
+                else:
+                    self._write_pending(shard, status_id)
             
             # Observer benachrichtigen (außerhalb des Locks)
             self._notify_observers(status_id, status_data)
@@ -144,6 +285,135 @@ class StatusService:
             logger.error(f"Fehler bei Status-Aktualisierung: {e}")
             return False
     
+    @staticmethod
+    def _is_minor_progress(shard: _StatusShard, status_id: str, status_data: Dict[str, Any]) -> bool:
+        """
+        Prüft, ob ein Zwischenstand nicht geschrieben werden muss, weil sich
+        seit dem zuletzt geschriebenen Stand nur der Fortschritt um weniger als
+        _PERSIST_PROGRESS_STEP erhöht hat und dieser höchstens
+        _PERSIST_MAX_INTERVAL Sekunden alt ist (Shard-Lock muss gehalten werden)
+        
+        Args:
+            shard: Shard der Status-ID
+            status_id: Status-ID
+            status_data: Neuer Status
+            
+        Returns:
+            bool: True, wenn das Schreiben entfallen kann
+        """
+        status = status_data["status"]
+        progress = status_data.get("progress")
+        if status in _WRITE_THROUGH_STATUSES or progress is None or "result" in status_data:
+            return False
+        
+        last = shard.persisted.get(status_id)
+        if last is None or last[0] != status or last[1] is None:
+            return False
+        
+        return (0 <= progress - last[1] < _PERSIST_PROGRESS_STEP
+                and time.monotonic() - last[2] < _PERSIST_MAX_INTERVAL)
+    
+    @contextmanager
+    def batch(self):
+        """
+        Kontextmanager, der Dateischreibvorgänge von update_status() bündelt.
+        
+        Innerhalb des Blocks werden Status sofort im Speicher aktualisiert,
+        aber nur der jeweils letzte Stand pro Status-ID wird geschrieben –
+        spätestens alle 200 ms und beim Verlassen des äußersten Blocks.
+        
+        Example:
+            with get_status_service().batch():
+                for page in pages:
+                    get_status_service().update_status(doc_id, "processing", ...)
+        """
+        depth = getattr(self._batch_state, 'depth', 0)
+        self._batch_state.depth = depth + 1
+        try:
+            yield self
+        finally:
+            self._batch_state.depth = depth
+            if depth == 0:
+                self.flush()
+    
+    def _in_batch(self) -> bool:
+        """Prüft, ob der aktuelle Thread sich in einem batch()-Block befindet"""
+        return getattr(self._batch_state, 'depth', 0) > 0
+    
+    def _schedule_flush(self):
+        """Weckt den Writer-Thread und startet ihn beim ersten Aufruf"""
+        if self._writer_thread is None:
+            with self._writer_lock:
+                if self._writer_thread is None:
+                    self._writer_thread = threading.Thread(
+                        target=self._writer_loop,
+                        name="status-writer",
+                        daemon=True
+                    )
+                    self._writer_thread.start()
+        
+        self._writer_wakeup.set()
+    
+    def _writer_loop(self):
+        """Schreibt gepufferte Status gesammelt, höchstens einmal pro Flush-Intervall"""
+        while True:
+            self._writer_wakeup.wait()
+            
+            # Weitere Aktualisierungen im Intervall sammeln; was nach dem
+            # Zurücksetzen eintrifft, weckt den Thread erneut
+            time.sleep(self._flush_interval)
+            self._writer_wakeup.clear()
+            
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Fehler beim Schreiben gepufferter Status: {e}")
+    
+    def _write_pending(self, shard: _StatusShard, status_id: str) -> bool:
+        """
+        Schreibt den letzten ungeschriebenen Status einer ID in ihre Datei
+        
+        Der Schreib-Lock des Shards hält die Reihenfolge der Dateischreibvorgänge
+        ein: wer ihn zuletzt erhält, schreibt den jeweils neuesten Stand, ein
+        älterer Stand kann einen neueren also nicht überschreiben. Lesezugriffe
+        und Aktualisierungen im Speicher warten dabei nicht auf die Festplatte.
+        
+        Args:
+            shard: Shard der Status-ID
+            status_id: Status-ID
+            
+        Returns:
+            bool: True, wenn ein Status geschrieben wurde
+        """
+        with shard.write_lock:
+            with shard.lock:
+                status_data = shard.pending_writes.pop(status_id, None)
+            
+            if status_data is None:
+                return False
+            
+            return self._save_to_file(status_id, status_data)
+    
+    def flush(self) -> int:
+        """
+        Schreibt alle gepufferten Status in ihre Dateien
+        
+        Returns:
+            int: Anzahl geschriebener Status
+        """
+        written = 0
+        for shard in self._shards:
+            with shard.lock:
+                pending_ids = list(shard.pending_writes)
+            
+            for status_id in pending_ids:
+                if self._write_pending(shard, status_id):
+                    written += 1
+        
+        if written:
+            logger.debug(f"{written} gepufferte Status geschrieben")
+        return written
+    
     def _save_to_file(self, status_id: str, status_data: Dict[str, Any]) -> bool:
         """
         Speichert Status in Datei
@@ -159,17 +429,21 @@ class StatusService:
             if not self._storage_dir:
                 return False
                 
-            status_file = os.path.join(self._storage_dir, f"{status_id}_status.json")
+            status_file = self._file_path(status_id, 'status')
             
-            # Verwende file_utils für atomares Schreiben
-            success = file_utils.write_json(status_file, status_data, atomic=True)
-            
-            # Ergebnisse separat speichern falls vorhanden (für große Objekte)
-            if success and "result" in status_data and status_data["status"] == "completed":
-                results_file = os.path.join(self._storage_dir, f"{status_id}_results.json")
-                file_utils.write_json(results_file, status_data["result"], atomic=True)
+            # Ergebnisse abgeschlossener Status nur einmal serialisieren: sie
+            # landen in der Ergebnisdatei, die Statusdatei verweist darauf
+            if "result" in status_data and status_data["status"] == "completed":
+                results_file = self._file_path(status_id, 'results')
+                if not file_utils.write_json(results_file, status_data["result"], atomic=True, indent=False):
+                    return False
+                
+                status_data = {key: value for key, value in status_data.items() if key != "result"}
+                status_data["result_in_file"] = True
             
-            return success
+            # Verwende file_utils für atomares Schreiben; Statusdateien werden nur
+            # maschinell gelesen, daher kompakt
+            return file_utils.write_json(status_file, status_data, atomic=True, indent=False)
         except Exception as e:
             logger.error(f"Fehler beim Speichern des Status in Datei: {e}")
             return False
@@ -186,20 +460,42 @@ class StatusService:
             bool: True bei Erfolg
         """
         try:
-            with self._status_lock:
+            shard = self._shard_for(status_id)
+            with shard.lock:
                 # Prüfe, ob Status inaktiv ist
-                if status_id in self._inactive_ids:
+                if status_id in shard.inactive_ids:
                     logger.warning(f"Versuch, Observer für inaktiven Status zu registrieren: {status_id}")
                     return False
                     
-                if status_id not in self._observers:
-                    self._observers[status_id] = []
-                self._observers[status_id].append(callback)
+                if status_id not in shard.observers:
+                    shard.observers[status_id] = []
+                shard.observers[status_id].append(callback)
             return True
         except Exception as e:
             logger.error(f"Fehler beim Registrieren des Observers: {e}")
             return False
     
+    def unregister_observer(self, status_id: str, callback: Callable[[Dict[str, Any]], None]) -> bool:
+        """
+        Entfernt einen mit register_observer registrierten Observer
+        
+        Args:
+            status_id: Status-ID
+            callback: Registrierte Callback-Funktion
+            
+        Returns:
+            bool: True, wenn der Observer registriert war
+        """
+        shard = self._shard_for(status_id)
+        with shard.lock:
+            callbacks = shard.observers.get(status_id)
+            if not callbacks or callback not in callbacks:
+                return False
+            callbacks.remove(callback)
+            if not callbacks:
+                del shard.observers[status_id]
+        return True
+    
     def _notify_observers(self, status_id: str, status_data: Dict[str, Any]):
         """
         Benachrichtigt alle Observer eines Status
@@ -211,9 +507,10 @@ class StatusService:
         observers = []
         
         # Hole alle Observer mit Lock
-        with self._status_lock:
-            if status_id in self._observers:
-                observers = self._observers[status_id].copy()
+        shard = self._shard_for(status_id)
+        with shard.lock:
+            if status_id in shard.observers:
+                observers = shard.observers[status_id].copy()
         
         # Benachrichtige Observer außerhalb des Locks
         for callback in observers:
@@ -238,26 +535,32 @@ class StatusService:
         def _delayed_cleanup():
             if delay_seconds > 0:
                 time.sleep(delay_seconds)
-                
-            with self._status_lock:
+            
+            shard = self._shard_for(status_id)
+            with shard.lock:
                 # Markiere als inaktiv
-                self._inactive_ids.add(status_id)
+                shard.inactive_ids.add(status_id)
+                
+                # Verwerfe gepufferte Schreibvorgänge
+                shard.pending_writes.pop(status_id, None)
+                shard.persisted.pop(status_id, None)
                 
                 # Entferne aus dem Cache
-                if status_id in self._status_data:
-                    del self._status_data[status_id]
+                if status_id in shard.status_data:
+                    del shard.status_data[status_id]
                     logger.debug(f"Status-Cache bereinigt für {status_id}")
                 
                 # Entferne Observer
-                if status_id in self._observers:
-                    del self._observers[status_id]
+                if status_id in shard.observers:
+                    del shard.observers[status_id]
                     logger.debug(f"Observer bereinigt für {status_id}")
                 
                 # Begrenze die Anzahl inaktiver IDs
-                if len(self._inactive_ids) > 1000:
-                    # Konvertiere zu Liste, entferne älteste 100 Einträge
-                    inactive_list = list(self._inactive_ids)
-                    self._inactive_ids = set(inactive_list[-900:])
+                if len(shard.inactive_ids) > _MAX_INACTIVE_IDS_PER_SHARD:
+                    # Konvertiere zu Liste, entferne etwa 10 % der Einträge
+                    inactive_list = list(shard.inactive_ids)
+                    keep = _MAX_INACTIVE_IDS_PER_SHARD * 9 // 10
+                    shard.inactive_ids = set(inactive_list[-keep:])
         
         # In Hintergrund-Thread starten
         cleanup_thread = threading.Thread(target=_delayed_cleanup, daemon=True)
@@ -265,9 +568,10 @@ class StatusService:
         
     def clear_inactive_ids(self):
         """Leert die Liste der inaktiven Status-IDs"""
-        with self._status_lock:
-            self._inactive_ids.clear()
-            logger.debug("Liste der inaktiven Status-IDs geleert")
+        for shard in self._shards:
+            with shard.lock:
+                shard.inactive_ids.clear()
+        logger.debug("Liste der inaktiven Status-IDs geleert")
     
     def get_all_active_statuses(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -276,8 +580,14 @@ class StatusService:
         Returns:
             dict: Alle aktiven Status
         """
-        with self._status_lock:
-            return {status_id: status.copy() for status_id, status in self._status_data.items()}
+        statuses = {}
+        for shard in self._shards:
+            with shard.lock:
+                statuses.update(
+                    (status_id, {key: value for key, value in status.items() if key != "result_in_file"})
+                    for status_id, status in shard.status_data.items()
+                )
+        return statuses
 
 # Globale Instanz für einfachen Zugriff
 _status_service = StatusService()
@@ -295,6 +605,9 @@ def initialize_status_service():
     """Initialisiert den globalen StatusService"""
     storage_dir = file_utils.get_status_folder()
     _status_service.set_storage_dir(storage_dir)
+    
+    # Gepufferte Zwischenstände beim Beenden noch schreiben
+    atexit.register(_status_service.flush)
     logger.info(f"StatusService initialisiert mit Verzeichnis: {storage_dir}")
 
 
@@ -306,7 +619,8 @@ def update_document_status(
     status: str, 
     progress: Optional[int] = None, 
     message: Optional[str] = None, 
-    result: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None,
+    durable: bool = True
 ) -> bool:
     """
     Aktualisiert den Dokumentenstatus über den zentralen Service
@@ -318,6 +632,7 @@ def update_document_status(
         progress: Fortschritt
         message: Nachricht
         result: Ergebnis
+        durable: Ob der Status in eine Datei geschrieben werden soll
         
     Returns:
         bool: True bei Erfolg
@@ -327,7 +642,8 @@ def update_document_status(
         status=status,
         progress=progress,
         message=message,
-        result=result
+        result=result,
+        durable=durable
     )
 
 def get_document_status(document_id: str) -> Dict[str, Any]:
@@ -12,7 +12,10 @@ import uuid
 import re
 import time
 import threading
-from typing import List, Dict, Any, Optional, Union, Tuple
+import concurrent.futures
+from collections import deque
+from itertools import chain
+from typing import List, Dict, Any, Optional, Union, Tuple, Iterable, Iterator
 from chromadb.config import Settings
 from chromadb.utils import embedding_functions
 from datetime import datetime
@@ -29,6 +32,11 @@ _db_lock = threading.RLock()
 # Singleton-Instanz
 _vector_storage = None
 
+# Chunks pro Embedding-Batch und Anzahl parallel berechneter Batches beim
+# Speichern eines Dokuments
+EMBEDDING_BATCH_SIZE = 32
+EMBEDDING_CONCURRENCY = 2
+
 class VectorStorage:
     """
     Verbesserte Vektordatenbank-Schnittstelle mit optimiertem Caching und Fehlerbehandlung.
@@ -81,10 +89,15 @@ class VectorStorage:
                     model_dim = model_dimensions.get(ollama_model, fallback_dimension)
                     logger.info(f"Verwende Dimension {model_dim} für Modell {ollama_model}")
                     
+                    # Jeder Dokument-Worker berechnet bis zu EMBEDDING_CONCURRENCY
+                    # Batches gleichzeitig; dazu kommen Suchanfragen der Web-Threads
+                    pool_size = EMBEDDING_CONCURRENCY * config_manager.get('DOC_WORKERS', 2) + 8
+                    
                     self.embedding_function = OllamaEmbeddingFunction(
                         base_url=ollama_url, 
                         model=ollama_model,
-                        fallback_dimension=model_dim
+                        fallback_dimension=model_dim,
+                        pool_maxsize=pool_size
                     )
                     logger.info(f"Ollama-Embedding-Funktion initialisiert mit Modell {ollama_model}")
                     
@@ -285,20 +298,26 @@ class VectorStorage:
         except Exception as e:
             logger.error(f"Fehler bei der Dokumentmigration: {e}")
     
-    def store_document_chunks(self, document_id: str, chunks: List[Dict[str, Any]], 
+    def store_document_chunks(self, document_id: str, chunks: Iterable[Union[Dict[str, Any], str]],
                               metadata: Dict[str, Any]) -> bool:
         """
         Speichert Dokumentchunks in der Vektordatenbank mit korrekter Transaktionsbehandlung
         
+        Die Chunks werden in Batches zu EMBEDDING_BATCH_SIZE gelesen, eingebettet
+        und hinzugefügt; ein Iterator wird dabei nur so weit vorgezogen, wie
+        Batches gerade berechnet werden.
+        
         Args:
             document_id: Eindeutige ID des Dokuments
-            chunks: Liste von Textchunks mit Seitenzuweisung
+            chunks: Liste oder Iterator von Textchunks mit Seitenzuweisung
             metadata: Dokumentmetadaten
             
         Returns:
             bool: Erfolgsstatus
         """
-        if not chunks or len(chunks) == 0:
+        chunk_iter = iter(chunks)
+        first_chunk = next(chunk_iter, None)
+        if first_chunk is None:
             logger.warning(f"Keine Chunks für Dokument {document_id} bereitgestellt")
             return False
         
@@ -313,40 +332,9 @@ class VectorStorage:
             # Füge document_id zu Metadaten hinzu
             formatted_metadata["document_id"] = document_id
             
-            # Bereite Chunk-IDs, Texte und Metadaten vor
-            chunk_ids = []
-            chunk_texts = []
-            chunk_metadatas = []
-            
-            for i, chunk in enumerate(chunks):
-                chunk_id = f"{document_id}_chunk_{i}"
-                chunk_ids.append(chunk_id)
-                
-                # Extrahiere Text aus dem Chunk
-                if isinstance(chunk, dict):
-                    chunk_text = chunk.get('text', '')
-                    page_number = chunk.get('page_number')
-                else:
-                    # Fallback für einfache Textchunks
-                    chunk_text = chunk
-                    page_number = None
-                
-                # Überspringe leere Chunks
-                if not chunk_text.strip():
-                    continue
-                    
-                chunk_texts.append(chunk_text)
-                
-                # Erstelle Metadaten für diesen Chunk
-                chunk_metadata = formatted_metadata.copy()
-                chunk_metadata["chunk_index"] = str(i)
-                chunk_metadata["chunk_count"] = str(len(chunks))
-                
-                # Füge Seitennummer hinzu, falls verfügbar
-                if page_number:
-                    chunk_metadata["page"] = str(page_number)
-                
-                chunk_metadatas.append(chunk_metadata)
+            # Gesamtzahl nur bekannt, wenn eine Liste übergeben wurde
+            if isinstance(chunks, list):
+                formatted_metadata["chunk_count"] = str(len(chunks))
             
             with _db_lock:
                 # Lösche alle existierenden Chunks für dieses Dokument
@@ -362,37 +350,137 @@ class VectorStorage:
                         )
                 except Exception as e:
                     logger.warning(f"Fehler beim Löschen existierender Chunks: {e}")
-                
-                # Füge Chunks in Batches hinzu, um Timeouts zu vermeiden
-                BATCH_SIZE = 50
-                for i in range(0, len(chunk_ids), BATCH_SIZE):
-                    end_i = min(i + BATCH_SIZE, len(chunk_ids))
-                    
-                    batch_ids = chunk_ids[i:end_i]
-                    batch_texts = chunk_texts[i:end_i]
-                    batch_metadatas = chunk_metadatas[i:end_i]
-                        
-                    try:
-                        collection.add(
-                            ids=batch_ids,
-                            documents=batch_texts,
-                            metadatas=batch_metadatas
-                        )
-                        logger.info(f"Batch {i//BATCH_SIZE + 1} mit {len(batch_ids)} Chunks hinzugefügt")
-                    except Exception as e:
-                        logger.error(f"Fehler beim Hinzufügen von Chunk-Batch: {e}")
-                        # Mit nächstem Batch fortfahren, anstatt komplett zu fehlschlagen
-                
-                # Leere den Cache für Anfragen, die dieses Dokument betreffen könnten
-                self._clear_search_cache_for_document(document_id)
             
-            logger.info(f"{len(chunk_ids)} Chunks für Dokument {document_id} erfolgreich gespeichert")
+            batches = self._iter_chunk_batches(document_id, chain([first_chunk], chunk_iter), formatted_metadata)
+            stored = 0
+            
+            # Embeddings parallel zum Hinzufügen berechnen; höchstens
+            # EMBEDDING_CONCURRENCY Batches sind gleichzeitig in Arbeit
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=EMBEDDING_CONCURRENCY, thread_name_prefix='chunk-embedding'
+            ) as pool:
+                pending = deque()
+                for batch in batches:
+                    pending.append((batch, pool.submit(self._embed_batch, batch[1])))
+                    if len(pending) >= EMBEDDING_CONCURRENCY:
+                        stored += self._add_chunk_batch(collection, document_id, *pending.popleft())
+                while pending:
+                    stored += self._add_chunk_batch(collection, document_id, *pending.popleft())
+            
+            # Leere den Cache für Anfragen, die dieses Dokument betreffen könnten
+            self._clear_search_cache_for_document(document_id)
+            
+            logger.info(f"{stored} Chunks für Dokument {document_id} erfolgreich gespeichert")
             return True
             
         except Exception as e:
             logger.error(f"Fehler beim Speichern von Dokumentchunks: {e}")
             return False
     
+    def _iter_chunk_batches(self, document_id: str, chunks: Iterator[Union[Dict[str, Any], str]],
+                            formatted_metadata: Dict[str, str]) -> Iterator[Tuple[List[str], List[str], List[Dict[str, str]]]]:
+        """
+        Fasst Chunks zu Batches aus IDs, Texten und Metadaten zusammen
+        
+        Args:
+            document_id: Eindeutige ID des Dokuments
+            chunks: Iterator von Textchunks
+            formatted_metadata: Für ChromaDB formatierte Dokumentmetadaten
+            
+        Yields:
+            tuple: (Chunk-IDs, Texte, Metadaten) mit höchstens EMBEDDING_BATCH_SIZE Einträgen
+        """
+        chunk_ids = []
+        chunk_texts = []
+        chunk_metadatas = []
+        
+        for i, chunk in enumerate(chunks):
+            # Extrahiere Text aus dem Chunk
+            if isinstance(chunk, dict):
+                chunk_text = chunk.get('text', '')
+                page_number = chunk.get('page_number')
+            else:
+                # Fallback für einfache Textchunks
+                chunk_text = chunk
+                page_number = None
+            
+            # Überspringe leere Chunks
+            if not chunk_text.strip():
+                continue
+            
+            chunk_ids.append(f"{document_id}_chunk_{i}")
+            chunk_texts.append(chunk_text)
+            
+            # Erstelle Metadaten für diesen Chunk
+            chunk_metadata = formatted_metadata.copy()
+            chunk_metadata["chunk_index"] = str(i)
+            
+            # Füge Seitennummer hinzu, falls verfügbar
+            if page_number:
+                chunk_metadata["page"] = str(page_number)
+            
+            chunk_metadatas.append(chunk_metadata)
+            
+            if len(chunk_ids) >= EMBEDDING_BATCH_SIZE:
+                yield chunk_ids, chunk_texts, chunk_metadatas
+                chunk_ids, chunk_texts, chunk_metadatas = [], [], []
+        
+        if chunk_ids:
+            yield chunk_ids, chunk_texts, chunk_metadatas
+    
+    def _embed_batch(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """
+        Berechnet die Embeddings eines Batches außerhalb des Datenbank-Locks
+        
+        Args:
+            texts: Texte der Chunks
+            
+        Returns:
+            list: Embeddings; None, wenn ChromaDB beim Hinzufügen selbst einbetten soll
+        """
+        if self.embedding_function is None:
+            return None
+        
+        try:
+            return self.embedding_function(texts)
+        except Exception as e:
+            logger.warning(f"Fehler beim Berechnen der Embeddings, überlasse es ChromaDB: {e}")
+            return None
+    
+    def _add_chunk_batch(self, collection, document_id: str,
+                         batch: Tuple[List[str], List[str], List[Dict[str, str]]],
+                         embeddings_future: concurrent.futures.Future) -> int:
+        """
+        Fügt einen Batch mit seinen vorab berechneten Embeddings hinzu
+        
+        Args:
+            collection: ChromaDB-Kollektion
+            document_id: Eindeutige ID des Dokuments
+            batch: (Chunk-IDs, Texte, Metadaten)
+            embeddings_future: Future mit den Embeddings des Batches
+            
+        Returns:
+            int: Anzahl hinzugefügter Chunks
+        """
+        batch_ids, batch_texts, batch_metadatas = batch
+        
+        try:
+            # Auf die Embeddings warten, bevor der globale Datenbank-Lock belegt wird
+            embeddings = embeddings_future.result()
+            with _db_lock:
+                collection.add(
+                    ids=batch_ids,
+                    documents=batch_texts,
+                    metadatas=batch_metadatas,
+                    embeddings=embeddings
+                )
+            logger.info(f"Batch mit {len(batch_ids)} Chunks für Dokument {document_id} hinzugefügt")
+            return len(batch_ids)
+        except Exception as e:
+            logger.error(f"Fehler beim Hinzufügen von Chunk-Batch: {e}")
+            # Mit nächstem Batch fortfahren, anstatt komplett zu fehlschlagen
+            return 0
+    
     def _format_metadata_for_chroma(self, metadata: Dict[str, Any]) -> Dict[str, str]:
         """
         Formatiert Metadaten für ChromaDB
@@ -0,0 +1,213 @@
+# Backend/utils/analysis_cache.py
+"""
+Persistenter Cache für Analyseergebnisse, adressiert über den Inhalts-Hash
+der PDF-Datei. Identische Dateien werden nicht erneut analysiert.
+"""
+import os
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from config import config_manager
+from utils.file_utils import dump_json, parse_json
+
+logger = logging.getLogger(__name__)
+
+# Gültigkeitsdauer eines Cache-Eintrags (7 Tage)
+CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Bei Änderungen an der Analyse erhöhen, um alte Ergebnisse zu invalidieren
+CACHE_VERSION = 1
+
+# Blockgröße beim Hashen der Datei
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+_connection: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+def hash_file(filepath: str) -> str:
+    """
+    Berechnet den BLAKE2b-Hash einer Datei blockweise
+
+    Args:
+        filepath: Pfad zur Datei
+
+    Returns:
+        str: Hex-Digest (32 Zeichen)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def make_key(file_hash: str, settings: Dict[str, Any]) -> str:
+    """
+    Bildet den Cache-Schlüssel aus Datei-Hash und ergebnisrelevanten Einstellungen
+
+    Args:
+        file_hash: Ergebnis von hash_file()
+        settings: Verarbeitungseinstellungen (maxPages, performOCR, chunkSize, chunkOverlap)
+
+    Returns:
+        str: Cache-Schlüssel
+    """
+    return f"{file_hash}:{settings_fingerprint(settings)}"
+
+def settings_fingerprint(settings: Dict[str, Any]) -> str:
+    """
+    Fasst die ergebnisrelevanten Verarbeitungseinstellungen zu einem String zusammen
+
+    Args:
+        settings: Verarbeitungseinstellungen
+
+    Returns:
+        str: Fingerabdruck der Einstellungen
+    """
+    return (
+        f"{settings.get('maxPages', 0)}:{int(bool(settings.get('performOCR', False)))}:"
+        f"{settings.get('chunkSize', 1000)}:{settings.get('chunkOverlap', 200)}"
+    )
+
+def _get_connection() -> sqlite3.Connection:
+    """Öffnet die Cache-Datenbank beim ersten Zugriff (Lock muss gehalten werden)"""
+    global _connection
+
+    if _connection is None:
+        upload_folder = config_manager.get('UPLOAD_FOLDER', './uploads')
+        cache_dir = os.path.join(upload_folder, 'analysis_cache')
+        os.makedirs(cache_dir, exist_ok=True)
+
+        _connection = sqlite3.connect(
+            os.path.join(cache_dir, 'analysis.sqlite3'),
+            check_same_thread=False
+        )
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS analysis ("
+            "key TEXT PRIMARY KEY, "
+            "json TEXT NOT NULL, "
+            "created_at INTEGER NOT NULL, "
+            "version INTEGER NOT NULL)"
+        )
+        # Zuordnung DOI + Einstellungen -> Analyseergebnis
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_doi ("
+            "doi TEXT NOT NULL, "
+            "settings TEXT NOT NULL, "
+            "key TEXT NOT NULL, "
+            "PRIMARY KEY (doi, settings))"
+        )
+        _connection.commit()
+        logger.info(f"Analyse-Cache geöffnet: {cache_dir}")
+
+    return _connection
+
+def get_cached(key: str, ttl: int = CACHE_TTL_SECONDS) -> Optional[Dict[str, Any]]:
+    """
+    Holt ein Analyseergebnis aus dem Cache
+
+    Args:
+        key: Schlüssel aus make_key()
+        ttl: Maximales Alter des Eintrags in Sekunden
+
+    Returns:
+        dict: Gecachtes Analyseergebnis oder None
+    """
+    try:
+        with _lock:
+            row = _get_connection().execute(
+                "SELECT json FROM analysis WHERE key = ? AND version = ? AND created_at >= ?",
+                (key, CACHE_VERSION, int(time.time()) - ttl)
+            ).fetchone()
+        return parse_json(row[0]) if row else None
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning(f"Fehler beim Lesen aus dem Analyse-Cache: {e}")
+        return None
+
+def store(key: str, result: Dict[str, Any]) -> bool:
+    """
+    Speichert ein Analyseergebnis im Cache
+
+    Args:
+        key: Schlüssel aus make_key()
+        result: Analyseergebnis (DocumentProcessingResult.to_dict())
+
+    Returns:
+        bool: True bei Erfolg
+    """
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO analysis (key, json, created_at, version) VALUES (?, ?, ?, ?)",
+                (key, dump_json(result, indent=False), int(time.time()), CACHE_VERSION)
+            )
+            connection.commit()
+        return True
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        logger.warning(f"Fehler beim Schreiben in den Analyse-Cache: {e}")
+        return False
+
+def get_cached_by_doi(doi: str, settings: Dict[str, Any], ttl: int = CACHE_TTL_SECONDS) -> Optional[Dict[str, Any]]:
+    """
+    Holt ein Analyseergebnis über die DOI des Dokuments
+
+    Args:
+        doi: Normalisierte DOI
+        settings: Verarbeitungseinstellungen
+        ttl: Maximales Alter des Eintrags in Sekunden
+
+    Returns:
+        dict: Gecachtes Analyseergebnis oder None
+    """
+    try:
+        with _lock:
+            row = _get_connection().execute(
+                "SELECT a.json FROM analysis_doi d JOIN analysis a ON a.key = d.key "
+                "WHERE d.doi = ? AND d.settings = ? AND a.version = ? AND a.created_at >= ?",
+                (doi, settings_fingerprint(settings), CACHE_VERSION, int(time.time()) - ttl)
+            ).fetchone()
+        return parse_json(row[0]) if row else None
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning(f"Fehler beim Lesen aus dem Analyse-Cache: {e}")
+        return None
+
+def store_doi(doi: str, settings: Dict[str, Any], key: str) -> bool:
+    """
+    Verknüpft eine DOI mit einem gespeicherten Analyseergebnis
+
+    Args:
+        doi: Normalisierte DOI
+        settings: Verarbeitungseinstellungen
+        key: Schlüssel des Ergebnisses aus make_key()
+
+    Returns:
+        bool: True bei Erfolg
+    """
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO analysis_doi (doi, settings, key) VALUES (?, ?, ?)",
+                (doi, settings_fingerprint(settings), key)
+            )
+            connection.commit()
+        return True
+    except sqlite3.Error as e:
+        logger.warning(f"Fehler beim Schreiben in den Analyse-Cache: {e}")
+        return False
+
+def clear_cache() -> None:
+    """Leert den Analyse-Cache"""
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute("DELETE FROM analysis_doi")
+            connection.execute("DELETE FROM analysis")
+            connection.commit()
+        logger.info("Analyse-Cache geleert")
+    except sqlite3.Error as e:
+        logger.warning(f"Fehler beim Leeren des Analyse-Cache: {e}")
@@ -5,16 +5,71 @@ Verbesserte Version mit zentralisierter Konfiguration und Fehlerbehandlung.
 """
 import os
 import jwt
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 from flask import request, jsonify, current_app, g
 import logging
-from typing import Optional, Callable, Dict, Any, Union
+from typing import Optional, Callable, Dict, Any, Union, Tuple
 
 from utils.error_handler import unauthorized, APIError
 from config import config_manager
 
 logger = logging.getLogger(__name__)
 
+# Cache decodierter Token: spart HMAC-Prüfung und JSON-Parsing bei jeder Anfrage
+TOKEN_CACHE_SIZE = 1024
+TOKEN_CACHE_TTL_SECONDS = 300
+
+_token_cache: 'OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]' = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+def _decode_token(token: str, secret_key: str) -> Dict[str, Any]:
+    """
+    Decodiert ein JWT-Token und merkt sich das Ergebnis für gültige Token
+    
+    Einträge verfallen nach TOKEN_CACHE_TTL_SECONDS, spätestens aber mit dem
+    Ablaufzeitpunkt des Tokens. Ungültige Token werden nicht gespeichert.
+    
+    Args:
+        token: JWT-Token
+        secret_key: Schlüssel für die Signaturprüfung
+        
+    Returns:
+        dict: Token-Payload
+        
+    Raises:
+        jwt.ExpiredSignatureError: Wenn Token abgelaufen ist
+        jwt.InvalidTokenError: Wenn Token ungültig ist oder kein 'sub' enthält
+    """
+    key = (secret_key, token)
+    now = time.time()
+    
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                _token_cache.move_to_end(key)
+                return dict(entry[1])
+            del _token_cache[key]
+    
+    # Token ohne Subjekt sind für die Benutzerzuordnung wertlos und werden abgelehnt
+    payload = jwt.decode(token, secret_key, algorithms=['HS256'], options={'require': ['sub']})
+    
+    expires_at = now + TOKEN_CACHE_TTL_SECONDS
+    exp = payload.get('exp')
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, exp)
+    
+    with _token_cache_lock:
+        _token_cache[key] = (expires_at, payload)
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    
+    return dict(payload)
+
 def get_token_from_header() -> Optional[str]:
     """
     Extrahiert JWT-Token aus Authorization-Header
@@ -48,37 +103,37 @@ def get_user_id() -> str:
     if hasattr(g, 'user_id'):
         return g.user_id
     
-    # Aus Authorization-Header holen
-    token = get_token_from_header()
-    if token:
-        try:
-            # Hole Secret-Key aus Konfiguration
-            secret_key = config_manager.get('SECRET_KEY')
-            if not secret_key:
-                logger.warning("SECRET_KEY nicht konfiguriert")
-                return user_id
-                
-            payload = jwt.decode(token, secret_key, algorithms=['HS256'])
-            user_id = payload.get('sub', user_id)
-            
-            # Speichere in g für spätere Verwendung
-            g.user_id = user_id
-            g.user_email = payload.get('email')
-            g.user_name = payload.get('name')
-            
-            logger.debug(f"Benutzer aus Token erkannt: {user_id}")
-        except jwt.ExpiredSignatureError:
-            logger.warning("Token abgelaufen")
-        except jwt.InvalidTokenError as e:
-            logger.warning(f"Ungültiges Token: {e}")
-        except Exception as e:
-            logger.error(f"Fehler beim Decodieren des Tokens: {e}")
-    
-    # Fallback auf X-User-ID-Header
+    # X-User-ID-Header hat Vorrang; das Token muss dann nicht decodiert werden
     header_user_id = request.headers.get('X-User-ID')
     if header_user_id:
         user_id = header_user_id
         logger.debug(f"Benutzer aus X-User-ID-Header: {user_id}")
+    else:
+        # Aus Authorization-Header holen
+        token = get_token_from_header()
+        if token:
+            try:
+                # Hole Secret-Key aus Konfiguration
+                secret_key = config_manager.get('SECRET_KEY')
+                if not secret_key:
+                    logger.warning("SECRET_KEY nicht konfiguriert")
+                    return user_id
+                    
+                payload = _decode_token(token, secret_key)
+                user_id = payload['sub']
+                
+                # Speichere in g für spätere Verwendung
+                g.user_id = user_id
+                g.user_email = payload.get('email')
+                g.user_name = payload.get('name')
+                
+                logger.debug(f"Benutzer aus Token erkannt: {user_id}")
+            except jwt.ExpiredSignatureError:
+                logger.warning("Token abgelaufen")
+            except jwt.InvalidTokenError as e:
+                logger.warning(f"Ungültiges Token: {e}")
+            except Exception as e:
+                logger.error(f"Fehler beim Decodieren des Tokens: {e}")
     
     # Test-Modus-Behandlung
     test_user_enabled = config_manager.get('TEST_USER_ENABLED', False)
@@ -110,7 +165,7 @@ def verify_token(token: str) -> Dict[str, Any]:
     if not secret_key:
         raise APIError("Serverkonfigurationsfehler", 500)
     
-    return jwt.decode(token, secret_key, algorithms=['HS256'])
+    return _decode_token(token, secret_key)
 
 def verify_token_with_options(token: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
     """
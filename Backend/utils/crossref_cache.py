@@ -0,0 +1,317 @@
+# Backend/utils/crossref_cache.py
+"""
+Persistenter Cache für CrossRef-DOI-Abfragen auf Basis von SQLite.
+Wiederholte Abfragen derselben DOI werden ohne Netzwerkzugriff beantwortet;
+DOIs, die CrossRef nicht kennt, werden für kürzere Zeit ebenfalls gemerkt.
+"""
+import os
+import json
+import functools
+import importlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from config import config_manager
+
+logger = logging.getLogger(__name__)
+
+# Gültigkeitsdauer eines Cache-Eintrags (30 Tage)
+CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# Gültigkeitsdauer eines Negativ-Eintrags (DOI bei CrossRef unbekannt)
+NOT_FOUND_TTL_SECONDS = 24 * 60 * 60
+
+# Bei Änderungen an der Abruflogik erhöhen, um alte Einträge zu invalidieren
+CACHE_VERSION = 1
+
+# Gültigkeitsdauer der Registrierungsagentur eines DOI-Präfixes (ändert sich praktisch nie)
+AGENCY_TTL_SECONDS = 365 * 24 * 60 * 60
+
+_DOI_PREFIXES = ('https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/', 'http://dx.doi.org/', 'doi:')
+
+_connection: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+# Registrierungsagenturen bereits nachgeschlagener DOI-Präfixe (Präfix -> Agentur)
+_agencies: Dict[str, str] = {}
+
+def normalize_doi(doi: str) -> str:
+    """
+    Normalisiert eine DOI für die Verwendung als Cache-Schlüssel
+
+    Args:
+        doi: DOI in beliebiger Schreibweise (auch als URL)
+
+    Returns:
+        str: Normalisierte DOI in Kleinbuchstaben
+    """
+    doi = doi.strip().lower()
+    for prefix in _DOI_PREFIXES:
+        doi = doi.removeprefix(prefix)
+    return doi.strip()
+
+def _get_connection() -> sqlite3.Connection:
+    """Öffnet die Cache-Datenbank beim ersten Zugriff (Lock muss gehalten werden)"""
+    global _connection
+
+    if _connection is None:
+        upload_folder = config_manager.get('UPLOAD_FOLDER', './uploads')
+        cache_dir = os.path.join(upload_folder, 'crossref_cache')
+        os.makedirs(cache_dir, exist_ok=True)
+
+        _connection = sqlite3.connect(
+            os.path.join(cache_dir, 'crossref.sqlite3'),
+            check_same_thread=False
+        )
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS crossref ("
+            "doi TEXT PRIMARY KEY, "
+            "json TEXT NOT NULL, "
+            "fetched_at INTEGER NOT NULL, "
+            "version INTEGER NOT NULL)"
+        )
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS doi_agencies ("
+            "prefix TEXT PRIMARY KEY, "
+            "agency TEXT NOT NULL, "
+            "fetched_at INTEGER NOT NULL)"
+        )
+        _connection.commit()
+        logger.info(f"CrossRef-Cache geöffnet: {cache_dir}")
+
+    return _connection
+
+@functools.lru_cache(maxsize=None)
+def _crossref_fetcher() -> Callable[[str], Tuple[Optional[Dict[str, Any]], bool]]:
+    """
+    Löst fetch_crossref_work einmalig auf
+
+    api.metadata importiert dieses Modul, daher kann der Import nicht auf
+    Modulebene stehen.
+    """
+    return importlib.import_module('api.metadata').fetch_crossref_work
+
+@functools.lru_cache(maxsize=None)
+def _crossref_batch_fetcher() -> Callable[[List[str]], Dict[str, Tuple[Optional[Dict[str, Any]], bool]]]:
+    """Löst fetch_crossref_works einmalig auf (siehe _crossref_fetcher)"""
+    return importlib.import_module('api.metadata').fetch_crossref_works
+
+@functools.lru_cache(maxsize=None)
+def _agency_fetcher() -> Callable[[str], Optional[str]]:
+    """Löst fetch_doi_registration_agency einmalig auf (siehe _crossref_fetcher)"""
+    return importlib.import_module('api.metadata').fetch_doi_registration_agency
+
+def registration_agency(doi: str) -> Optional[str]:
+    """
+    Ermittelt die Registrierungsagentur einer DOI anhand ihres Präfixes
+    
+    Jedes Präfix wird nur einmal bei doi.org nachgeschlagen und danach im
+    Speicher und in der Cache-Datenbank gemerkt.
+    
+    Args:
+        doi: Normalisierte DOI
+        
+    Returns:
+        str: Agentur in Kleinbuchstaben (z.B. 'crossref', 'datacite') oder
+            None, wenn sie nicht ermittelt werden konnte
+    """
+    prefix = doi.split('/', 1)[0]
+    agency = _agencies.get(prefix)
+    if agency is not None:
+        return agency
+    
+    try:
+        with _lock:
+            row = _get_connection().execute(
+                "SELECT agency FROM doi_agencies WHERE prefix = ? AND fetched_at >= ?",
+                (prefix, int(time.time()) - AGENCY_TTL_SECONDS)
+            ).fetchone()
+        if row:
+            _agencies[prefix] = row[0]
+            return row[0]
+    except sqlite3.Error as e:
+        logger.warning(f"Fehler beim Lesen aus dem CrossRef-Cache: {e}")
+    
+    agency = _agency_fetcher()(prefix)
+    if not agency:
+        return None
+    
+    agency = agency.lower()
+    _agencies[prefix] = agency
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO doi_agencies (prefix, agency, fetched_at) VALUES (?, ?, ?)",
+                (prefix, agency, int(time.time()))
+            )
+            connection.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"Fehler beim Schreiben in den CrossRef-Cache: {e}")
+    
+    return agency
+
+def is_crossref_doi(doi: str) -> bool:
+    """
+    Prüft, ob eine DOI bei CrossRef registriert sein kann
+    
+    Args:
+        doi: Normalisierte DOI
+        
+    Returns:
+        bool: False nur, wenn das Präfix nachweislich einer anderen Agentur
+            (z.B. DataCite, mEDRA) gehört
+    """
+    agency = registration_agency(doi)
+    return agency is None or agency == 'crossref'
+
+def _lookup(doi: str, ttl: int = CACHE_TTL_SECONDS) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Sucht eine DOI im Cache
+
+    Args:
+        doi: Normalisierte DOI
+        ttl: Maximales Alter eines positiven Eintrags in Sekunden
+
+    Returns:
+        tuple: (Treffer, CrossRef-Antwort); bei einem Negativ-Eintrag (True, None)
+    """
+    now = int(time.time())
+    try:
+        with _lock:
+            row = _get_connection().execute(
+                "SELECT json FROM crossref WHERE doi = ? AND version = ? "
+                "AND fetched_at >= CASE WHEN json = 'null' THEN ? ELSE ? END",
+                (doi, CACHE_VERSION, now - NOT_FOUND_TTL_SECONDS, now - ttl)
+            ).fetchone()
+        return (True, json.loads(row[0])) if row else (False, None)
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning(f"Fehler beim Lesen aus dem CrossRef-Cache: {e}")
+        return False, None
+
+def get_cached(doi: str, ttl: int = CACHE_TTL_SECONDS) -> Optional[Dict[str, Any]]:
+    """
+    Holt eine CrossRef-Antwort aus dem Cache
+
+    Args:
+        doi: Normalisierte DOI
+        ttl: Maximales Alter des Eintrags in Sekunden
+
+    Returns:
+        dict: Gecachte CrossRef-Antwort oder None
+    """
+    return _lookup(doi, ttl)[1]
+
+def store(doi: str, data: Optional[Dict[str, Any]]) -> bool:
+    """
+    Speichert eine vollständige CrossRef-Antwort im Cache
+
+    Args:
+        doi: Normalisierte DOI
+        data: CrossRef-Antwort (Feld 'message'); None merkt die DOI als
+            bei CrossRef unbekannt (NOT_FOUND_TTL_SECONDS)
+
+    Returns:
+        bool: True bei Erfolg
+    """
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO crossref (doi, json, fetched_at, version) VALUES (?, ?, ?, ?)",
+                (doi, json.dumps(data), int(time.time()), CACHE_VERSION)
+            )
+            connection.commit()
+        return True
+    except (sqlite3.Error, TypeError) as e:
+        logger.warning(f"Fehler beim Schreiben in den CrossRef-Cache: {e}")
+        return False
+
+def cached_fetch(doi: str, ttl: int = CACHE_TTL_SECONDS, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Ruft CrossRef-Metadaten ab und verwendet dabei den persistenten Cache
+
+    Args:
+        doi: Digital Object Identifier
+        ttl: Maximales Alter eines Cache-Eintrags in Sekunden
+        force_refresh: Cache überspringen und den Eintrag mit der aktuellen
+            Antwort von CrossRef ersetzen
+
+    Returns:
+        dict: CrossRef-Metadaten oder None bei Fehler
+    """
+    if not doi:
+        return None
+
+    key = normalize_doi(doi)
+
+    if not force_refresh:
+        hit, cached = _lookup(key, ttl)
+        if hit:
+            logger.debug(f"CrossRef-Cache-Treffer für DOI {key}")
+            return cached
+
+    if not is_crossref_doi(key):
+        logger.debug(f"DOI {key} ist nicht bei CrossRef registriert, Abfrage übersprungen")
+        return None
+
+    data, not_found = _crossref_fetcher()(key)
+    if data:
+        store(key, data)
+    elif not_found:
+        store(key, None)
+
+    return data
+
+def cached_fetch_many(dois: List[str], ttl: int = CACHE_TTL_SECONDS,
+                      force_refresh: bool = False) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Ruft CrossRef-Metadaten mehrerer DOIs ab; nur nicht gecachte DOIs werden
+    gemeinsam als Batch abgefragt
+
+    Args:
+        dois: Digital Object Identifiers
+        ttl: Maximales Alter eines Cache-Eintrags in Sekunden
+        force_refresh: Cache überspringen und alle DOIs neu abfragen
+
+    Returns:
+        dict: Übergebene DOI -> CrossRef-Metadaten (None bei Fehler)
+    """
+    keys = {doi: normalize_doi(doi) for doi in dois if doi}
+
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    missing = []
+    for key in dict.fromkeys(keys.values()):
+        hit, cached = (False, None) if force_refresh else _lookup(key, ttl)
+        if hit:
+            results[key] = cached
+        elif is_crossref_doi(key):
+            missing.append(key)
+        else:
+            results[key] = None
+
+    if missing:
+        for key, (data, not_found) in _crossref_batch_fetcher()(missing).items():
+            if data:
+                store(key, data)
+            elif not_found:
+                store(key, None)
+            results[key] = data
+
+    return {doi: results.get(key) for doi, key in keys.items()}
+
+def clear_cache() -> None:
+    """Leert den CrossRef-Cache"""
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute("DELETE FROM crossref")
+            connection.execute("DELETE FROM doi_agencies")
+            connection.commit()
+        _agencies.clear()
+        logger.info("CrossRef-Cache geleert")
+    except sqlite3.Error as e:
+        logger.warning(f"Fehler beim Leeren des CrossRef-Caches: {e}")
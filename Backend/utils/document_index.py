@@ -0,0 +1,457 @@
+# Backend/utils/document_index.py
+"""
+Persistenter Index der Dokument-Metadaten auf Basis von SQLite.
+Die JSON-Dateien neben den PDFs bleiben die Ablage; Auflisten und Nachschlagen
+einzelner Dokumente laufen über den Index statt über Verzeichnis-Scans.
+"""
+import os
+import logging
+import sqlite3
+import threading
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from config import config_manager
+from utils.file_utils import dump_json, parse_json, write_json
+
+logger = logging.getLogger(__name__)
+
+# Zeilen pro Abfrage beim Streamen der Dokumentliste (siehe iter_documents)
+STREAM_BATCH_SIZE = 200
+
+_connection: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+def _raw(blob: Any) -> bytes:
+    """Gibt eine gespeicherte Metadaten-Zeile unverändert als UTF-8-Bytes zurück"""
+    return blob if isinstance(blob, bytes) else blob.encode('utf-8')
+
+def _get_connection() -> sqlite3.Connection:
+    """Öffnet die Index-Datenbank beim ersten Zugriff (Lock muss gehalten werden)"""
+    global _connection
+
+    if _connection is None:
+        upload_folder = config_manager.get('UPLOAD_FOLDER', './uploads')
+        index_dir = os.path.join(upload_folder, 'document_index')
+        os.makedirs(index_dir, exist_ok=True)
+
+        _connection = sqlite3.connect(
+            os.path.join(index_dir, 'documents.sqlite3'),
+            check_same_thread=False
+        )
+        # WAL: Schreibvorgänge blockieren Leser in anderen Prozessen (z.B.
+        # weitere Gunicorn-Worker) nicht; NORMAL genügt im WAL-Modus für
+        # Konsistenz, die Dateien neben den PDFs bleiben ohnehin die Ablage
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute("PRAGMA synchronous=NORMAL")
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "user_id TEXT NOT NULL, "
+            "document_id TEXT NOT NULL, "
+            "file_path TEXT NOT NULL, "
+            "upload_date TEXT NOT NULL, "
+            "json TEXT NOT NULL, "
+            "PRIMARY KEY (user_id, document_id))"
+        )
+        _connection.execute(
+            "CREATE INDEX IF NOT EXISTS documents_by_upload_date "
+            "ON documents (user_id, upload_date DESC)"
+        )
+        # Benutzer, deren Verzeichnis vollständig in den Index übernommen wurde
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS indexed_users (user_id TEXT PRIMARY KEY)"
+        )
+        # Inhalts-Hash und Einstellungen (metadata['content_hash'] und
+        # ['settings_fingerprint']) -> Dokumente, um erneute Uploads derselben
+        # Datei zu erkennen; eine Zeile pro Dokument, damit das Löschen einer
+        # Kopie die übrigen nicht unauffindbar macht
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS content_hashes ("
+            "user_id TEXT NOT NULL, "
+            "content_hash TEXT NOT NULL, "
+            "settings TEXT NOT NULL, "
+            "document_id TEXT NOT NULL, "
+            "PRIMARY KEY (user_id, content_hash, settings, document_id))"
+        )
+        _connection.execute(
+            "CREATE INDEX IF NOT EXISTS content_hashes_by_document "
+            "ON content_hashes (user_id, document_id)"
+        )
+        # Frühere Tabelle mit nur einem Dokument pro Hash und ohne Einstellungen;
+        # deren Dokumente haben keinen settings_fingerprint und werden nicht
+        # mehr als Duplikat erkannt
+        _connection.execute("DROP TABLE IF EXISTS document_hashes")
+        _connection.commit()
+        logger.info(f"Dokument-Index geöffnet: {index_dir}")
+
+    return _connection
+
+def _hash_row(user_id: str, document_id: str, metadata: Dict[str, Any]) -> Optional[Tuple[str, str, str, str]]:
+    """Zeile für content_hashes oder None, wenn die Metadaten keinen Hash enthalten"""
+    if not document_id or not metadata.get('content_hash') or not metadata.get('settings_fingerprint'):
+        return None
+    return (user_id, metadata['content_hash'], metadata['settings_fingerprint'], document_id)
+
+def store(user_id: str, document_id: str, file_path: str, metadata: Dict[str, Any],
+          serialized: Optional[bytes] = None) -> bool:
+    """
+    Übernimmt die Metadaten eines Dokuments in den Index
+
+    Args:
+        user_id: Benutzer-ID
+        document_id: Dokument-ID
+        file_path: Pfad zur PDF-Datei (die Metadaten liegen unter f"{file_path}.json")
+        metadata: Metadaten wie in der JSON-Datei gespeichert
+        serialized: Bereits serialisierte Metadaten (kompaktes JSON)
+
+    Returns:
+        bool: True bei Erfolg
+    """
+    if not user_id or not document_id:
+        return False
+
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO documents (user_id, document_id, file_path, upload_date, json) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (user_id, document_id, file_path, metadata.get('uploadDate') or '',
+                 serialized if serialized is not None else dump_json(metadata, indent=False))
+            )
+            connection.execute(
+                "DELETE FROM content_hashes WHERE user_id = ? AND document_id = ?",
+                (user_id, document_id)
+            )
+            hash_row = _hash_row(user_id, document_id, metadata)
+            if hash_row:
+                connection.execute(
+                    "INSERT OR IGNORE INTO content_hashes (user_id, content_hash, settings, document_id) "
+                    "VALUES (?, ?, ?, ?)",
+                    hash_row
+                )
+            connection.commit()
+        return True
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        logger.warning(f"Fehler beim Schreiben in den Dokument-Index: {e}")
+        return False
+
+def save_metadata(user_id: Optional[str], document_id: str, file_path: str, metadata: Dict[str, Any]) -> bool:
+    """
+    Schreibt die Metadaten-Datei eines Dokuments und übernimmt sie in den Index;
+    die Metadaten werden dafür nur einmal serialisiert
+
+    Args:
+        user_id: Benutzer-ID (ohne sie wird nur die Datei geschrieben)
+        document_id: Dokument-ID
+        file_path: Pfad zur PDF-Datei (die Metadaten liegen unter f"{file_path}.json")
+        metadata: Metadaten
+
+    Returns:
+        bool: True, wenn die Metadaten-Datei geschrieben wurde
+    """
+    content = dump_json(metadata, indent=False)
+    if not write_json(f"{file_path}.json", metadata, indent=False, content=content):
+        return False
+    store(user_id, document_id, file_path, metadata, serialized=content)
+    return True
+
+def store_many(user_id: str, entries: List[Tuple[str, str, Dict[str, Any]]]) -> bool:
+    """
+    Übernimmt mehrere Dokumente eines Benutzers in einer Transaktion in den Index
+    
+    Args:
+        user_id: Benutzer-ID
+        entries: Liste von (Dokument-ID, Pfad zur PDF-Datei, Metadaten)
+        
+    Returns:
+        bool: True bei Erfolg
+    """
+    if not user_id:
+        return False
+    
+    try:
+        rows = [
+            (user_id, document_id, file_path, metadata.get('uploadDate') or '', dump_json(metadata, indent=False))
+            for document_id, file_path, metadata in entries if document_id
+        ]
+        hash_rows = [
+            hash_row for hash_row in (
+                _hash_row(user_id, document_id, metadata) for document_id, _, metadata in entries
+            ) if hash_row
+        ]
+        with _lock:
+            connection = _get_connection()
+            connection.executemany(
+                "INSERT OR REPLACE INTO documents (user_id, document_id, file_path, upload_date, json) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            connection.executemany(
+                "DELETE FROM content_hashes WHERE user_id = ? AND document_id = ?",
+                [(user_id, row[1]) for row in rows]
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO content_hashes (user_id, content_hash, settings, document_id) "
+                "VALUES (?, ?, ?, ?)",
+                hash_rows
+            )
+            connection.commit()
+        return True
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        logger.warning(f"Fehler beim Schreiben in den Dokument-Index: {e}")
+        return False
+
+def get_document(user_id: str, document_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Schlägt ein Dokument im Index nach
+
+    Args:
+        user_id: Benutzer-ID
+        document_id: Dokument-ID
+
+    Returns:
+        dict: {'file_path': ..., 'metadata': ...} oder None, wenn nicht im Index
+    """
+    try:
+        with _lock:
+            row = _get_connection().execute(
+                "SELECT file_path, json FROM documents WHERE user_id = ? AND document_id = ?",
+                (user_id, document_id)
+            ).fetchone()
+        if not row:
+            return None
+        return {'file_path': row[0], 'metadata': parse_json(row[1])}
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning(f"Fehler beim Lesen aus dem Dokument-Index: {e}")
+        return None
+
+def find_by_hash(user_id: str, content_hash: str, settings: str) -> List[Dict[str, Any]]:
+    """
+    Sucht die Dokumente des Benutzers mit demselben Inhalts-Hash, die mit
+    denselben Einstellungen verarbeitet wurden
+
+    Args:
+        user_id: Benutzer-ID
+        content_hash: Hash der PDF-Datei (siehe analysis_cache.hash_file)
+        settings: Fingerabdruck der Verarbeitungseinstellungen
+            (siehe analysis_cache.settings_fingerprint)
+
+    Returns:
+        list: {'document_id': ..., 'file_path': ..., 'metadata': ...}, älteste zuerst
+    """
+    try:
+        with _lock:
+            rows = _get_connection().execute(
+                "SELECT d.document_id, d.file_path, d.json FROM content_hashes h "
+                "JOIN documents d ON d.user_id = h.user_id AND d.document_id = h.document_id "
+                "WHERE h.user_id = ? AND h.content_hash = ? AND h.settings = ? "
+                "ORDER BY d.upload_date",
+                (user_id, content_hash, settings)
+            ).fetchall()
+        return [
+            {'document_id': row[0], 'file_path': row[1], 'metadata': parse_json(row[2])}
+            for row in rows
+        ]
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning(f"Fehler beim Lesen aus dem Dokument-Index: {e}")
+        return []
+
+def list_documents(user_id: str, raw: bool = False) -> Optional[List[Any]]:
+    """
+    Listet die Metadaten aller Dokumente eines Benutzers, neueste zuerst
+
+    Args:
+        user_id: Benutzer-ID
+        raw: Ob die gespeicherten JSON-Texte ungeparst (als Bytes) geliefert
+            werden sollen, z.B. um sie direkt in eine Antwort zu schreiben
+
+    Returns:
+        list: Metadaten oder None, wenn das Verzeichnis des Benutzers noch
+            nicht in den Index übernommen wurde (siehe mark_user_indexed)
+    """
+    try:
+        with _lock:
+            connection = _get_connection()
+            if connection.execute(
+                "SELECT 1 FROM indexed_users WHERE user_id = ?", (user_id,)
+            ).fetchone() is None:
+                return None
+            rows = connection.execute(
+                "SELECT json FROM documents WHERE user_id = ? ORDER BY upload_date DESC",
+                (user_id,)
+            ).fetchall()
+        decode = _raw if raw else parse_json
+        return [decode(row[0]) for row in rows]
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning(f"Fehler beim Lesen aus dem Dokument-Index: {e}")
+        return None
+
+def iter_documents(user_id: str, batch_size: int = STREAM_BATCH_SIZE) -> Optional[Iterator[bytes]]:
+    """
+    Liefert die Dokumentliste eines Benutzers als JSON-Array in Blöcken, z.B.
+    für eine gestreamte Flask-Response; neueste zuerst
+    
+    Die Zeilen werden blockweise nachgeladen, der Lock wird nur während einer
+    Abfrage gehalten. Bricht das Lesen ab, endet der Stream ohne schließende
+    Klammer, sodass der Client kein unvollständiges Array für vollständig hält.
+    
+    Args:
+        user_id: Benutzer-ID
+        batch_size: Anzahl Zeilen pro Abfrage
+        
+    Returns:
+        Iterator über die JSON-Blöcke oder None, wenn das Verzeichnis des
+            Benutzers noch nicht in den Index übernommen wurde
+    """
+    if not is_user_indexed(user_id):
+        return None
+    
+    def generate():
+        yield b'['
+        separator = b''
+        last = None
+        while True:
+            try:
+                with _lock:
+                    connection = _get_connection()
+                    if last is None:
+                        rows = connection.execute(
+                            "SELECT upload_date, document_id, json FROM documents WHERE user_id = ? "
+                            "ORDER BY upload_date DESC, document_id DESC LIMIT ?",
+                            (user_id, batch_size)
+                        ).fetchall()
+                    else:
+                        # Keyset-Paginierung: ab dem letzten gelieferten Dokument weiter
+                        rows = connection.execute(
+                            "SELECT upload_date, document_id, json FROM documents WHERE user_id = ? "
+                            "AND (upload_date < ? OR (upload_date = ? AND document_id < ?)) "
+                            "ORDER BY upload_date DESC, document_id DESC LIMIT ?",
+                            (user_id, last[0], last[0], last[1], batch_size)
+                        ).fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"Fehler beim Streamen aus dem Dokument-Index: {e}")
+                return
+            
+            if rows:
+                yield separator + b','.join(_raw(row[2]) for row in rows)
+                separator = b','
+            if len(rows) < batch_size:
+                break
+            last = rows[-1]
+        yield b']'
+    
+    return generate()
+
+def page_documents(user_id: str, limit: int, offset: int = 0, raw: bool = False) -> Optional[Tuple[List[Any], int]]:
+    """
+    Liefert einen Ausschnitt der Dokumente eines Benutzers, neueste zuerst
+    
+    Args:
+        user_id: Benutzer-ID
+        limit: Maximale Anzahl Dokumente
+        offset: Anzahl zu überspringender Dokumente
+        raw: Ob die gespeicherten JSON-Texte ungeparst (als Bytes) geliefert werden sollen
+        
+    Returns:
+        tuple: (Metadaten, Gesamtanzahl) oder None, wenn das Verzeichnis des
+            Benutzers noch nicht in den Index übernommen wurde
+    """
+    try:
+        with _lock:
+            connection = _get_connection()
+            if connection.execute(
+                "SELECT 1 FROM indexed_users WHERE user_id = ?", (user_id,)
+            ).fetchone() is None:
+                return None
+            total = connection.execute(
+                "SELECT COUNT(*) FROM documents WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+            rows = connection.execute(
+                "SELECT json FROM documents WHERE user_id = ? ORDER BY upload_date DESC LIMIT ? OFFSET ?",
+                (user_id, limit, offset)
+            ).fetchall()
+        decode = _raw if raw else parse_json
+        return [decode(row[0]) for row in rows], total
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning(f"Fehler beim Lesen aus dem Dokument-Index: {e}")
+        return None
+
+def is_user_indexed(user_id: str) -> bool:
+    """
+    Prüft, ob alle Dokumente eines Benutzers im Index stehen
+    
+    Args:
+        user_id: Benutzer-ID
+        
+    Returns:
+        bool: True, wenn ein Dokument, das nicht im Index steht, nicht existiert
+    """
+    try:
+        with _lock:
+            return _get_connection().execute(
+                "SELECT 1 FROM indexed_users WHERE user_id = ?", (user_id,)
+            ).fetchone() is not None
+    except sqlite3.Error as e:
+        logger.warning(f"Fehler beim Lesen aus dem Dokument-Index: {e}")
+        return False
+
+def mark_user_indexed(user_id: str) -> bool:
+    """
+    Vermerkt, dass alle Dokumente eines Benutzers im Index stehen
+
+    Args:
+        user_id: Benutzer-ID
+
+    Returns:
+        bool: True bei Erfolg
+    """
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute("INSERT OR IGNORE INTO indexed_users (user_id) VALUES (?)", (user_id,))
+            connection.commit()
+        return True
+    except sqlite3.Error as e:
+        logger.warning(f"Fehler beim Schreiben in den Dokument-Index: {e}")
+        return False
+
+def remove(user_id: str, document_id: str) -> bool:
+    """
+    Entfernt ein Dokument aus dem Index
+
+    Args:
+        user_id: Benutzer-ID
+        document_id: Dokument-ID
+
+    Returns:
+        bool: True bei Erfolg
+    """
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute(
+                "DELETE FROM documents WHERE user_id = ? AND document_id = ?",
+                (user_id, document_id)
+            )
+            connection.execute(
+                "DELETE FROM content_hashes WHERE user_id = ? AND document_id = ?",
+                (user_id, document_id)
+            )
+            connection.commit()
+        return True
+    except sqlite3.Error as e:
+        logger.warning(f"Fehler beim Löschen aus dem Dokument-Index: {e}")
+        return False
+
+def clear_index() -> None:
+    """Leert den Dokument-Index; Verzeichnisse werden beim nächsten Zugriff neu eingelesen"""
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute("DELETE FROM indexed_users")
+            connection.execute("DELETE FROM content_hashes")
+            connection.execute("DELETE FROM documents")
+            connection.commit()
+        logger.info("Dokument-Index geleert")
+    except sqlite3.Error as e:
+        logger.warning(f"Fehler beim Leeren des Dokument-Index: {e}")
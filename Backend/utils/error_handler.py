@@ -22,11 +22,13 @@ class APIError(Exception):
     """
     Benutzerdefinierte API-Ausnahmen mit Statuscode und optionalen Details
     """
-    def __init__(self, message: str, status_code: int = 400, details: Any = None):
+    def __init__(self, message: str, status_code: int = 400, details: Any = None,
+                 headers: Optional[Dict[str, str]] = None):
         super().__init__(message)
         self.message = message
         self.status_code = status_code
         self.details = details
+        self.headers = headers or {}  # Zusätzliche Antwort-Header, z.B. Retry-After
 
     def to_dict(self) -> Dict[str, Any]:
         """Konvertiert Fehler in ein Dictionary für JSON-Antworten"""
@@ -79,7 +81,7 @@ def configure_error_handlers(app):
             # Client-Fehler kurz loggen
             logger.info(f"API Error: {error.message} [Status: {error.status_code}]")
         
-        return jsonify(response), error.status_code
+        return jsonify(response), error.status_code, error.headers
     
     # Handler für HTTP-Exceptions (z.B. 404, 405)
     @app.errorhandler(HTTPException)
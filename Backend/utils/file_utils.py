@@ -4,26 +4,89 @@ Zentralisierte Dateioperationen mit Caching-Unterstützung,
 einheitlicher Fehlerbehandlung und optimierter Performance.
 """
 import os
+import io
 import json
+import re
 import logging
+import mmap
+import concurrent.futures
 import tempfile
+import threading
 import uuid
 import shutil
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Union, BinaryIO
+from typing import Dict, Any, Optional, List, Union, BinaryIO, Iterator, Tuple
 from werkzeug.utils import secure_filename
 from flask import current_app
 
 from config import config_manager
 from utils.error_handler import APIError
+from utils.performance_utils import collect_garbage_if_needed
+
+# orjson ist optional; ohne es wird auf das Standard-json-Modul zurückgegriffen.
+# Andere Module importieren orjson, ORJSON_AVAILABLE, parse_json und dump_json von hier
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Ab dieser Größe werden JSON-Dateien per mmap statt per read() eingelesen
+_MMAP_THRESHOLD = 1024 * 1024  # 1 MB
+
+# Blockgröße beim Streamen von Dateien in HTTP-Antworten
+_STREAM_BLOCK_SIZE = 64 * 1024
+
+# Blockgröße beim Schreiben hochgeladener Dateien auf die Festplatte
+_UPLOAD_BLOCK_SIZE = 1024 * 1024  # 1 MB
+
+# PDF-Signatur am Dateianfang; dieselbe Regel wie in PDFExtractor.open_and_validate
+_PDF_SIGNATURE = b'%PDF-'
+
+# Dokument-IDs sind von uuid.uuid4() erzeugt; alles andere wird abgewiesen, bevor
+# daraus ein Pfad oder Glob-Präfix wird
+_DOCUMENT_ID_MATCH = re.compile(
+    r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
+).fullmatch
+
+# Temporäre Uploads (temp_<id>_<name>), die nie gespeichert wurden, nach 24 h löschen
+TEMP_FILE_PREFIX = 'temp_'
+TEMP_FILE_TTL_SECONDS = 24 * 60 * 60
+
 # In-Memory-Cache für häufig gelesene Dateien
 _file_cache: Dict[str, Any] = {}
-_json_cache: Dict[str, Dict[str, Any]] = {}
+# JSON-Cache: Pfad -> (mtime_ns, Größe, Daten); ein Eintrag gilt nur, solange die
+# Datei unverändert ist, sodass auch Änderungen anderer Prozesse erkannt werden
+_json_cache: 'OrderedDict[str, Tuple[int, int, Dict[str, Any]]]' = OrderedDict()
+_json_cache_lock = threading.Lock()
 _cache_enabled = True
-_max_cache_size = 100  # Maximale Anzahl von Cache-Einträgen
+_max_cache_size = 4096  # Maximale Anzahl von Cache-Einträgen
+
+# Einzelner Hintergrund-Thread für Löschvorgänge abseits des kritischen Pfads
+_cleanup_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='file-cleanup')
+
+# Verzeichnisse, die in diesem Prozess bereits angelegt bzw. geprüft wurden
+_known_dirs = set()
+
+def _ensure_dir(directory: str) -> str:
+    """
+    Legt ein Verzeichnis an, jedoch nur beim ersten Aufruf pro Pfad
+    
+    Args:
+        directory: Pfad zum Verzeichnis
+        
+    Returns:
+        str: Der übergebene Pfad
+    """
+    if directory not in _known_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _known_dirs.add(directory)
+    return directory
 
 def get_upload_folder(user_id: str = None) -> str:
     """
@@ -38,12 +101,9 @@ def get_upload_folder(user_id: str = None) -> str:
     upload_folder = config_manager.get('UPLOAD_FOLDER', './uploads')
     
     if user_id:
-        user_folder = os.path.join(upload_folder, user_id)
-        os.makedirs(user_folder, exist_ok=True)
-        return user_folder
+        return _ensure_dir(os.path.join(upload_folder, user_id))
     
-    os.makedirs(upload_folder, exist_ok=True)
-    return upload_folder
+    return _ensure_dir(upload_folder)
 
 def get_status_folder() -> str:
     """
@@ -53,9 +113,7 @@ def get_status_folder() -> str:
         str: Pfad zum Status-Verzeichnis
     """
     upload_folder = config_manager.get('UPLOAD_FOLDER', './uploads')
-    status_folder = os.path.join(upload_folder, 'status')
-    os.makedirs(status_folder, exist_ok=True)
-    return status_folder
+    return _ensure_dir(os.path.join(upload_folder, 'status'))
 
 def get_safe_filepath(document_id: str, filename: str, user_id: str = None) -> str:
     """
@@ -73,6 +131,91 @@ def get_safe_filepath(document_id: str, filename: str, user_id: str = None) -> s
     safe_filename = secure_filename(filename)
     return os.path.join(upload_folder, f"{document_id}_{safe_filename}")
 
+def _stream_fileno(stream: BinaryIO) -> Optional[int]:
+    """
+    Gibt den Dateideskriptor eines Upload-Streams zurück, sofern dieser
+    bereits auf der Festplatte liegt
+    
+    Args:
+        stream: Upload-Stream
+        
+    Returns:
+        int: Dateideskriptor oder None
+    """
+    # fileno() würde einen SpooledTemporaryFile im Speicher erst auf die Platte schreiben
+    if isinstance(stream, tempfile.SpooledTemporaryFile) and not stream._rolled:
+        return None
+    
+    try:
+        return stream.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+def _stream_memory(stream: BinaryIO) -> Optional[io.BytesIO]:
+    """
+    Gibt den BytesIO-Puffer eines Upload-Streams zurück, sofern dieser
+    (noch) im Speicher liegt
+    
+    Args:
+        stream: Upload-Stream
+        
+    Returns:
+        BytesIO: Puffer oder None
+    """
+    if isinstance(stream, tempfile.SpooledTemporaryFile) and not stream._rolled:
+        stream = stream._file
+    return stream if isinstance(stream, io.BytesIO) else None
+
+def stream_to_disk(file: BinaryIO, filepath: str, bufsize: int = _UPLOAD_BLOCK_SIZE) -> int:
+    """
+    Schreibt eine hochgeladene Datei ohne Werkzeugs 16-KB-Kopierschleife auf die Festplatte
+    
+    Liegt der Upload bereits in einer temporären Datei, kopiert der Kernel per
+    sendfile; liegt er im Speicher, wird der Puffer ohne Zwischenkopien
+    geschrieben; sonst wird in großen Blöcken kopiert.
+    
+    Args:
+        file: Dateiobjekt (z.B. aus request.files) oder Stream
+        filepath: Zielpfad
+        bufsize: Blockgröße in Bytes
+        
+    Returns:
+        int: Anzahl geschriebener Bytes
+    """
+    stream = getattr(file, 'stream', file)
+    
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    with open(fd, 'wb') as dst:
+        src_fd = _stream_fileno(stream)
+        if src_fd is not None and hasattr(os, 'sendfile'):
+            start = offset = stream.tell()
+            try:
+                while True:
+                    sent = os.sendfile(dst.fileno(), src_fd, offset, bufsize)
+                    if sent == 0:
+                        break
+                    offset += sent
+                stream.seek(offset)
+                return offset - start
+            except OSError as e:
+                # z.B. Dateisysteme ohne sendfile-Unterstützung
+                logger.debug(f"sendfile nicht möglich, kopiere blockweise: {e}")
+                stream.seek(start)
+                dst.seek(0)
+                dst.truncate()
+        
+        # Kleine Uploads liegen im Speicher: direkt aus dem Puffer schreiben
+        buffer = _stream_memory(stream)
+        if buffer is not None:
+            start = buffer.tell()
+            with buffer.getbuffer() as view:
+                written = dst.write(view[start:])
+            buffer.seek(start + written)
+            return written
+        
+        shutil.copyfileobj(stream, dst, bufsize)
+        return dst.tell()
+
 def save_uploaded_file(file: BinaryIO, document_id: str, user_id: str = None) -> dict:
     """
     Speichert eine hochgeladene Datei sicher
@@ -93,7 +236,7 @@ def save_uploaded_file(file: BinaryIO, document_id: str, user_id: str = None) ->
     
     # Prüfe Dateierweiterung
     allowed_extensions = config_manager.get('ALLOWED_EXTENSIONS', {'pdf'})
-    extension = Path(file.filename).suffix.lower().lstrip('.')
+    extension = os.path.splitext(file.filename)[1].lower().lstrip('.')
     
     if extension not in allowed_extensions:
         raise APIError(f"Dateityp nicht erlaubt. Erlaubte Typen: {', '.join(allowed_extensions)}", 400)
@@ -102,13 +245,13 @@ def save_uploaded_file(file: BinaryIO, document_id: str, user_id: str = None) ->
     try:
         filename = secure_filename(file.filename)
         filepath = get_safe_filepath(document_id, filename, user_id)
-        file.save(filepath)
+        filesize = stream_to_disk(file, filepath)
         
         return {
             'document_id': document_id,
             'filename': filename,
             'filepath': filepath,
-            'filesize': os.path.getsize(filepath),
+            'filesize': filesize,
             'extension': extension
         }
         
@@ -116,53 +259,124 @@ def save_uploaded_file(file: BinaryIO, document_id: str, user_id: str = None) ->
         logger.error(f"Fehler beim Speichern der Datei: {e}")
         raise APIError(f"Datei konnte nicht gespeichert werden: {str(e)}", 500)
 
-def read_json(filepath: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+def _load_json_file(filepath: str) -> Any:
+    """
+    Lädt eine JSON-Datei, bei verfügbarem orjson im Binärmodus
+    
+    Args:
+        filepath: Pfad zur JSON-Datei
+        
+    Returns:
+        Geladene JSON-Daten
+    """
+    if not ORJSON_AVAILABLE:
+        with open(filepath, 'r') as f:
+            return json.load(f)
+    
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+            # Große Dateien direkt aus dem Page-Cache parsen
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    return orjson.loads(view)
+        return orjson.loads(f.read())
+
+def parse_json(blob: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """
+    Parst JSON-Text, bei verfügbarem orjson ohne Umweg über str
+    
+    Args:
+        blob: JSON als str oder Bytes (z.B. aus SQLite oder einem HTTP-Stream)
+        
+    Returns:
+        Geparste JSON-Daten
+    """
+    return orjson.loads(blob) if ORJSON_AVAILABLE else json.loads(blob)
+
+def dump_json(data: Any, indent: bool = True) -> bytes:
+    """
+    Serialisiert Daten als JSON
+    
+    Args:
+        data: Zu serialisierende Daten
+        indent: Ob eingerückt werden soll
+        
+    Returns:
+        bytes: UTF-8-kodiertes JSON
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, default=str, option=option)
+        except TypeError:
+            # z.B. Ganzzahlen außerhalb von 64 Bit - Standard-json kann sie schreiben
+            pass
+    if indent:
+        return json.dumps(data, indent=2, default=str).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), default=str).encode('utf-8')
+
+def _cache_json(filepath: str, stat: os.stat_result, data: Dict[str, Any]) -> None:
+    """Legt geparste JSON-Daten im LRU-Cache ab, gültig für den angegebenen Dateistand"""
+    with _json_cache_lock:
+        _json_cache[filepath] = (stat.st_mtime_ns, stat.st_size, data.copy())
+        _json_cache.move_to_end(filepath)
+        
+        # Cache-Größe begrenzen: am längsten nicht genutzte Einträge entfernen
+        while len(_json_cache) > _max_cache_size:
+            _json_cache.popitem(last=False)
+
+def read_json(filepath: str, use_cache: bool = True, missing_ok: bool = False) -> Optional[Dict[str, Any]]:
     """
     Liest eine JSON-Datei mit Caching-Unterstützung
     
+    Unveränderte Dateien (gleiche mtime und Größe) werden ohne Lesen und
+    Parsen aus dem Cache bedient.
+    
     Args:
         filepath: Pfad zur JSON-Datei
         use_cache: Ob der Cache verwendet werden soll
+        missing_ok: Ob eine fehlende Datei erwartet ist (kein Fehler im Log)
         
     Returns:
         dict: Geladene JSON-Daten oder None bei Fehler
     """
-    global _json_cache, _cache_enabled
-    
-    # Cache-Prüfung
-    cache_key = filepath
-    if _cache_enabled and use_cache and cache_key in _json_cache:
-        # Gib eine Kopie zurück, um Modifikationen zu verhindern
-        return _json_cache[cache_key].copy()
+    caching = _cache_enabled and use_cache
     
-    # Datei lesen
     try:
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-            
-            # Im Cache speichern, wenn aktiviert
-            if _cache_enabled and use_cache:
-                # Cache-Größe begrenzen
-                if len(_json_cache) >= _max_cache_size:
-                    # Entferne ältesten Eintrag (erste Schlüssel)
-                    oldest_key = next(iter(_json_cache))
-                    del _json_cache[oldest_key]
-                
-                _json_cache[cache_key] = data.copy()
-            
-            return data
+        # Cache-Prüfung
+        if caching:
+            stat = os.stat(filepath)
+            with _json_cache_lock:
+                entry = _json_cache.get(filepath)
+                if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                    _json_cache.move_to_end(filepath)
+                    # Gib eine Kopie zurück, um Modifikationen zu verhindern
+                    return entry[2].copy()
+        
+        # Datei lesen
+        data = _load_json_file(filepath)
+        
+        # Im Cache speichern, wenn aktiviert
+        if caching:
+            _cache_json(filepath, stat, data)
+        
+        return data
             
     except json.JSONDecodeError:
         logger.error(f"Ungültiges JSON-Format in {filepath}")
         return None
     except FileNotFoundError:
-        logger.error(f"Datei nicht gefunden: {filepath}")
+        if not missing_ok:
+            logger.error(f"Datei nicht gefunden: {filepath}")
         return None
     except Exception as e:
         logger.error(f"Fehler beim Lesen der JSON-Datei {filepath}: {e}")
         return None
 
-def write_json(filepath: str, data: Dict[str, Any], atomic: bool = True) -> bool:
+def write_json(filepath: str, data: Dict[str, Any], atomic: bool = True, indent: bool = True,
+               content: Optional[bytes] = None) -> bool:
     """
     Schreibt Daten in eine JSON-Datei mit atomaren Schreiboperationen
     
@@ -170,32 +384,37 @@ def write_json(filepath: str, data: Dict[str, Any], atomic: bool = True) -> bool
         filepath: Pfad zur JSON-Datei
         data: Zu schreibende Daten
         atomic: Ob atomares Schreiben verwendet werden soll
+        indent: Ob eingerückt werden soll; für Dateien, die nur
+            maschinell gelesen werden, spart False Platz und Schreibaufwand
+        content: Bereits serialisierte Daten (siehe dump_json), um doppeltes
+            Serialisieren zu vermeiden
         
     Returns:
         bool: True bei Erfolg, False bei Fehler
     """
-    global _json_cache, _cache_enabled
-    
     try:
         # Stelle sicher, dass das Verzeichnis existiert
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        _ensure_dir(os.path.dirname(filepath))
+        
+        if content is None:
+            content = dump_json(data, indent)
         
         if atomic:
             # Atomares Schreiben mit temporärer Datei
             temp_file = f"{filepath}.tmp"
-            with open(temp_file, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
+            with open(temp_file, 'wb') as f:
+                f.write(content)
             
             # Atomare Ersetzung
             os.replace(temp_file, filepath)
         else:
             # Direktes Schreiben
-            with open(filepath, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
+            with open(filepath, 'wb') as f:
+                f.write(content)
         
         # Cache aktualisieren
         if _cache_enabled:
-            _json_cache[filepath] = data.copy()
+            _cache_json(filepath, os.stat(filepath), data)
         
         return True
         
@@ -203,6 +422,37 @@ def write_json(filepath: str, data: Dict[str, Any], atomic: bool = True) -> bool
         logger.error(f"Fehler beim Schreiben der JSON-Datei {filepath}: {e}")
         return False
 
+def stream_file(filepath: str, prefix: bytes = b'', suffix: bytes = b'') -> Iterator[bytes]:
+    """
+    Liefert den Inhalt einer Datei blockweise, z.B. für eine Flask-Response
+    
+    Die Datei wird sofort geöffnet, sodass eine fehlende Datei noch vor dem
+    Senden der Antwort als FileNotFoundError auffällt.
+    
+    Args:
+        filepath: Pfad zur Datei
+        prefix: Bytes vor dem Dateiinhalt
+        suffix: Bytes nach dem Dateiinhalt
+        
+    Returns:
+        Iterator über die Datenblöcke
+    """
+    f = open(filepath, 'rb')
+    
+    def generate():
+        with f:
+            if prefix:
+                yield prefix
+            while True:
+                block = f.read(_STREAM_BLOCK_SIZE)
+                if not block:
+                    break
+                yield block
+            if suffix:
+                yield suffix
+    
+    return generate()
+
 def create_temp_file(content: Union[str, bytes], suffix: str = None) -> str:
     """
     Erstellt eine temporäre Datei mit dem angegebenen Inhalt
@@ -243,21 +493,83 @@ def cleanup_file(filepath: str) -> bool:
         bool: True bei Erfolg, False bei Fehler
     """
     try:
-        if os.path.exists(filepath):
-            os.unlink(filepath)
+        # Direkt löschen statt vorher zu prüfen - ein Syscall weniger und kein TOCTOU-Fenster
+        os.unlink(filepath)
+        
+        # Cache-Einträge entfernen
+        with _json_cache_lock:
+            _json_cache.pop(filepath, None)
+        _file_cache.pop(filepath, None)
             
-            # Cache-Einträge entfernen
-            if filepath in _json_cache:
-                del _json_cache[filepath]
-            if filepath in _file_cache:
-                del _file_cache[filepath]
-                
-            return True
+        return True
+    except FileNotFoundError:
         return False
     except Exception as e:
         logger.error(f"Fehler beim Löschen der Datei {filepath}: {e}")
         return False
 
+def _cleanup_in_background(filepath: str, collect_garbage: bool) -> bool:
+    """Löscht eine Datei und räumt optional den Speicher auf (läuft im Cleanup-Thread)"""
+    deleted = cleanup_file(filepath)
+    if collect_garbage:
+        collect_garbage_if_needed()
+    return deleted
+
+def cleanup_file_async(filepath: str, collect_garbage: bool = False) -> concurrent.futures.Future:
+    """
+    Löscht eine Datei im Hintergrund, damit der Aufrufer nicht auf das
+    Dateisystem (z.B. Netzlaufwerke) warten muss
+    
+    Args:
+        filepath: Pfad zur Datei
+        collect_garbage: Ob anschließend bei gewachsenem Speicher gesammelt werden soll
+        
+    Returns:
+        Future: Liefert das Ergebnis von cleanup_file()
+    """
+    return _cleanup_executor.submit(_cleanup_in_background, filepath, collect_garbage)
+
+def reap_temp_files(max_age_seconds: int = TEMP_FILE_TTL_SECONDS) -> int:
+    """
+    Löscht verwaiste temporäre Uploads aus allen Benutzerverzeichnissen
+    
+    Quick-Analyze legt Dateien als temp_<id>_<name> ab; wird das Dokument nie
+    gespeichert, bleiben sie sonst dauerhaft liegen.
+    
+    Args:
+        max_age_seconds: Mindestalter (seit letzter Änderung) zu löschender Dateien
+        
+    Returns:
+        int: Anzahl gelöschter Dateien
+    """
+    cutoff = time.time() - max_age_seconds
+    deleted = 0
+    
+    try:
+        with os.scandir(get_upload_folder()) as user_dirs:
+            user_dir_paths = [entry.path for entry in user_dirs if entry.is_dir()]
+    except OSError as e:
+        logger.error(f"Fehler beim Auflisten des Upload-Verzeichnisses: {e}")
+        return 0
+    
+    for user_dir in user_dir_paths:
+        try:
+            with os.scandir(user_dir) as entries:
+                for entry in entries:
+                    if not entry.name.startswith(TEMP_FILE_PREFIX) or not entry.is_file():
+                        continue
+                    try:
+                        if entry.stat().st_mtime < cutoff and cleanup_file(entry.path):
+                            deleted += 1
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"Fehler beim Bereinigen von {user_dir}: {e}")
+    
+    if deleted:
+        logger.info(f"{deleted} verwaiste temporäre Dateien gelöscht")
+    return deleted
+
 def find_files(pattern: str, directory: str = None, recursive: bool = False) -> List[str]:
     """
     Findet Dateien anhand eines Musters
@@ -285,6 +597,34 @@ def find_files(pattern: str, directory: str = None, recursive: bool = False) ->
         logger.error(f"Fehler bei der Dateisuche mit Muster '{pattern}': {e}")
         return []
 
+def scan_files(directory: str, suffix: str = '', prefix: str = '') -> Iterator[str]:
+    """
+    Liefert die Dateien eines Verzeichnisses mit dem angegebenen Anfang und der
+    angegebenen Endung
+    
+    Anders als find_files werden keine Path-Objekte erzeugt und keine
+    Glob-Muster übersetzt; os.scandir liefert den Dateityp bereits beim
+    Auflisten, ohne zusätzlichen stat-Aufruf.
+    
+    Args:
+        directory: Verzeichnis (nicht rekursiv)
+        suffix: Dateiendung, z.B. '.json'
+        prefix: Anfang des Dateinamens, z.B. f"{document_id}_"
+        
+    Returns:
+        Iterator über die Dateipfade
+    """
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith(prefix) and name.endswith(suffix) and entry.is_file():
+                    yield entry.path
+    except FileNotFoundError:
+        return
+    except OSError as e:
+        logger.error(f"Fehler beim Auflisten von {directory}: {e}")
+
 def allowed_file(filename: str) -> bool:
     """
     Prüft, ob die Dateierweiterung erlaubt ist
@@ -296,9 +636,46 @@ def allowed_file(filename: str) -> bool:
         bool: True wenn Datei erlaubt, sonst False
     """
     allowed_extensions = config_manager.get('ALLOWED_EXTENSIONS', {'pdf'})
-    extension = Path(filename).suffix.lower().lstrip('.')
+    extension = os.path.splitext(filename)[1].lower().lstrip('.')
     return extension in allowed_extensions
 
+def is_valid_document_id(document_id: Any) -> bool:
+    """
+    Prüft, ob eine Dokument-ID das Format einer UUID hat
+    
+    Args:
+        document_id: Dokument-ID, z.B. aus der URL
+        
+    Returns:
+        bool: True, wenn die ID gefahrlos in Dateipfaden verwendet werden kann
+    """
+    return isinstance(document_id, str) and len(document_id) == 36 and _DOCUMENT_ID_MATCH(document_id) is not None
+
+def has_pdf_signature(file: BinaryIO) -> bool:
+    """
+    Prüft anhand der ersten fünf Bytes, ob ein Upload tatsächlich ein PDF ist
+    
+    Der Stream wird danach an seine ursprüngliche Position zurückgesetzt, sodass
+    die Datei anschließend unverändert gespeichert werden kann.
+    
+    Args:
+        file: Dateiobjekt (z.B. aus request.files) oder Stream
+        
+    Returns:
+        bool: True, wenn die PDF-Signatur gefunden wurde
+    """
+    stream = getattr(file, 'stream', file)
+    
+    try:
+        position = stream.tell()
+        head = stream.read(len(_PDF_SIGNATURE))
+        stream.seek(position)
+    except (AttributeError, OSError, io.UnsupportedOperation) as e:
+        logger.warning(f"Upload-Stream kann nicht vorab geprüft werden: {e}")
+        return True
+    
+    return head == _PDF_SIGNATURE
+
 def disable_cache():
     """Deaktiviert den Datei-Cache (z.B. für Tests)"""
     global _cache_enabled
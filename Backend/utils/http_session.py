@@ -0,0 +1,59 @@
+# Backend/utils/http_session.py
+"""
+Gemeinsame HTTP-Session für externe APIs (CrossRef, OpenLibrary, LLM-API).
+Verbindungen werden über Keep-Alive wiederverwendet, statt pro Anfrage neu
+TCP- und TLS-Handshakes durchzuführen.
+"""
+import os
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Kontaktadresse für den "polite pool" von CrossRef
+CONTACT_EMAIL = os.environ.get('CROSSREF_EMAIL', 'your.email@example.com')
+
+USER_AGENT = f"SciLit2.0/1.0 (mailto:{CONTACT_EMAIL})"
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def _create_session() -> requests.Session:
+    """Erstellt eine Session mit Verbindungspool und Wiederholungen bei Überlast"""
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+    
+    # Zeitüberschreitungen beim Lesen werden nicht wiederholt und Retry-After
+    # wird ignoriert, damit ein Aufruf etwa beim timeout= des Aufrufers bleibt;
+    # Abfragen an CrossRef laufen ohnehin durch dessen eigenes Rate-Limiting
+    retry = Retry(
+        total=2,
+        connect=1,
+        read=False,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET'}),
+        respect_retry_after_header=False
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_http_session() -> requests.Session:
+    """
+    Gibt die gemeinsame HTTP-Session zurück
+    
+    Returns:
+        requests.Session: Session mit Verbindungspool
+    """
+    global _session
+    
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _create_session()
+    
+    return _session
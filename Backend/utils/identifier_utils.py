@@ -9,6 +9,57 @@ import logging
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# DOI patterns - compiled once at import
+_DOI_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    # Standard DOI format with word boundary
+    r'\b(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)\b',
+    
+    # DOI with label
+    r'\bDOI:\s*(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)\b',
+    
+    # DOI with doi.org URL
+    r'\bdoi\.org\/(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)\b',
+    
+    # DOI in URL with https
+    r'https?:\/\/doi\.org\/(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)',
+    
+    # DOI in parentheses - common in academic papers
+    r'\(doi:\s*(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)\)',
+    
+    # DOI with Digital Object Identifier label
+    r'Digital\s+Object\s+Identifier.{0,20}(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)',
+    
+    # DOI in German text
+    r'(?:DOI|doi)[-:]?\s*(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)'
+))
+
+# ISBN patterns - compiled once at import
+# Separators removed from ISBNs (incl. tabs and non-breaking spaces from PDF text)
+_ISBN_STRIP = str.maketrans('', '', '- \t\u00a0')
+
+_ISBN_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    # ISBN-13 with label
+    r'\bISBN(?:-13)?[:\s]*(97[89][- ]?(?:\d[- ]?){9}\d)\b',
+    
+    # ISBN-10 with label
+    r'\bISBN(?:-10)?[:\s]*(\d[- ]?(?:\d[- ]?){8}[\dX])\b',
+    
+    # Bare ISBN-13 with word boundary
+    r'\b(97[89][- ]?(?:\d[- ]?){9}\d)\b',
+    
+    # Bare ISBN-10 with word boundary  
+    r'\b(\d[- ]?(?:\d[- ]?){8}[\dX])\b',
+    
+    # ISBN in German text
+    r'(?:ISBN|isbn)[-:]?\s*((?:97[89][- ]?)?(?:\d[- ]?){9}[\dX])',
+    
+    # ISBN with International Standard Book Number label
+    r'International\s+Standard\s+Book\s+Number.{0,20}((?:97[89][- ]?)?(?:\d[- ]?){9}[\dX])'
+))
+
+# Full-string DOI format check
+_DOI_VALIDATION_PATTERN = re.compile(r'^10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+$')
+
 def extract_doi(text):
     """
     Extract DOI from text using optimized regex patterns
@@ -23,32 +74,8 @@ def extract_doi(text):
         logger.debug("No text provided for DOI extraction")
         return None
     
-    # DOI patterns - Enhanced for better matching
-    doi_patterns = [
-        # Standard DOI format with word boundary
-        r'\b(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)\b',
-        
-        # DOI with label
-        r'\bDOI:\s*(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)\b',
-        
-        # DOI with doi.org URL
-        r'\bdoi\.org\/(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)\b',
-        
-        # DOI in URL with https
-        r'https?:\/\/doi\.org\/(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)',
-        
-        # DOI in parentheses - common in academic papers
-        r'\(doi:\s*(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)\)',
-        
-        # DOI with Digital Object Identifier label
-        r'Digital\s+Object\s+Identifier.{0,20}(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)',
-        
-        # DOI in German text
-        r'(?:DOI|doi)[-:]?\s*(10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+)'
-    ]
-    
-    for idx, pattern in enumerate(doi_patterns):
-        match = re.search(pattern, text, re.IGNORECASE)
+    for idx, pattern in enumerate(_DOI_PATTERNS):
+        match = pattern.search(text)
         if match and match.group(1):
             doi = match.group(1).strip()
             logger.debug(f"DOI found with pattern {idx+1}: {doi}")
@@ -71,38 +98,29 @@ def extract_isbn(text):
         logger.debug("No text provided for ISBN extraction")
         return None
     
-    # ISBN patterns - Enhanced for better matching
-    isbn_patterns = [
-        # ISBN-13 with label
-        r'\bISBN(?:-13)?[:\s]*(97[89][- ]?(?:\d[- ]?){9}\d)\b',
-        
-        # ISBN-10 with label
-        r'\bISBN(?:-10)?[:\s]*(\d[- ]?(?:\d[- ]?){8}[\dX])\b',
-        
-        # Bare ISBN-13 with word boundary
-        r'\b(97[89][- ]?(?:\d[- ]?){9}\d)\b',
-        
-        # Bare ISBN-10 with word boundary  
-        r'\b(\d[- ]?(?:\d[- ]?){8}[\dX])\b',
-        
-        # ISBN in German text
-        r'(?:ISBN|isbn)[-:]?\s*((?:97[89][- ]?)?(?:\d[- ]?){9}[\dX])',
-        
-        # ISBN with International Standard Book Number label
-        r'International\s+Standard\s+Book\s+Number.{0,20}((?:97[89][- ]?)?(?:\d[- ]?){9}[\dX])'
-    ]
-    
-    for idx, pattern in enumerate(isbn_patterns):
-        match = re.search(pattern, text, re.IGNORECASE)
+    for idx, pattern in enumerate(_ISBN_PATTERNS):
+        match = pattern.search(text)
         if match and match.group(1):
             # Clean the ISBN by removing hyphens and spaces
-            isbn = match.group(1).replace('-', '').replace(' ', '')
+            isbn = strip_isbn(match.group(1))
             logger.debug(f"ISBN found with pattern {idx+1}: {isbn}")
             return isbn
     
     logger.debug("No ISBN found in text")
     return None
 
+def strip_isbn(isbn):
+    """
+    Remove hyphens and whitespace separators from an ISBN
+    
+    Args:
+        isbn: ISBN string
+        
+    Returns:
+        str: ISBN without separators
+    """
+    return isbn.translate(_ISBN_STRIP)
+
 def extract_identifiers(text):
     """
     Extract DOI and ISBN from text
@@ -138,7 +156,7 @@ def validate_doi(doi):
         return False
     
     # Basic DOI format validation
-    return bool(re.match(r'^10\.\d{4,}(?:\.\d+)*\/(?:(?!["&\'<>])\S)+$', doi))
+    return bool(_DOI_VALIDATION_PATTERN.match(doi))
 
 def validate_isbn(isbn):
     """
@@ -154,7 +172,7 @@ def validate_isbn(isbn):
         return False
     
     # Clean the ISBN
-    clean_isbn = isbn.replace('-', '').replace(' ', '')
+    clean_isbn = strip_isbn(isbn)
     
     # Check length
     if len(clean_isbn) not in [10, 13]:
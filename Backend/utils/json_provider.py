@@ -0,0 +1,101 @@
+# Backend/utils/json_provider.py
+"""
+JSON-Provider für Flask, der Antworten mit orjson serialisiert.
+Ohne orjson (oder bei Daten, die orjson nicht schreiben kann) wird auf den
+Standard-Provider von Flask zurückgegriffen.
+"""
+import logging
+from typing import Any, Optional
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+from utils.file_utils import ORJSON_AVAILABLE, orjson
+
+logger = logging.getLogger(__name__)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON-Provider mit orjson für jsonify() und request.get_json()"""
+    
+    def _orjson_dumps(self, obj: Any, sort_keys: bool) -> Optional[bytes]:
+        """
+        Serialisiert Daten mit orjson
+        
+        Datumswerte laufen wie bisher über default() des Standard-Providers,
+        damit sich das Antwortformat nicht ändert.
+        
+        Args:
+            obj: Zu serialisierende Daten
+            sort_keys: Ob Schlüssel sortiert werden sollen
+            
+        Returns:
+            bytes: UTF-8-kodiertes JSON oder None, wenn orjson fehlt oder die
+                Daten nicht schreiben kann
+        """
+        if not ORJSON_AVAILABLE:
+            return None
+        
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        
+        try:
+            return orjson.dumps(obj, default=self.default, option=option)
+        except TypeError:
+            # z.B. Ganzzahlen außerhalb von 64 Bit - Standard-json kann sie schreiben
+            return None
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serialisiert Daten als JSON
+        
+        Eingerückte Ausgabe (z.B. im Debug-Modus) übernimmt der Standard-Provider.
+        
+        Args:
+            obj: Zu serialisierende Daten
+            **kwargs: Argumente für json.dumps
+            
+        Returns:
+            str: JSON-Text
+        """
+        if not kwargs.get('indent'):
+            content = self._orjson_dumps(obj, kwargs.get('sort_keys', self.sort_keys))
+            if content is not None:
+                return content.decode('utf-8')
+        
+        return super().dumps(obj, **kwargs)
+    
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """
+        Erstellt die Antwort für jsonify()
+        
+        Kompakte Antworten werden direkt aus den Bytes von orjson erzeugt, ohne
+        den Umweg über str und erneutes Kodieren - bei großen Analyseergebnissen
+        spart das eine vollständige Kopie.
+        
+        Returns:
+            Response: JSON-Antwort
+        """
+        compact = not ((self.compact is None and self._app.debug) or self.compact is False)
+        if compact:
+            content = self._orjson_dumps(self._prepare_response_obj(args, kwargs), self.sort_keys)
+            if content is not None:
+                return self._app.response_class(content + b"\n", mimetype=self.mimetype)
+        
+        return super().response(*args, **kwargs)
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        """
+        Parst JSON-Text
+        
+        Args:
+            s: JSON als str oder bytes
+            **kwargs: Argumente für json.loads
+            
+        Returns:
+            Geparste Daten
+        """
+        if ORJSON_AVAILABLE and not kwargs:
+            return orjson.loads(s)
+        
+        return super().loads(s, **kwargs)
@@ -6,6 +6,8 @@ Kombiniert und optimiert aus helpers.py, document_validation.py und metadata.py.
 import re
 import logging
 import json
+import functools
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Union
 
@@ -16,6 +18,30 @@ from utils.identifier_utils import validate_doi, validate_isbn
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Zuletzt formatierte Sekunde für utc_now_iso: (Unix-Sekunde, 'YYYY-MM-DDTHH:MM:SS')
+_iso_second = (0, '')
+
+def utc_now_iso() -> str:
+    """
+    Aktueller UTC-Zeitstempel im ISO-Format mit 'Z', z.B. für uploadDate
+    
+    Der Sekundenanteil wird nur einmal pro Sekunde formatiert, danach nur
+    noch die Mikrosekunden angehängt.
+    
+    Returns:
+        str: Zeitstempel wie '2024-05-01T12:34:56.789012Z'
+    """
+    global _iso_second
+    
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _iso_second
+    if second != cached_second:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        _iso_second = (second, prefix)
+    
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}Z"
+
 def normalize_date(date_str: Optional[str]) -> Optional[str]:
     """
     Normalize date string to ISO format (YYYY-MM-DD)
@@ -29,6 +55,24 @@ def normalize_date(date_str: Optional[str]) -> Optional[str]:
     if not date_str:
         return None
     
+    if not isinstance(date_str, str):
+        logger.error(f"Error normalizing date: unsupported type {type(date_str).__name__}")
+        return None
+    
+    return _normalize_date_string(date_str)
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_date_string(date_str: str) -> Optional[str]:
+    """
+    Normalize a non-empty date string; memoized since the same dates recur
+    across re-uploads of a document and across the date fields of one record
+    
+    Args:
+        date_str: Date string in various formats
+        
+    Returns:
+        str: Normalized date in ISO format or None
+    """
     try:
         # If already in ISO format (YYYY-MM-DD)
         if re.match(r'^\d{4}-\d{2}-\d{2}$', date_str):
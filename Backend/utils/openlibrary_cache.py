@@ -0,0 +1,162 @@
+# Backend/utils/openlibrary_cache.py
+"""
+Persistenter Cache für OpenLibrary-ISBN-Abfragen auf Basis von SQLite.
+Aufbau wie der CrossRef-Cache; ISBNs, die OpenLibrary nicht kennt, werden
+für kürzere Zeit ebenfalls gemerkt.
+"""
+import os
+import json
+import functools
+import importlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, Callable, Tuple
+
+from config import config_manager
+from utils.identifier_utils import strip_isbn
+
+logger = logging.getLogger(__name__)
+
+# Gültigkeitsdauer eines Cache-Eintrags (30 Tage)
+CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# Gültigkeitsdauer eines Negativ-Eintrags (ISBN bei OpenLibrary unbekannt)
+NOT_FOUND_TTL_SECONDS = 24 * 60 * 60
+
+# Bei Änderungen an der Abruflogik erhöhen, um alte Einträge zu invalidieren
+CACHE_VERSION = 1
+
+_connection: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+def normalize_isbn(isbn: str) -> str:
+    """
+    Normalisiert eine ISBN für die Verwendung als Cache-Schlüssel
+
+    Args:
+        isbn: ISBN mit oder ohne Bindestriche/Leerzeichen
+
+    Returns:
+        str: ISBN ohne Trennzeichen, 'X' in Großbuchstaben
+    """
+    return strip_isbn(isbn).upper()
+
+def _get_connection() -> sqlite3.Connection:
+    """Öffnet die Cache-Datenbank beim ersten Zugriff (Lock muss gehalten werden)"""
+    global _connection
+
+    if _connection is None:
+        upload_folder = config_manager.get('UPLOAD_FOLDER', './uploads')
+        cache_dir = os.path.join(upload_folder, 'openlibrary_cache')
+        os.makedirs(cache_dir, exist_ok=True)
+
+        _connection = sqlite3.connect(
+            os.path.join(cache_dir, 'openlibrary.sqlite3'),
+            check_same_thread=False
+        )
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS openlibrary ("
+            "isbn TEXT PRIMARY KEY, "
+            "json TEXT NOT NULL, "
+            "fetched_at INTEGER NOT NULL, "
+            "version INTEGER NOT NULL)"
+        )
+        _connection.commit()
+        logger.info(f"OpenLibrary-Cache geöffnet: {cache_dir}")
+
+    return _connection
+
+@functools.lru_cache(maxsize=None)
+def _openlibrary_fetcher() -> Callable[[str], Tuple[Optional[Dict[str, Any]], bool]]:
+    """Löst fetch_openlibrary_book einmalig auf (api.metadata importiert die Caches)"""
+    return importlib.import_module('api.metadata').fetch_openlibrary_book
+
+def _lookup(isbn: str, ttl: int = CACHE_TTL_SECONDS) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Sucht eine ISBN im Cache
+
+    Args:
+        isbn: Normalisierte ISBN
+        ttl: Maximales Alter eines positiven Eintrags in Sekunden
+
+    Returns:
+        tuple: (Treffer, Buchdaten); bei einem Negativ-Eintrag (True, None)
+    """
+    now = int(time.time())
+    try:
+        with _lock:
+            row = _get_connection().execute(
+                "SELECT json FROM openlibrary WHERE isbn = ? AND version = ? "
+                "AND fetched_at >= CASE WHEN json = 'null' THEN ? ELSE ? END",
+                (isbn, CACHE_VERSION, now - NOT_FOUND_TTL_SECONDS, now - ttl)
+            ).fetchone()
+        return (True, json.loads(row[0])) if row else (False, None)
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning(f"Fehler beim Lesen aus dem OpenLibrary-Cache: {e}")
+        return False, None
+
+def store(isbn: str, data: Optional[Dict[str, Any]]) -> bool:
+    """
+    Speichert eine OpenLibrary-Antwort im Cache
+
+    Args:
+        isbn: Normalisierte ISBN
+        data: Buchdaten; None merkt die ISBN als bei OpenLibrary unbekannt
+
+    Returns:
+        bool: True bei Erfolg
+    """
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO openlibrary (isbn, json, fetched_at, version) VALUES (?, ?, ?, ?)",
+                (isbn, json.dumps(data), int(time.time()), CACHE_VERSION)
+            )
+            connection.commit()
+        return True
+    except (sqlite3.Error, TypeError) as e:
+        logger.warning(f"Fehler beim Schreiben in den OpenLibrary-Cache: {e}")
+        return False
+
+def cached_fetch(isbn: str, ttl: int = CACHE_TTL_SECONDS) -> Optional[Dict[str, Any]]:
+    """
+    Ruft Buchdaten von OpenLibrary ab und verwendet dabei den persistenten Cache
+
+    Args:
+        isbn: ISBN
+        ttl: Maximales Alter eines Cache-Eintrags in Sekunden
+
+    Returns:
+        dict: OpenLibrary-Buchdaten oder None
+    """
+    if not isbn:
+        return None
+
+    key = normalize_isbn(isbn)
+
+    hit, cached = _lookup(key, ttl)
+    if hit:
+        logger.debug(f"OpenLibrary-Cache-Treffer für ISBN {key}")
+        return cached
+
+    data, not_found = _openlibrary_fetcher()(key)
+    if data:
+        store(key, data)
+    elif not_found:
+        store(key, None)
+
+    return data
+
+def clear_cache() -> None:
+    """Leert den OpenLibrary-Cache"""
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute("DELETE FROM openlibrary")
+            connection.commit()
+        logger.info("OpenLibrary-Cache geleert")
+    except sqlite3.Error as e:
+        logger.warning(f"Fehler beim Leeren des OpenLibrary-Cache: {e}")
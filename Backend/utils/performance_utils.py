@@ -3,15 +3,27 @@
 Utility functions for performance monitoring, timeouts, and resource management.
 """
 import os
+import gc
 import logging
 import threading
 import time
 import psutil
 import functools
-from typing import Any, Callable
+from typing import Any, Callable, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Factor applied to the RSS after a collection to get the next threshold
+GC_HIGH_WATER_FACTOR = 1.3
+
+# Generation thresholds for the cyclic collector; a large generation-0
+# threshold avoids constant sweeps while chunks and page texts are allocated
+GC_THRESHOLDS = (50000, 10, 10)
+
+# RSS (bytes) above which the next full collection is triggered; 0 = not yet measured
+_gc_high_water = 0
+_gc_lock = threading.Lock()
+
 def timeout_handler(max_seconds=120, cpu_limit=70):
     """
     Decorator to limit function execution time and CPU usage
@@ -115,4 +127,104 @@ def memory_profile(func):
         
         return result
     
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+class ThrottledProgress:
+    """
+    Wrapper for progress callbacks of the form callback(message, progress)
+    that only forwards an update when enough time has passed or progress
+    has advanced far enough. Skipped updates are remembered and the latest
+    one can be emitted with flush(); 100% is always forwarded.
+    
+    Example:
+        progress = ThrottledProgress(lambda msg, pct: update_status(..., progress=pct))
+        processor.process_file(path, progress_callback=progress)
+        progress.flush()
+    """
+    
+    def __init__(self, callback: Callable[[str, float], Any], 
+                 min_interval: float = 0.5, min_step: float = 5):
+        """
+        Args:
+            callback: Progress callback to wrap
+            min_interval: Minimum seconds between forwarded updates
+            min_step: Minimum progress delta that is always forwarded
+        """
+        self._callback = callback
+        self.min_interval = min_interval
+        self.min_step = min_step
+        self._last_emit_ts = 0.0
+        self._last_pct: Optional[float] = None
+        self._pending: Optional[Tuple[str, float]] = None
+        self._lock = threading.Lock()
+    
+    def __call__(self, message: str, progress: float):
+        now = time.monotonic()
+        
+        with self._lock:
+            emit = (
+                self._last_pct is None
+                or progress >= 100
+                or now - self._last_emit_ts >= self.min_interval
+                or abs(progress - self._last_pct) >= self.min_step
+            )
+            if emit:
+                self._last_emit_ts = now
+                self._last_pct = progress
+                self._pending = None
+            else:
+                self._pending = (message, progress)
+        
+        if emit:
+            self._callback(message, progress)
+    
+    def flush(self):
+        """Forward the most recent skipped update, if any"""
+        with self._lock:
+            pending = self._pending
+            self._pending = None
+            if pending:
+                self._last_emit_ts = time.monotonic()
+                self._last_pct = pending[1]
+        
+        if pending:
+            self._callback(*pending)
+
+
+def configure_gc() -> None:
+    """Apply GC_THRESHOLDS to the cyclic garbage collector (once at startup)"""
+    gc.set_threshold(*GC_THRESHOLDS)
+    logger.info(f"GC thresholds set to {GC_THRESHOLDS}")
+
+def collect_garbage_if_needed() -> bool:
+    """
+    Run a full garbage collection only if the process memory has grown
+    
+    A full collection walks every tracked object, so it is only worth it
+    when the resident set size exceeds the high-water mark. After a
+    collection the mark is raised to GC_HIGH_WATER_FACTOR times the
+    remaining RSS; the first call only records the baseline.
+    
+    Returns:
+        bool: True if a collection was performed
+    """
+    global _gc_high_water
+    
+    process = psutil.Process(os.getpid())
+    
+    with _gc_lock:
+        rss = process.memory_info().rss
+        if not _gc_high_water:
+            _gc_high_water = int(rss * GC_HIGH_WATER_FACTOR)
+            return False
+        if rss <= _gc_high_water:
+            return False
+        
+        start = time.perf_counter()
+        gc.collect()
+        after = process.memory_info().rss
+        _gc_high_water = int(after * GC_HIGH_WATER_FACTOR)
+    
+    logger.debug(f"gc.collect() at {rss / (1024 * 1024):.1f}MB RSS took "
+                 f"{(time.perf_counter() - start) * 1000:.1f}ms, now {after / (1024 * 1024):.1f}MB")
+    return True